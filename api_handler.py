@@ -1,89 +1,679 @@
 # api_handler.py
 
+import json
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+import openai
 from openai import OpenAI
 
-def analyze_job_description(client: OpenAI, model: str, job_desc: str, excluded_terms: list, section_names: dict) -> str:
+from cancellation import CancellationToken, GenerationCancelled, run_cancellable
+from request_policy import RequestPolicy, load_request_policy, provider_limiter, retry_after_seconds, run_with_policy
+from rate_limiter import is_quota_exhausted, rate_limiter
+from settings_manager import settings_manager
+from token_counter import estimate_tokens
+
+# درجة الحرارة الافتراضية لطلبات تحليل الوصف الوظيفي
+DEFAULT_TEMPERATURE = 0.5
+
+# صيغ الاستجابة المدعومة: نص markdown بعناوين "###" أو كائن JSON مطابق لمخطط الأقسام
+OUTPUT_FORMATS = ('markdown', 'json')
+
+# خيارات التوليد المحفوظة مع تفضيلات البرنامج
+GENERATION_DEFAULTS = {
+    'output_format': 'markdown',
+    'parallel_sections': False,  # طلب مستقل لكل مجموعة أقسام بالتوازي
+    'section_group_size': 1,
+}
+
+# Worker threads for per-section fan-out; the provider limiter decides how many actually run at once
+_section_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ai-section")
+
+# عناوين الخدمة لكل مزود
+PROVIDER_BASE_URLS = {
+    'openai': "https://api.openai.com/v1",
+    'openrouter': "https://openrouter.ai/api/v1",
+}
+
+def build_client_headers(provider: str, http_referer: str = None, x_title: str = None) -> dict:
     """
-    يحلل الوصف الوظيفي باستخدام النموذج المحدد ويقترح محتوى للسيرة الذاتية بأسماء أقسام مخصصة.
+    يبني الترويسات الإضافية الخاصة بـ OpenRouter.
     """
-    
-    instructions = []
-    format_examples = []
-    
-    for i, (key, name) in enumerate(section_names.items()):
-        if key == 'profile':
-            instructions.append(f"{i+1}. **Generate a {name}:** Write a 2-3 sentence professional summary for the top of the CV, tailored to this job.")
-            format_examples.append(f"### {name}\nA results-oriented professional with experience in...")
-        else:
-            instructions.append(f"{i+1}. **Generate {name}:** Create a bulleted list of essential items for this section (like skills, interests, etc.) based on the job description.")
-            format_examples.append(f"### {name}\n- Item A\n- Item B")
+    headers = {}
+    if provider == "openrouter":
+        if http_referer: headers["HTTP-Referer"] = http_referer
+        if x_title: headers["X-Title"] = x_title
+    return headers
 
-    dynamic_instructions = "\n".join(instructions)
-    dynamic_format_examples = "\n\n".join(format_examples)
-    
-    prompt = f"""
-You are an expert CV and resume assistant. Your task is to analyze the provided job description and generate relevant, concise, and ATS-friendly content for a CV.
+def create_client(provider: str, api_key: str, http_referer: str = None, x_title: str = None) -> OpenAI:
+    """
+    ينشئ عميل OpenAI جديد للمزود المحدد.
+    لإعادة استخدام الاتصالات بين الطلبات استخدم client_registry.get_client بدلاً من ذلك.
+    """
+    headers = build_client_headers(provider, http_referer, x_title)
+    base_url = PROVIDER_BASE_URLS.get(provider, PROVIDER_BASE_URLS['openai'])
+    return OpenAI(api_key=api_key, base_url=base_url, default_headers=headers)
 
-**Job Description:**
----
-{job_desc}
----
+class PromptTemplate:
+    """
+    قالب طلب مُجمّع مسبقاً لإعداد أقسام محدد (أسماء الأقسام + الكلمات المستبعدة).
+    التعليمات الثابتة تأتي أولاً ثم الوصف الوظيفي في النهاية، حتى يستفيد المزود من تخزين بداية الطلب مؤقتاً
+    (prompt-prefix caching)، ولا يتغير بين الطلبات سوى الوصف الوظيفي.
+    """
+
+    def __init__(self, section_names: dict, excluded_terms: list, output_format: str = 'markdown'):
+        self.output_format = output_format
+        instructions = []
+        format_examples = []
+        json_example = {}
+
+        for i, (key, name) in enumerate(section_names.items()):
+            if key == 'profile':
+                instructions.append(f"{i+1}. **Generate a {name}:** Write a 2-3 sentence professional summary for the top of the CV, tailored to this job.")
+                format_examples.append(f"### {name}\nA results-oriented professional with experience in...")
+                json_example[key] = "A results-oriented professional with experience in..."
+            else:
+                instructions.append(f"{i+1}. **Generate {name}:** Create a bulleted list of essential items for this section (like skills, interests, etc.) based on the job description.")
+                format_examples.append(f"### {name}\n- Item A\n- Item B")
+                json_example[key] = ["Item A", "Item B"]
+
+        dynamic_instructions = "\n".join(instructions)
+        if output_format == 'json':
+            keys = ", ".join(f'"{key}" ({name})' for key, name in section_names.items())
+            format_rule = (f"- **Respond with a single JSON object** with exactly these keys: {keys}. "
+                           f"The profile value is a string; every other value is an array of strings. Do not add any text outside the JSON.")
+            dynamic_format_examples = json.dumps(json_example, indent=2)
+        else:
+            format_rule = ('- **Format your entire response clearly** with headings for each section using "###" followed by '
+                           'the exact section name provided in the instructions. Do not add any extra text before or after the content.')
+            dynamic_format_examples = "\n\n".join(format_examples)
+
+        self.prefix = f"""
+You are an expert CV and resume assistant. Your task is to analyze the job description provided at the end of this message and generate relevant, concise, and ATS-friendly content for a CV.
 
 **Instructions:**
 {dynamic_instructions}
 - **DO NOT use the following words in your response:** {', '.join(excluded_terms) if excluded_terms else "None"}
-- **Format your entire response clearly** with headings for each section using "###" followed by the exact section name provided in the instructions. Do not add any extra text before or after the content.
+{format_rule}
 
 **Example Output Format:**
 {dynamic_format_examples}
+
+**Job Description:**
+---
 """
+        self.suffix = "\n---\n"
+        # حجم الجزء الثابت من الطلب بالرموز (tokens)
+        self.static_tokens = estimate_tokens(self.prefix + self.suffix)
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.5
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error: {str(e)}"
+    def render(self, job_desc: str) -> str:
+        """Return the full prompt; only the job description is interpolated."""
+        return self.prefix + job_desc + self.suffix
 
-def parse_ai_response(response_text: str, section_names: dict) -> dict:
+    def prompt_tokens(self, job_desc: str) -> int:
+        """Estimated size of the full prompt in tokens."""
+        return self.static_tokens + estimate_tokens(job_desc)
+
+@lru_cache(maxsize=64)
+def _compile_prompt_template(section_items: Tuple[Tuple[str, str], ...], excluded_terms: Tuple[str, ...],
+                             output_format: str = 'markdown') -> PromptTemplate:
+    return PromptTemplate(dict(section_items), list(excluded_terms), output_format)
+
+def get_prompt_template(section_names: dict, excluded_terms: list, output_format: str = 'markdown') -> PromptTemplate:
     """
-    يحلل استجابة الذكاء الاصطناعي ويستخرج الأقسام المختلفة بناءً على الأسماء المخصصة.
+    يُرجع القالب المُجمّع لإعداد الأقسام هذا (يُبنى مرة واحدة ثم يُعاد استخدامه).
+    """
+    return _compile_prompt_template(tuple(section_names.items()), tuple(excluded_terms or ()), output_format)
+
+def invalidate_prompt_templates():
     """
+    يحذف القوالب المُجمّعة (يُستدعى عند تغيير أسماء الأقسام).
+    """
+    _compile_prompt_template.cache_clear()
+    _compile_response_schema.cache_clear()
+
+def build_prompt(job_desc: str, excluded_terms: list, section_names: dict, output_format: str = 'markdown') -> str:
+    """
+    يبني نص الطلب المرسل إلى النموذج بأسماء الأقسام المخصصة.
+    """
+    return get_prompt_template(section_names, excluded_terms, output_format).render(job_desc)
+
+@lru_cache(maxsize=64)
+def _compile_response_schema(section_items: Tuple[Tuple[str, str], ...]) -> dict:
+    properties = {}
+    for key, name in section_items:
+        if key == 'profile':
+            properties[key] = {"type": "string", "description": name}
+        else:
+            properties[key] = {"type": "array", "items": {"type": "string"}, "description": name}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": [key for key, _name in section_items],
+        "additionalProperties": False,
+    }
+
+def build_response_format(section_names: dict) -> dict:
+    """
+    يبني قيمة response_format (JSON schema صارم) المشتقة من أسماء الأقسام.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "cv_sections", "strict": True,
+                        "schema": _compile_response_schema(tuple(section_names.items()))},
+    }
+
+def load_generation_options() -> dict:
+    """Generation options from the app preferences, with defaults for missing keys."""
+    preferences = settings_manager.load_settings('app_preferences', {})
+    options = {key: preferences.get(key, default) for key, default in GENERATION_DEFAULTS.items()}
+    if options['output_format'] not in OUTPUT_FORMATS:
+        options['output_format'] = 'markdown'
+    return options
+
+def response_mode(output_format: str, parallel_sections: bool, section_group_size: int) -> dict:
+    """
+    The options that change the prompt and the reply of a request, as response-cache key fields.
+    The group size only matters when the sections are requested in parallel.
+    """
+    return {'output_format': output_format, 'parallel_sections': bool(parallel_sections),
+            'section_group_size': section_group_size if parallel_sections else None}
+
+def save_generation_option(key: str, value) -> bool:
+    preferences = settings_manager.load_settings('app_preferences', {})
+    preferences[key] = value
+    return settings_manager.save_settings('app_preferences', preferences)
+
+def load_output_format() -> str:
+    """The response format chosen in the AI settings ('markdown' unless JSON mode was enabled)."""
+    return load_generation_options()['output_format']
+
+def save_output_format(output_format: str) -> bool:
+    return save_generation_option('output_format', output_format)
+
+class StructuredOutputError(ValueError):
+    """The model's JSON reply does not match the section schema."""
+
+def validate_ai_json(response_text: str, section_names: dict) -> dict:
+    """
+    فحص سريع لاستجابة JSON مقابل مخطط الأقسام، ويُرجع بيانات بنفس شكل parse_ai_response.
+    يرفع StructuredOutputError إذا كانت الاستجابة غير صالحة.
+    """
+    text = response_text.strip()
+    if text.startswith("```"):
+        # Some models still wrap JSON in a code fence
+        text = text.strip("`").strip()
+        if text[:4].lower() == "json":
+            text = text[4:]
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"invalid JSON: {e}") from e
+    if not isinstance(payload, dict):
+        raise StructuredOutputError("the response is not a JSON object")
+
     data = {}
     for key in section_names:
+        value = payload.get(key)
         if key == 'profile':
-            data[key] = ""
+            if not isinstance(value, str):
+                raise StructuredOutputError(f"'{key}' must be a string")
+            data[key] = " ".join(value.split())
         else:
-            data[key] = []
-            
-    title_to_key_map = {f"### {name}".lower(): key for key, name in section_names.items()}
-    current_section_key = None
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise StructuredOutputError(f"'{key}' must be an array of strings")
+            data[key] = [item.strip() for item in value if item.strip()]
+    return data
 
-    for line in response_text.splitlines():
-        line_stripped = line.strip()
-        if not line_stripped:
+# (base_url|model) of providers that rejected response_format; they get the markdown prompt from then on
+_structured_output_unsupported = set()
+
+def supports_structured_output(client: OpenAI, model: str) -> bool:
+    return f"{client.base_url}|{model}" not in _structured_output_unsupported
+
+def _is_response_format_rejection(error: Exception) -> bool:
+    if not isinstance(error, (openai.BadRequestError, openai.UnprocessableEntityError, openai.NotFoundError)):
+        return False
+    message = str(error).lower()
+    return any(word in message for word in ("response_format", "json_schema", "json mode", "structured output"))
+
+# (base_url|model) of providers that rejected stream_options; their streamed requests keep the token estimate
+_stream_usage_unsupported = set()
+
+def _is_stream_options_rejection(error: Exception) -> bool:
+    return isinstance(error, (openai.BadRequestError, openai.UnprocessableEntityError)) and \
+        "stream_options" in str(error).lower()
+
+class _MeteredStream:
+    """
+    A streamed completion that settles its rate-limiter reservation once: with the usage of the last
+    chunk (stream_options include_usage), or with the estimate when the stream ends without one or is
+    closed early (cancellation).
+    """
+
+    def __init__(self, stream, reservation):
+        self._stream = stream
+        self._reservation = reservation
+        self._usage = None
+        self._settled = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                if getattr(chunk, 'usage', None) is not None:
+                    self._usage = chunk.usage
+                yield chunk
+        finally:
+            self._settle()
+
+    def close(self):
+        self._stream.close()
+        self._settle()
+
+    def _settle(self):
+        with self._lock:
+            if self._settled:
+                return
+            self._settled = True
+        usage = self._usage
+        if usage is not None:
+            rate_limiter.settle(self._reservation, usage.total_tokens, usage.completion_tokens)
+        else:
+            rate_limiter.settle(self._reservation, self._reservation.tokens)
+
+def _create_completion(client: OpenAI, model: str, prompt: str, temperature: float, timeout: float,
+                       policy: RequestPolicy = None, cancel_token: Optional[CancellationToken] = None, **kwargs):
+    """
+    طلب واحد إلى النموذج بمهلة محددة؛ إعادة المحاولة تتم عبر سياسة الطلبات وليس داخل مكتبة OpenAI.
+    مع policy.rate_limit ينتظر الطلب دوره ضمن حدود المزود (طلبات/رموز في الدقيقة)،
+    ويُعاد إلى الطابور عند استجابة 429 بدلاً من الفشل.
+    """
+    policy = policy or RequestPolicy()
+    create = client.with_options(timeout=timeout, max_retries=0).chat.completions
+    messages = [{"role": "user", "content": prompt}]
+    if not policy.rate_limit:
+        return create.create(model=model, messages=messages, temperature=temperature, **kwargs)
+
+    key = f"{client.base_url}|{model}"
+    prompt_tokens = estimate_tokens(prompt)
+    streamed = kwargs.get('stream', False)
+    if streamed and key not in _stream_usage_unsupported:
+        # Streams report their usage only when asked to, in a last chunk without choices
+        kwargs['stream_options'] = {"include_usage": True}
+    requeues = 0
+    while True:
+        reservation = rate_limiter.acquire(key, prompt_tokens, policy.requests_per_minute, policy.tokens_per_minute,
+                                           cancel_token)
+        try:
+            raw = create.with_raw_response.create(model=model, messages=messages, temperature=temperature, **kwargs)
+            rate_limiter.observe(key, raw.headers)
+            response = raw.parse()
+        except openai.RateLimitError as e:
+            # Nothing was generated: give the token estimate back before queueing again (or failing)
+            rate_limiter.settle(reservation, 0)
+            if is_quota_exhausted(e) or requeues >= policy.rate_limit_requeues:
+                raise
+            requeues += 1
+            rate_limiter.on_rate_limited(key, e.response.headers, retry_after_seconds(e))
+            print(f"Rate limited by {client.base_url} ({model}), queueing the request again")
             continue
-        
-        line_lower = line_stripped.lower()
+        except BaseException as e:
+            rate_limiter.settle(reservation, 0)
+            if 'stream_options' in kwargs and _is_stream_options_rejection(e):
+                print(f"{model} does not accept stream_options; its streamed usage is estimated")
+                _stream_usage_unsupported.add(key)
+                del kwargs['stream_options']
+                continue
+            raise
+        if streamed:
+            return _MeteredStream(response, reservation)
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            rate_limiter.settle(reservation, usage.total_tokens, usage.completion_tokens)
+        return response
+
+def _complete_text(client: OpenAI, model: str, prompt: str, temperature: float, timeout: float,
+                   policy: RequestPolicy = None, cancel_token: Optional[CancellationToken] = None, **kwargs) -> str:
+    """
+    نص رد النموذج كاملاً. مع رمز إلغاء يُطلب الرد متدفقاً ويُجمَّع: إغلاق التدفق عند الإلغاء يقطع طلب HTTP نفسه
+    فيتوقف استهلاك الرموز، بينما الطلب العادي لا يمكن مقاطعته أثناء انتظار الرد (المهلة عندها بين الأجزاء).
+    """
+    if cancel_token is None:
+        response = _create_completion(client, model, prompt, temperature, timeout, policy, **kwargs)
+        return response.choices[0].message.content or ""
+    stream = _create_completion(client, model, prompt, temperature, timeout, policy, cancel_token, stream=True,
+                                **kwargs)
+    unregister = cancel_token.on_cancel(stream.close)
+    try:
+        return "".join(_iter_stream_text(stream))
+    except Exception:
+        cancel_token.raise_if_cancelled()
+        raise
+    finally:
+        unregister()
+        stream.close()
+
+def analyze_job_description(client: OpenAI, model: str, job_desc: str, excluded_terms: list, section_names: dict,
+                            temperature: float = DEFAULT_TEMPERATURE, policy: RequestPolicy = None,
+                            fallback: Optional[Tuple[OpenAI, str]] = None, output_format: str = 'markdown',
+                            cancel_token: Optional[CancellationToken] = None) -> str:
+    """
+    يحلل الوصف الوظيفي باستخدام النموذج المحدد ويقترح محتوى للسيرة الذاتية بأسماء أقسام مخصصة.
+    - policy: سياسة المهلات وإعادة المحاولة (الافتراضي: request_policy.json).
+    - fallback: (client, model) للمزود البديل المستخدم في الطلبات الاحتياطية.
+    - output_format: 'json' يطلب كائن JSON مطابقاً لمخطط الأقسام، ويعود إلى markdown إذا لم يدعمه المزود.
+      استخدم parse_ai_output لتحليل النتيجة في الحالتين.
+    - cancel_token: عند الإلغاء يُحرَّر المستدعي فوراً برفع GenerationCancelled ويُغلق اتصال الطلب الجاري
+      (يُطلب الرد متدفقاً لهذا الغرض، انظر _complete_text).
+    """
+    prompt = build_prompt(job_desc, excluded_terms, section_names)
+
+    def completion_call(target_client, target_model):
+        structured = output_format == 'json' and supports_structured_output(target_client, target_model)
+
+        def call(timeout):
+            nonlocal structured
+            if structured:
+                try:
+                    content = _complete_text(target_client, target_model,
+                                             build_prompt(job_desc, excluded_terms, section_names, 'json'),
+                                             temperature, timeout, policy, cancel_token,
+                                             response_format=build_response_format(section_names))
+                    validate_ai_json(content, section_names)
+                    return content
+                except StructuredOutputError as e:
+                    print(f"Structured output did not match the schema ({e}); asking for markdown instead")
+                except Exception as e:
+                    if not _is_response_format_rejection(e):
+                        raise
+                    print(f"{target_model} does not support structured output; using the markdown format")
+                    _structured_output_unsupported.add(f"{target_client.base_url}|{target_model}")
+                    structured = False
+            return _complete_text(target_client, target_model, prompt, temperature, timeout, policy, cancel_token)
+        return call
 
-        matched_title = next((title for title in title_to_key_map if line_lower.startswith(title)), None)
-        if matched_title:
-            current_section_key = title_to_key_map[matched_title]
+    policy = policy or load_request_policy()
+
+    def run():
+        with provider_limiter.slot(str(client.base_url), policy.max_concurrency, cancel_token):
+            return run_with_policy(
+                completion_call(client, model),
+                policy,
+                completion_call(*fallback) if fallback else None,
+                latency_key=f"{client.base_url}|{model}",
+                cancel_token=cancel_token
+            )
+
+    try:
+        return run_cancellable(run, cancel_token)
+    except GenerationCancelled:
+        raise
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def split_section_groups(section_names: dict, group_size: int = 1) -> List[dict]:
+    """
+    يقسم الأقسام إلى مجموعات صغيرة (قسم واحد لكل مجموعة افتراضياً) مع الحفاظ على ترتيبها.
+    """
+    items = list(section_names.items())
+    size = max(1, group_size)
+    return [dict(items[i:i + size]) for i in range(0, len(items), size)]
+
+def analyze_sections_parallel(client: OpenAI, model: str, job_desc: str, excluded_terms: list, section_names: dict,
+                              temperature: float = DEFAULT_TEMPERATURE, policy: RequestPolicy = None,
+                              fallback: Optional[Tuple[OpenAI, str]] = None, output_format: str = 'markdown',
+                              group_size: int = 1,
+                              on_section: Optional[Callable[[str, Any], None]] = None,
+                              cancel_token: Optional[CancellationToken] = None) -> Tuple[str, dict]:
+    """
+    يولّد الأقسام بطلبات صغيرة متوازية (طلب لكل مجموعة أقسام) ثم يدمج النتائج في قاموس ai_data واحد،
+    فيقترب الزمن الكلي من زمن أبطأ قسم بدلاً من مجموع الأقسام.
+    عدد الطلبات المتزامنة لكل مزود محدود بـ policy.max_concurrency.
+    - on_section(key, value): يُستدعى (من خيط العمل) عند اكتمال كل قسم.
+    يُرجع (النص الخام المجمّع، ai_data) ويرفع RuntimeError عند فشل أي مجموعة، وGenerationCancelled عند الإلغاء.
+    """
+    policy = policy or load_request_policy()
+
+    def run_group(group):
+        raw = analyze_job_description(client, model, job_desc, excluded_terms, group, temperature, policy,
+                                      fallback, output_format, cancel_token)
+        if raw.startswith("Error"):
+            raise RuntimeError(raw[len("Error: "):] if raw.startswith("Error: ") else raw)
+        group_data = parse_ai_output(raw, group)
+        if on_section:
+            for key in group:
+                on_section(key, group_data[key])
+        return raw, group_data
+
+    groups = split_section_groups(section_names, group_size)
+    futures = [_section_executor.submit(run_group, group) for group in groups]
+    pending = set(futures)
+    cancelled = {cancel_token.future()} if cancel_token else set()
+    while pending:
+        done, _ = wait(pending | cancelled, return_when=FIRST_COMPLETED)
+        pending -= done
+        failed = next((f for f in done if f in futures and f.exception() is not None), None)
+        if (cancel_token and cancel_token.cancelled) or failed is not None:
+            for other in pending:
+                other.cancel()
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            raise RuntimeError(f"Section request failed: {failed.exception()}")
+
+    raw_parts = []
+    ai_data = {}
+    for future in futures:
+        raw, group_data = future.result()
+        raw_parts.append(raw)
+        ai_data.update(group_data)
+    # نفس ترتيب المفاتيح الذي يُنتجه parse_ai_response
+    return "\n\n".join(raw_parts), {key: ai_data[key] for key in section_names}
+
+def _iter_stream_text(stream) -> Iterator[str]:
+    for chunk in stream:
+        if not chunk.choices:
             continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+def stream_job_description(client: OpenAI, model: str, job_desc: str, excluded_terms: list, section_names: dict,
+                           temperature: float = DEFAULT_TEMPERATURE, policy: RequestPolicy = None,
+                           fallback: Optional[Tuple[OpenAI, str]] = None,
+                           cancel_token: Optional[CancellationToken] = None) -> Iterator[str]:
+    """
+    نسخة متدفقة من analyze_job_description: تُرجع أجزاء النص فور وصولها من النموذج (stream=True).
+    على عكس النسخة العادية، تُرفع الأخطاء كاستثناءات ليتمكن المستدعي من التعامل معها.
+    تُطبق إعادة المحاولة والطلب الاحتياطي على فتح التدفق حتى وصول أول جزء من النص.
+    - cancel_token: الإلغاء يغلق اتصال التدفق فوراً (حتى أثناء انتظار البيانات) ويرفع GenerationCancelled.
+    """
+    prompt = build_prompt(job_desc, excluded_terms, section_names)
+    policy = policy or load_request_policy()
+
+    def open_call(target_client, target_model):
+        def call(timeout):
+            stream = _create_completion(target_client, target_model, prompt, temperature, timeout, policy, cancel_token,
+                                        stream=True)
+            # Closing the response from the cancelling thread aborts the blocked read
+            unregister = cancel_token.on_cancel(stream.close) if cancel_token else (lambda: None)
+            pieces = _iter_stream_text(stream)
+            try:
+                first = next(pieces, "")
+            except Exception:
+                unregister()
+                stream.close()
+                raise
+            return stream, pieces, first, unregister
+        return call
+
+    def close(opened):
+        opened[3]()
+        opened[0].close()
+
+    # An open abandoned by cancellation closes its own stream through the on_cancel hook above
+    opened = run_cancellable(lambda: run_with_policy(
+        open_call(client, model),
+        policy,
+        open_call(*fallback) if fallback else None,
+        latency_key=f"{client.base_url}|{model}|first-token",
+        discard=close,
+        cancel_token=cancel_token
+    ), cancel_token)
+    stream, pieces, first = opened[:3]
+    try:
+        if first:
+            yield first
+        for piece in pieces:
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            yield piece
+    except GenerationCancelled:
+        raise
+    except Exception:
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        raise
+    finally:
+        # إغلاق الاتصال حتى لو توقف المستهلك عن القراءة مبكراً
+        close(opened)
+
+# العلامات المسموح بها قبل عنوان القسم: ## أو ### ، ترقيم مثل "1." ، وخط عريض ** أو __
+_HEADING_MARKUP = re.compile(r"(?:(?P<hashes>#{1,6})[ \t]*)?(?:(?P<number>\d{1,2}[.)])[ \t]*)?(?P<bold>\*\*|__)?[ \t]*(?:\d{1,2}[.)][ \t]*)?")
+
+@lru_cache(maxsize=32)
+def _compile_heading_matcher(section_items: Tuple[Tuple[str, str], ...]):
+    """
+    يبني جدول بحث للعناوين: خريطة العنوان المُطبّع إلى المفتاح، وأطوال العناوين المختلفة (الأطول أولاً).
+    يُخزن مؤقتاً لكل إعداد أقسام حتى لا يُعاد بناؤه مع كل استجابة.
+    """
+    title_to_key = {}
+    for key, name in section_items:
+        title = " ".join(name.split()).lower()
+        if title and title not in title_to_key:
+            title_to_key[title] = key
+    lengths = tuple(sorted({len(title) for title in title_to_key}, reverse=True))
+    return title_to_key, lengths
+
+class SectionStreamParser:
+    """
+    محلل تدريجي لاستجابة الذكاء الاصطناعي في مرور واحد.
+    يستقبل النص على دفعات (feed) ويُرجع الأقسام المكتملة بمجرد ظهور عنوان القسم التالي،
+    ويُكمل القسم الأخير عند استدعاء close().
+    يقبل العناوين بصيغ مختلفة: "### Skills" أو "## Skills" أو "**Skills**" أو "2. Skills:".
+    """
+
+    def __init__(self, section_names: dict):
+        self.data = {}
+        for key in section_names:
+            if key == 'profile':
+                self.data[key] = ""
+            else:
+                self.data[key] = []
+
+        self._title_to_key, self._title_lengths = _compile_heading_matcher(tuple(section_names.items()))
+        self._profile_parts = []
+        self.current_section_key = None
+        self._pending = []
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk of text and return the sections completed by it as (key, value) pairs."""
+        if "\n" not in text:
+            self._pending.append(text)
+            return []
+        self._pending.append(text)
+        *lines, last = "".join(self._pending).split("\n")
+        self._pending = [last] if last else []
+        completed = []
+        for line in lines:
+            self._feed_line(line, completed)
+        return completed
+
+    def close(self) -> List[Tuple[str, Any]]:
+        """Flush the last partial line and return the section still open, if any."""
+        completed = []
+        if self._pending:
+            self._feed_line("".join(self._pending), completed)
+            self._pending = []
+        if self.current_section_key:
+            completed.append(self._section_value(self.current_section_key))
+            self.current_section_key = None
+        if 'profile' in self.data:
+            self.data['profile'] = " ".join(self._profile_parts)
+        return completed
+
+    def _section_value(self, key):
+        if key == 'profile':
+            self.data['profile'] = " ".join(self._profile_parts)
+            return key, self.data['profile']
+        return key, list(self.data[key])
+
+    def _match_heading(self, line_stripped: str) -> Optional[str]:
+        """Return the section key when the line is one of the expected headings (hash lookups only)."""
+        if line_stripped[0] in "-•" or line_stripped.startswith("* "):
+            return None  # bullet items are never headings
+        markup = _HEADING_MARKUP.match(line_stripped)
+        candidate = " ".join(line_stripped[markup.end():].split()).lower()
+        if not (markup.group('hashes') or markup.group('bold') or markup.group('number')):
+            # Without heading markup, only a line holding just the title (and maybe a colon) is a heading
+            return self._title_to_key.get(candidate.rstrip(" :*_"))
+        # Marked headings may carry extra text after the title ("### Skills & Tools"); longest title wins
+        for length in self._title_lengths:
+            key = self._title_to_key.get(candidate[:length])
+            if key:
+                return key
+        return None
+
+    def _feed_line(self, line, completed):
+        line_stripped = line.strip()
+        if not line_stripped:
+            return
 
+        key = self._match_heading(line_stripped)
+        if key:
+            if self.current_section_key:
+                completed.append(self._section_value(self.current_section_key))
+            self.current_section_key = key
+            return
+
+        current_section_key = self.current_section_key
         if current_section_key:
             if current_section_key == 'profile':
-                if not line_stripped.startswith("###"):
-                    data[current_section_key] += line_stripped + " "
-            elif line_stripped.startswith("-") or line_stripped.startswith("*"):
+                if not line_stripped.startswith("#"):
+                    self._profile_parts.append(line_stripped)
+            elif line_stripped[0] in "-*•":
                 content = line_stripped[1:].strip()
-                if isinstance(data.get(current_section_key), list):
-                    data[current_section_key].append(content)
-    
-    if 'profile' in data:
-        data['profile'] = data['profile'].strip()
-        
-    return data
\ No newline at end of file
+                if isinstance(self.data.get(current_section_key), list):
+                    self.data[current_section_key].append(content)
+
+def iter_ai_sections(chunks: Iterable[str], section_names: dict) -> Iterator[Tuple[str, Any]]:
+    """
+    يحول تدفق أجزاء النص إلى تدفق من الأقسام المكتملة (key, value) بمجرد إغلاق كل قسم.
+    """
+    parser = SectionStreamParser(section_names)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+def parse_ai_output(response_text: str, section_names: dict) -> dict:
+    """
+    يحلل استجابة الذكاء الاصطناعي بأي من الصيغتين: JSON (مسار سريع بعد التحقق من المخطط) أو markdown.
+    """
+    if response_text.lstrip()[:1] in ("{", "`"):
+        try:
+            return validate_ai_json(response_text, section_names)
+        except StructuredOutputError:
+            pass
+    return parse_ai_response(response_text, section_names)
+
+def parse_ai_response(response_text: str, section_names: dict) -> dict:
+    """
+    يحلل استجابة الذكاء الاصطناعي ويستخرج الأقسام المختلفة بناءً على الأسماء المخصصة.
+    """
+    parser = SectionStreamParser(section_names)
+    parser.feed(response_text)
+    parser.close()
+    return parser.data
@@ -2,20 +2,31 @@
 
 import tkinter as tk
 from tkinter import ttk # Added ttk import
+import copy
+import io
 import threading
 import queue
+import time
 from tkinter import filedialog, messagebox
-from openai import OpenAI
 
 from ui.main_window import MainWindow
-from api_handler import analyze_job_description, parse_ai_response
+from api_handler import (stream_job_description, SectionStreamParser, analyze_job_description, parse_ai_output,
+                         analyze_sections_parallel, load_generation_options, get_prompt_template, response_mode,
+                         DEFAULT_TEMPERATURE)
 from ui.reorder_dialog import ReorderDialog
 from ui.reset_dialog import ResetDialog
 from ui.about_window import AboutWindow
 from language import language_manager, _
 from settings_manager import settings_manager
 from reset_manager import ResetManager
-from path_utils import resource_path
+from path_utils import resource_path, atomic_write
+from response_cache import response_cache
+from client_registry import client_registry
+from request_policy import load_request_policy
+from jd_preprocessor import preprocess_job_description, load_preprocess_options
+from near_duplicate_index import find_reusable_result, remember_result
+from single_flight import request_coalescer
+from cancellation import CancellationToken, GenerationCancelled
 
 class AppController:
     def __init__(self, root):
@@ -30,6 +41,13 @@ class AppController:
             'profile', 'experiences', 'skills', 'interests', 'education', 'certifications', 'languages'
         ]
         self.section_order = settings_manager.load_settings('section_order', default_order)
+        # Cancellation token of the generation in progress (None when idle), its cache key,
+        # and the function that closes its window without cancelling the request
+        self.cancel_token = None
+        self.cancel_key = None
+        self.retire_generation = None
+        # AI sections of the last generated CV, shown in the live preview
+        self.last_ai_data = None
         
         self.main_view = MainWindow(root, self)
 
@@ -127,6 +145,7 @@ class AppController:
             self.section_order = dialog.result
             # Save section order to settings
             settings_manager.save_settings('section_order', self.section_order)
+            self.refresh_preview()
             messagebox.showinfo(_("success"), _("sections_order_saved"), parent=self.root)
 
 
@@ -148,22 +167,58 @@ class AppController:
             return
 
         provider = settings_info['provider']
-        headers = {}
-        if provider == "openrouter":
-            base_url = "https://openrouter.ai/api/v1"
-            if settings_info['http_referer']: headers["HTTP-Referer"] = settings_info['http_referer']
-            if settings_info['x_title']: headers["X-Title"] = settings_info['x_title']
-        else:
-            base_url = "https://api.openai.com/v1"
-        
         try:
-            client = OpenAI(api_key=api_key, base_url=base_url, default_headers=headers)
+            client = client_registry.get_client(provider, api_key, settings_info['http_referer'], settings_info['x_title'])
         except Exception as e:
             messagebox.showerror(_("api_error"), _("api_client_error", error=str(e)))
             return
 
+        # Timeouts, retries and (optionally) a hedged request to the other provider
+        policy = load_request_policy()
+        fallback = client_registry.get_fallback(provider, self.ai_settings_tab.provider_settings) if policy.hedge_enabled else None
+
+        job_text = job_desc
+        if settings_info.get('preprocess'):
+            # Drop boilerplate and duplicates before they cost prompt tokens
+            cleaned = preprocess_job_description(job_desc, load_preprocess_options()['job_desc_token_budget'])
+            print(cleaned.report())
+            job_text = cleaned.text
+
+        # Reuse a previous result when the same (or an almost identical) job description was already answered
+        # The response mode changes the prompt and the reply format, so it is part of the key
+        options = load_generation_options()
+        cache_key = response_cache.make_key(provider, model, job_text, excluded_terms, section_names, DEFAULT_TEMPERATURE,
+                                            **response_mode(options['output_format'], options['parallel_sections'],
+                                                            options['section_group_size']))
+        started = time.perf_counter()
+        prefetched = None
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            print(f"Response cache hit {cache_key[:12]} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+            prefetched = ("cached", cached['data'])
+        else:
+            match, data = find_reusable_result(job_text, section_names, excluded_terms)
+            if match and messagebox.askyesno(_("near_duplicate_title"),
+                                             _("near_duplicate_prompt", similarity=f"{match.similarity:.0%}"),
+                                             parent=self.root):
+                prefetched = ("near_duplicate", data)
+
         # --- Threading Implementation ---
 
+        # Starting a new generation abandons the previous one instead of leaving it running,
+        # unless it is the same request (e.g. a double click): then the new call joins the flight
+        # in request_coalescer, the old window is closed, and cancelling the new one aborts both
+        cancel_token = CancellationToken()
+        inherited_path = None
+        if self.cancel_token is not None:
+            if self.cancel_key == cache_key:
+                cancel_token.on_cancel(self.cancel_token.cancel)
+                inherited_path = self.retire_generation()
+            else:
+                self.cancel_token.cancel()
+        self.cancel_token = cancel_token
+        self.cancel_key = cache_key
+
         # 1. Create a non-modal "working" window
         working_window = tk.Toplevel(self.root)
         working_window.title(_("working"))
@@ -176,71 +231,252 @@ class AppController:
         except tk.TclError:
             pass
         ttk.Label(working_window, text=_("analyzing_job_description"), padding=20).pack()
+        # Sections are listed here as soon as the streamed response completes them
+        sections_label = ttk.Label(working_window, text="", padding=(20, 0, 20, 20), wraplength=400)
+        sections_label.pack()
+        received_sections = []
+        # The save location can be chosen while the AI is still working
+        save_label = ttk.Label(working_window, text="", padding=(20, 0, 20, 10), wraplength=400)
+        save_label.pack()
+        save_choice = {'path': inherited_path, 'dialog_open': False}
+        if inherited_path:
+            save_label.config(text=_("will_save_to", path=inherited_path))
+
+        def cancel_generation():
+            # Aborts the request (or stream); the worker exits and polling stops on the next tick
+            cancel_token.cancel()
+            working_window.destroy()
+            print("Generation cancelled")
+
+        retired = []
+
+        def retire_generation():
+            # Superseded by an identical request that shares this one's result: stop polling only
+            # and hand over the save location already chosen
+            retired.append(True)
+            working_window.destroy()
+            return save_choice['path']
+
+        self.retire_generation = retire_generation
+
+        ttk.Button(working_window, text=_("cancel"), command=cancel_generation).pack(pady=(0, 15))
+        working_window.protocol("WM_DELETE_WINDOW", cancel_generation)
         
         # Center the working window
-        self.root.update_idletasks()
-        x = self.root.winfo_x() + (self.root.winfo_width() // 2) - (working_window.winfo_reqwidth() // 2)
-        y = self.root.winfo_y() + (self.root.winfo_height() // 2) - (working_window.winfo_reqheight() // 2)
-        working_window.geometry(f"+{x}+{y}")
+        self._center_on_root(working_window)
+
+        def ask_save_path(parent):
+            save_choice['dialog_open'] = True
+            try:
+                return filedialog.asksaveasfilename(
+                    defaultextension=".docx",
+                    filetypes=[("Word Document", "*.docx")],
+                    initialfile=f"CV_{self.user_data['name']}.docx",
+                    parent=parent
+                )
+            finally:
+                save_choice['dialog_open'] = False
+
+        def ask_save_path_early():
+            # Overlaps the user's file choice with the generation time; cancelling it asks again at the end
+            if cancel_token.cancelled or retired or save_choice['path']:
+                return
+            path = ask_save_path(working_window)
+            if path and not cancel_token.cancelled and working_window.winfo_exists():
+                save_choice['path'] = path
+                save_label.config(text=_("will_save_to", path=path))
+
+        if settings_manager.load_settings('app_preferences', {}).get('ask_save_path_first', True):
+            self.root.after_idle(ask_save_path_early)
 
         # 2. Create a queue to communicate between threads
         result_queue = queue.Queue()
 
         # 3. Define the worker function to run in a separate thread
         def worker():
+            prompt = None  # compiled prompt template of the request, for its size in tokens
+
+            def store(ai_result, ai_data):
+                print(f"Response cache miss {cache_key[:12]} ({time.perf_counter() - started:.1f} s, "
+                      f"prompt ~{prompt.prompt_tokens(job_text)} tokens, {prompt.static_tokens} fixed)")
+                if not response_cache.is_cacheable(ai_data):
+                    # Nothing parsed (refusal or wrong format): let the next click ask the model again
+                    print(f"Response {cache_key[:12]} has no section content; not cached")
+                    return ai_data
+                response_cache.put(cache_key, ai_result, ai_data)
+                remember_result(job_text, section_names, excluded_terms, cache_key)
+                return ai_data
+
+            def generate():
+                nonlocal prompt
+                prompt = get_prompt_template(section_names, excluded_terms, options['output_format'])
+                if options['parallel_sections']:
+                    # One small request per section group, merged when the slowest one finishes
+                    self._get_cv_writer(template)
+                    return store(*analyze_sections_parallel(
+                        client, model, job_text, excluded_terms, section_names, DEFAULT_TEMPERATURE, policy, fallback,
+                        options['output_format'], options['section_group_size'],
+                        on_section=lambda key, _value: result_queue.put(("section", key)),
+                        cancel_token=cancel_token
+                    ))
+
+                if options['output_format'] == 'json':
+                    # Structured output: one JSON reply, validated against the section schema
+                    self._get_cv_writer(template)
+                    ai_result = analyze_job_description(client, model, job_text, excluded_terms, section_names,
+                                                        DEFAULT_TEMPERATURE, policy, fallback, output_format='json',
+                                                        cancel_token=cancel_token)
+                    if ai_result.startswith("Error"):
+                        raise RuntimeError(ai_result)
+                    return store(ai_result, parse_ai_output(ai_result, section_names))
+
+                # Stream the response and report every section as soon as its "###" block closes
+                parser = SectionStreamParser(section_names)
+                raw_parts = []
+                for piece in stream_job_description(client, model, job_text, excluded_terms, section_names,
+                                                    DEFAULT_TEMPERATURE, policy, fallback, cancel_token):
+                    if not raw_parts:
+                        # Warm up the document generator while the rest of the response arrives
+                        self._get_cv_writer(template)
+                    raw_parts.append(piece)
+                    for key, _value in parser.feed(piece):
+                        result_queue.put(("section", key))
+                for key, _value in parser.close():
+                    result_queue.put(("section", key))
+                return store("".join(raw_parts), parser.data)
+
             try:
-                ai_result = analyze_job_description(client, model, job_desc, excluded_terms, section_names)
-                if ai_result.startswith("Error"):
-                    result_queue.put(("error", ai_result))
+                if prefetched is not None:
+                    result_queue.put(prefetched)
                     return
-                
-                ai_data = parse_ai_response(ai_result, section_names)
+
+                # An identical request already in flight (e.g. a double click) is shared instead of sent again
+                ai_data, shared = request_coalescer.do(cache_key, generate, cancel_token)
+                if shared:
+                    print(f"Joined in-flight request {cache_key[:12]} ({request_coalescer.stats()['coalesced']} coalesced so far)")
                 result_queue.put(("success", ai_data))
+            except GenerationCancelled:
+                print(f"Request {cache_key[:12]} cancelled")
             except Exception as e:
-                result_queue.put(("error", str(e)))
+                message = str(e)
+                result_queue.put(("error", message if message.startswith("Error") else f"Error: {message}"))
 
         # 4. Start the worker thread
         threading.Thread(target=worker, daemon=True).start()
 
         # 5. Define a function to check the queue and process the result in the main thread
+        final_result = []
+
         def check_queue():
+            if cancel_token.cancelled or retired:
+                return  # cancelled or superseded: stop polling, the worker has been released
             try:
-                status, data = result_queue.get_nowait()
-                
-                # Close the "working" window
-                working_window.destroy()
-
-                if status == "success":
-                    ai_data = data
-                    save_path = filedialog.asksaveasfilename(
-                        defaultextension=".docx",
-                        filetypes=[("Word Document", "*.docx")],
-                        initialfile=f"CV_{self.user_data['name']}.docx",
-                        parent=self.root
-                    )
-                    if not save_path:
-                        return
-
-                    try:
-                        if template == 'professional':
-                            from doc_generator1 import write_cv
-                        else:
-                            from doc_generator import write_cv
-
-                        write_cv(self.user_data, ai_data, save_path, section_names, self.section_order)
-                        messagebox.showinfo(_("completed_successfully"), _("cv_created_successfully", path=save_path), parent=self.root)
-                    except Exception as e:
-                        messagebox.showerror(_("write_error"), _("save_failed", error=str(e)), parent=self.root)
-                else: # status == "error"
-                    messagebox.showerror(_("api_error"), data, parent=self.root)
-
+                # Drain progress messages before looking for the final result
+                while not final_result:
+                    status, data = result_queue.get_nowait()
+                    if status != "section":
+                        final_result.append((status, data))
+                    elif data not in received_sections:
+                        received_sections.append(data)
+                        names = [section_names.get(key, key) for key in received_sections]
+                        sections_label.config(text=_("sections_received", sections=", ".join(names)))
             except queue.Empty:
-                # If the queue is empty, check again after 100ms
+                pass
+            if not final_result or save_choice['dialog_open']:
+                # Still working (or the save dialog is open): check again after 100ms
                 self.root.after(100, check_queue)
+                return
+
+            # Close the "working" window
+            working_window.destroy()
+            if self.cancel_token is cancel_token:
+                self.cancel_token = self.cancel_key = self.retire_generation = None
+
+            status, data = final_result[0]
+            if status not in ("success", "cached", "near_duplicate"):
+                messagebox.showerror(_("api_error"), data, parent=self.root)
+                return
+            self.last_ai_data = data
+            self.refresh_preview()
+
+            save_path = save_choice['path'] or ask_save_path(self.root)
+            if not save_path:
+                return
+            message = _("cv_created_successfully", path=save_path)
+            if status == "cached":
+                message += "\n\n" + _("loaded_from_cache")
+            elif status == "near_duplicate":
+                message += "\n\n" + _("reused_near_duplicate")
+            self._save_cv_in_background(template, data, save_path, section_names, message)
 
         # 6. Start polling the queue
         self.root.after(100, check_queue)
 
+    def _save_cv_in_background(self, template, ai_data, save_path, section_names, success_message):
+        """
+        Renders the CV into memory and writes it to save_path atomically on a worker thread,
+        while the main window stays responsive and shows progress.
+        """
+        saving_window = tk.Toplevel(self.root)
+        saving_window.title(_("working"))
+        saving_window.transient(self.root)
+        saving_window.grab_set()
+        saving_window.resizable(False, False)
+        saving_window.protocol("WM_DELETE_WINDOW", lambda: None)  # the file is being written
+        try:
+            saving_window.iconbitmap(resource_path("icon/icon.ico"))
+        except tk.TclError:
+            pass
+        ttk.Label(saving_window, text=_("saving_cv"), padding=20).pack()
+        progress = ttk.Progressbar(saving_window, mode='indeterminate', length=280)
+        progress.pack(padx=20, pady=(0, 20))
+        progress.start(10)
+        self._center_on_root(saving_window)
+
+        # Snapshot of the data, so edits made while saving do not change this CV
+        user_data = copy.deepcopy(self.user_data)
+        section_order = list(self.section_order)
+        done_queue = queue.Queue()
+
+        def render_and_save():
+            try:
+                buffer = io.BytesIO()
+                write_cv = self._get_cv_writer(template)
+                write_cv(user_data, ai_data, buffer, section_names, section_order)
+                atomic_write(save_path, buffer.getvalue())
+                done_queue.put(None)
+            except Exception as e:
+                done_queue.put(e)
+
+        threading.Thread(target=render_and_save, daemon=True).start()
+
+        def check_done():
+            try:
+                error = done_queue.get_nowait()
+            except queue.Empty:
+                self.root.after(50, check_done)
+                return
+            progress.stop()
+            saving_window.destroy()
+            if error is None:
+                messagebox.showinfo(_("completed_successfully"), success_message, parent=self.root)
+            else:
+                messagebox.showerror(_("write_error"), _("save_failed", error=str(error)), parent=self.root)
+
+        self.root.after(50, check_done)
+
+    def _center_on_root(self, window):
+        self.root.update_idletasks()
+        x = self.root.winfo_x() + (self.root.winfo_width() // 2) - (window.winfo_reqwidth() // 2)
+        y = self.root.winfo_y() + (self.root.winfo_height() // 2) - (window.winfo_reqheight() // 2)
+        window.geometry(f"+{x}+{y}")
+
+    @staticmethod
+    def _get_cv_writer(template):
+        """Return the write_cv function of the selected template for the configured render backend."""
+        from cv_templates import get_cv_writer, load_render_backend
+        return get_cv_writer(template, load_render_backend())
+
     def add_or_update_item(self, key, item_data, index=None):
         if index is None:
             self.user_data[key].append(item_data)
@@ -248,6 +484,12 @@ class AppController:
             self.user_data[key][index] = item_data
         self.main_view.user_info_tab.refresh_listbox(key)
 
+    def refresh_preview(self):
+        """Schedules an update of the live preview (bursts debounced, rendered off the main thread)."""
+        template_tab = getattr(self, 'template_tab', None)
+        if template_tab is not None:
+            template_tab.preview.schedule_refresh()
+
     def delete_item(self, key, index):
         if 0 <= index < len(self.user_data[key]):
             del self.user_data[key][index]
@@ -286,6 +528,10 @@ class AppController:
 
     def on_closing(self):
         """Handle application closing - save all settings before exit."""
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+        if hasattr(self, 'template_tab') and self.template_tab:
+            self.template_tab.preview.close()
         try:
             # Save AI settings and provider preference
             if hasattr(self, 'ai_settings_tab') and self.ai_settings_tab:
@@ -316,5 +562,6 @@ class AppController:
         except Exception as e:
             print(f"Error saving settings on close: {e}")
         finally:
-            # Close the application
+            # Release pooled AI connections and close the application
+            client_registry.close_all()
             self.root.destroy()
\ No newline at end of file
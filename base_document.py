@@ -0,0 +1,193 @@
+# base_document.py
+# مستند وورد أساسي مصغّر: قالب python-docx الافتراضي بعد حذف الأنماط والأجزاء التي لا تستخدمها السيرة الذاتية،
+# يُبنى مرة واحدة في الذاكرة ويُستخدم أساساً لكل القوالب
+
+import io
+import os
+import zipfile
+from functools import lru_cache
+
+from lxml import etree
+
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_NS = {'w': _W}
+_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_TYPES = "http://schemas.openxmlformats.org/package/2006/content-types"
+_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_VAL = f"{{{_W}}}val"
+# w:rFonts theme reference attribute -> the explicit font attribute it stands for
+_THEME_ATTRIBUTES = {'asciiTheme': 'ascii', 'hAnsiTheme': 'hAnsi', 'eastAsiaTheme': 'eastAsia', 'cstheme': 'cs'}
+# Theme reference suffix (minorBidi, majorHAnsi, ...) -> theme font slot and the w:lang attribute choosing its script
+_THEME_SLOTS = {'Ascii': ('latin', 'val'), 'HAnsi': ('latin', 'val'), 'EastAsia': ('ea', 'eastAsia'),
+                'Bidi': ('cs', 'bidi')}
+# Language -> theme script font (a:font script="...")
+_SCRIPTS = {'ar': 'Arab', 'fa': 'Arab', 'ur': 'Arab', 'he': 'Hebr', 'ja': 'Jpan', 'ko': 'Hang', 'zh': 'Hans'}
+
+# Parts of python-docx's default template a CV never uses (the theme only supplies the fonts that theme
+# references resolve to; they are written out as explicit font names before it is dropped)
+_UNUSED_PARTS = ('word/stylesWithEffects.xml', 'word/webSettings.xml', 'word/theme/', 'docProps/thumbnail.jpeg',
+                 'customXml/')
+
+
+def _default_template() -> bytes:
+    import docx
+    with open(os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx'), 'rb') as f:
+        return f.read()
+
+
+def _unused(name: str) -> bool:
+    return any(name == part or (part.endswith('/') and name.startswith(part)) for part in _UNUSED_PARTS)
+
+
+def _serialize(root) -> bytes:
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _theme_fonts(theme_xml: bytes, languages: dict) -> dict:
+    """
+    {theme reference: typeface}, e.g. 'minorBidi' -> 'Arial': the theme's script font for the language
+    of that slot (Arabic -> its Arab font), else its plain latin/ea/cs font; empty ones are left out.
+    """
+    root = etree.fromstring(theme_xml)
+    fonts = {}
+    for prefix in ('major', 'minor'):
+        collection = root.find(f".//{{{_A}}}{prefix}Font")
+        if collection is None:
+            continue
+        scripts = {font.get('script'): font.get('typeface') for font in collection.iterfind(f"{{{_A}}}font")}
+        for suffix, (slot, lang) in _THEME_SLOTS.items():
+            plain = collection.find(f"{{{_A}}}{slot}")
+            typeface = scripts.get(_SCRIPTS.get((languages.get(lang) or "").split("-")[0].lower()))
+            typeface = typeface or (plain.get('typeface') if plain is not None else None)
+            if typeface:
+                fonts[prefix + suffix] = typeface
+    return fonts
+
+
+def _languages(styles_xml: bytes, settings_xml: bytes) -> dict:
+    """Languages that pick theme script fonts: w:themeFontLang, else the default run language."""
+    languages = {}
+    default = etree.fromstring(styles_xml).find('w:docDefaults/w:rPrDefault/w:rPr/w:lang', _NS)
+    theme = etree.fromstring(settings_xml).find('w:themeFontLang', _NS)
+    for element in (default, theme):
+        if element is not None:
+            languages.update({name: element.get(f"{{{_W}}}{name}") for name in ('val', 'eastAsia', 'bidi')
+                              if element.get(f"{{{_W}}}{name}")})
+    return languages
+
+
+def _strip_styles(styles_xml: bytes, keep: tuple, fonts: dict) -> tuple:
+    """
+    styles.xml with only the default styles, the named ones and the styles they are based on;
+    no latent style table, and theme font references replaced with the fonts they resolve to
+    (fonts, see _theme_fonts) so complex-script (Arabic) and East Asian text keep their font
+    without the theme part. Returns (xml, numIds the kept styles use).
+    """
+    root = etree.fromstring(styles_xml)
+    styles = {style.get(f"{{{_W}}}styleId"): style for style in root.iterfind('w:style', _NS)}
+    names = {style.find('w:name', _NS).get(_VAL): style_id for style_id, style in styles.items()
+             if style.find('w:name', _NS) is not None}
+
+    wanted = [style_id for style_id, style in styles.items() if style.get(f"{{{_W}}}default") in ("1", "true")]
+    wanted += [names[name] for name in keep if name in names]
+    kept = set()
+    while wanted:
+        style_id = wanted.pop()
+        if style_id in kept or style_id not in styles:
+            continue
+        kept.add(style_id)
+        based_on = styles[style_id].find('w:basedOn', _NS)
+        if based_on is not None:
+            wanted.append(based_on.get(_VAL))
+
+    num_ids = set()
+    for style_id, style in styles.items():
+        if style_id not in kept:
+            root.remove(style)
+            continue
+        # Links to styles that are gone, and revision ids, are dropped with them
+        for child in style.findall('w:next', _NS) + style.findall('w:link', _NS):
+            if child.get(_VAL) not in kept:
+                style.remove(child)
+        for rsid in style.findall('w:rsid', _NS):
+            style.remove(rsid)
+        num_ids.update(num.get(_VAL) for num in style.iterfind('w:pPr/w:numPr/w:numId', _NS))
+
+    latent = root.find('w:latentStyles', _NS)
+    if latent is not None:
+        root.remove(latent)
+    for rfonts in root.iter(f"{{{_W}}}rFonts"):
+        for reference, explicit in _THEME_ATTRIBUTES.items():
+            typeface = fonts.get(rfonts.attrib.pop(f"{{{_W}}}{reference}", None))
+            if typeface and f"{{{_W}}}{explicit}" not in rfonts.attrib:
+                rfonts.set(f"{{{_W}}}{explicit}", typeface)
+        if not rfonts.attrib:
+            rfonts.getparent().remove(rfonts)
+    return _serialize(root), num_ids
+
+
+def _strip_numbering(numbering_xml: bytes, num_ids: set) -> bytes:
+    """numbering.xml with only the list definitions the kept styles use."""
+    root = etree.fromstring(numbering_xml)
+    abstract_ids = set()
+    for num in root.findall('w:num', _NS):
+        if num.get(f"{{{_W}}}numId") in num_ids:
+            abstract_ids.add(num.find('w:abstractNumId', _NS).get(_VAL))
+        else:
+            root.remove(num)
+    for abstract in root.findall('w:abstractNum', _NS):
+        if abstract.get(f"{{{_W}}}abstractNumId") not in abstract_ids:
+            root.remove(abstract)
+    return _serialize(root)
+
+
+def _strip_relationships(rels_xml: bytes, rels_name: str) -> bytes:
+    """A .rels part without the relationships that point at removed parts."""
+    root = etree.fromstring(rels_xml)
+    # Targets are relative to the folder that holds the _rels folder
+    base = os.path.dirname(os.path.dirname(rels_name))
+    for rel in root.findall(f"{{{_RELS}}}Relationship"):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = os.path.normpath(os.path.join(base, rel.get('Target'))).replace(os.sep, '/').lstrip('/')
+        if _unused(target):
+            root.remove(rel)
+    return _serialize(root)
+
+
+def _strip_content_types(types_xml: bytes) -> bytes:
+    root = etree.fromstring(types_xml)
+    for override in root.findall(f"{{{_TYPES}}}Override"):
+        if _unused(override.get('PartName').lstrip('/')):
+            root.remove(override)
+    return _serialize(root)
+
+
+@lru_cache(maxsize=None)
+def base_package(keep_styles: tuple = ('List Bullet',)) -> bytes:
+    """
+    python-docx's default template cut down to what a CV uses: the default styles plus keep_styles
+    (and what they are based on), the list definition behind List Bullet, and no theme, latent styles,
+    stylesWithEffects, web settings, custom XML or thumbnail. Built once per process; every template
+    is compiled from it, so neither the renders nor the saved files carry the unused parts.
+    """
+    with zipfile.ZipFile(io.BytesIO(_default_template())) as archive:
+        parts = [(name, archive.read(name)) for name in archive.namelist() if not _unused(name)]
+
+        theme_xml = archive.read('word/theme/theme1.xml')
+
+    contents = dict(parts)
+    fonts = _theme_fonts(theme_xml, _languages(contents['word/styles.xml'], contents['word/settings.xml']))
+    styles_xml, num_ids = _strip_styles(contents['word/styles.xml'], keep_styles, fonts)
+    contents['word/styles.xml'] = styles_xml
+    contents['word/numbering.xml'] = _strip_numbering(contents['word/numbering.xml'], num_ids)
+    contents['[Content_Types].xml'] = _strip_content_types(contents['[Content_Types].xml'])
+    for name in contents:
+        if name.endswith('.rels'):
+            contents[name] = _strip_relationships(contents[name], name)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, _data in parts:
+            archive.writestr(name, contents[name])
+    return buffer.getvalue()
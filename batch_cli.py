@@ -0,0 +1,375 @@
+# batch_cli.py
+# واجهة سطر أوامر لإنشاء سير ذاتية لعدة أوصاف وظيفية دفعة واحدة (بدون واجهة رسومية)
+
+"""
+Headless batch mode: tailors the saved profile to every job description in a
+folder (*.txt / *.md) or a JSONL file, without importing tkinter.
+
+    python batch_cli.py jobs/ -o out/ --concurrency 8
+    python batch_cli.py jobs.jsonl -o out/ --template professional
+
+LLM calls run concurrently under a bounded asyncio semaphore and the .docx
+files are rendered in a process pool. Finished jobs are recorded in a state
+file inside the output folder, so an interrupted run can simply be started
+again and continues where it stopped.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+from api_handler import (analyze_job_description, analyze_sections_parallel, parse_ai_output, load_generation_options,
+                         get_prompt_template, response_mode, DEFAULT_TEMPERATURE)
+from client_registry import client_registry
+from request_policy import load_request_policy
+from jd_preprocessor import preprocess_job_description, load_preprocess_options
+from near_duplicate_index import find_reusable_result, remember_result, load_similarity_threshold
+from single_flight import request_coalescer
+from cancellation import CancellationToken, GenerationCancelled
+from rate_limiter import rate_limiter
+from cv_templates import RENDER_BACKENDS, TEMPLATES, load_render_backend
+from render_service import RenderService
+from response_cache import response_cache
+from settings_manager import settings_manager
+
+STATE_FILE_NAME = '.batch_state.jsonl'
+JOB_FILE_EXTENSIONS = ('.txt', '.md')
+DEFAULT_SECTION_ORDER = [
+    'profile', 'experiences', 'skills', 'interests', 'education', 'certifications', 'languages'
+]
+
+
+def load_profile() -> dict:
+    """
+    Load the saved profile and settings exactly as the GUI would see them.
+    Returns user_data, section_names, section_order, template and the active provider settings.
+    """
+    personal_info = settings_manager.load_settings('personal_info', {})
+    user_data = {
+        'name': '', 'title': '', 'email': '', 'linkedin': '', 'phone': '', 'location': '',
+        'university': '', 'degree': '',
+        'certifications': [], 'languages': [], 'experiences': []
+    }
+    user_data.update(personal_info)
+    user_data['experiences'] = settings_manager.load_settings('user_experiences', [])
+    user_data['certifications'] = settings_manager.load_settings('user_certifications', [])
+    user_data['languages'] = settings_manager.load_settings('user_languages', [])
+
+    # Same defaults as SettingsTab when no custom sections were saved
+    section_names = settings_manager.load_settings('section_names', {})
+    if not section_names.get('profile'):
+        section_names['profile'] = 'Profile Summary'
+    if len(section_names) == 1:
+        section_names.update({'skills': 'Skills', 'interests': 'Interests'})
+
+    preferences = settings_manager.load_settings('app_preferences', {})
+    provider = preferences.get('selected_ai_provider', 'openai')
+    providers = settings_manager.load_settings('ai_providers', {})
+
+    return {
+        'user_data': user_data,
+        'section_names': section_names,
+        'section_order': settings_manager.load_settings('section_order', DEFAULT_SECTION_ORDER),
+        'template': preferences.get('selected_template', 'modern'),
+        'backend': load_render_backend(),
+        'provider': provider,
+        'provider_settings': providers.get(provider, {}),
+        'all_provider_settings': providers,
+    }
+
+
+def read_jobs(source: str) -> list:
+    """
+    Read job descriptions from a directory of text files or from a JSONL file ('-' for stdin).
+    JSONL lines need a 'job_desc' (or 'text' / 'description') field and may carry an 'id'.
+    """
+    jobs = []
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if os.path.isfile(path) and name.lower().endswith(JOB_FILE_EXTENSIONS):
+                with open(path, 'r', encoding='utf-8') as f:
+                    jobs.append({'id': os.path.splitext(name)[0], 'job_desc': f.read()})
+        return jobs
+
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping line {line_number}: invalid JSON ({e})")
+                continue
+            job_desc = record.get('job_desc') or record.get('text') or record.get('description')
+            if not job_desc:
+                print(f"Skipping line {line_number}: no job description field")
+                continue
+            jobs.append({'id': str(record.get('id', line_number)), 'job_desc': job_desc})
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return jobs
+
+
+def load_completed(output_dir: str) -> set:
+    """Return the ids already rendered by a previous (possibly interrupted) run."""
+    completed = set()
+    state_path = os.path.join(output_dir, STATE_FILE_NAME)
+    if not os.path.exists(state_path):
+        return completed
+    with open(state_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by the interruption
+            if os.path.exists(record.get('output', '')):
+                completed.add(record['id'])
+    return completed
+
+
+def output_path_for(output_dir: str, user_name: str, job_id: str) -> str:
+    safe_name = re.sub(r'[^\w.-]+', '_', f"CV_{user_name}_{job_id}", flags=re.UNICODE).strip('_')
+    return os.path.join(output_dir, f"{safe_name}.docx")
+
+
+class BatchRunner:
+    """Runs the analyze → parse → render pipeline for many job descriptions."""
+
+    def __init__(self, profile: dict, output_dir: str, client, model: str, excluded_terms: list,
+                 concurrency: int = 4, workers: int = None, policy=None, fallback=None, preprocess: bool = True,
+                 token_budget: int = 0, output_format: str = 'markdown', parallel_sections: bool = False,
+                 group_size: int = 1, near_duplicates: bool = True, similarity: float = 0.85):
+        self.profile = profile
+        self.near_duplicates = near_duplicates
+        self.similarity = similarity
+        self.output_format = output_format
+        self.parallel_sections = parallel_sections
+        self.group_size = group_size
+        self.preprocess = preprocess
+        self.token_budget = token_budget
+        self.output_dir = output_dir
+        self.client = client
+        self.policy = policy
+        self.fallback = fallback
+        self.model = model
+        self.excluded_terms = excluded_terms
+        self.concurrency = max(1, concurrency)
+        self.workers = workers
+        self.state_path = os.path.join(output_dir, STATE_FILE_NAME)
+        # Cancelled on Ctrl-C so outstanding requests, retries and streams stop promptly
+        self.cancel_token = CancellationToken()
+        self.stats = {'done': 0, 'skipped': 0, 'failed': 0, 'cached': 0, 'near_duplicates': 0, 'coalesced': 0,
+                      'tokens_saved': 0, 'prompt_tokens': 0}
+        self.started = None
+
+    def throughput(self) -> float:
+        """CVs rendered per minute since the run started."""
+        elapsed = time.perf_counter() - self.started if self.started else 0
+        return self.stats['done'] / elapsed * 60 if elapsed > 0 else 0.0
+
+    def _analyze(self, job_desc: str, job_id: str = ""):
+        """
+        Blocking LLM call behind the shared response cache and near-duplicate index.
+        Returns (ai_data, source, tokens_saved, prompt_tokens) with source '', 'cache', 'near-duplicate' or
+        'coalesced' and prompt_tokens the estimated prompt size (0 when no request was sent); raises on failure.
+        """
+        section_names = self.profile['section_names']
+        tokens_saved = 0
+        if self.preprocess:
+            cleaned = preprocess_job_description(job_desc, self.token_budget)
+            tokens_saved = cleaned.tokens_saved
+            job_desc = cleaned.text
+        cache_key = response_cache.make_key(self.profile['provider'], self.model, job_desc, self.excluded_terms,
+                                            section_names, DEFAULT_TEMPERATURE,
+                                            **response_mode(self.output_format, self.parallel_sections, self.group_size))
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached['data'], 'cache', tokens_saved, 0
+        if self.near_duplicates:
+            match, data = find_reusable_result(job_desc, section_names, self.excluded_terms, self.similarity)
+            if match:
+                return data, 'near-duplicate', tokens_saved, 0
+
+        def generate():
+            if self.parallel_sections:
+                ai_result, ai_data = analyze_sections_parallel(self.client, self.model, job_desc, self.excluded_terms,
+                                                               section_names, DEFAULT_TEMPERATURE, self.policy,
+                                                               self.fallback, self.output_format, self.group_size,
+                                                               cancel_token=self.cancel_token)
+            else:
+                ai_result = analyze_job_description(self.client, self.model, job_desc, self.excluded_terms, section_names,
+                                                    DEFAULT_TEMPERATURE, self.policy, self.fallback, self.output_format,
+                                                    self.cancel_token)
+                if ai_result.startswith("Error"):
+                    raise RuntimeError(ai_result)
+                ai_data = parse_ai_output(ai_result, section_names)
+            if response_cache.is_cacheable(ai_data):
+                response_cache.put(cache_key, ai_result, ai_data)
+                remember_result(job_desc, section_names, self.excluded_terms, cache_key, job_id)
+            else:
+                print(f"[{job_id}] Response has no section content; not cached")
+            return ai_data
+
+        # Duplicate postings running at the same time share one LLM call
+        ai_data, shared = request_coalescer.do(cache_key, generate, self.cancel_token)
+        if shared:
+            return ai_data, 'coalesced', tokens_saved, 0
+        return ai_data, '', tokens_saved, get_prompt_template(section_names, self.excluded_terms,
+                                                              self.output_format).prompt_tokens(job_desc)
+
+    async def _run_job(self, job, semaphore, renderer, state_file, total):
+        try:
+            self.cancel_token.raise_if_cancelled()
+            async with semaphore:
+                ai_data, source, tokens_saved, prompt_tokens = await asyncio.to_thread(self._analyze, job['job_desc'],
+                                                                                       job['id'])
+            output = output_path_for(self.output_dir, self.profile['user_data'].get('name', ''), job['id'])
+            await asyncio.wrap_future(renderer.submit({'ai_data': ai_data, 'output': output}))
+        except GenerationCancelled:
+            return  # not recorded, so a rerun picks the job up again
+        except Exception as e:
+            self.stats['failed'] += 1
+            print(f"[{job['id']}] failed: {e}")
+            return
+
+        state_file.write(json.dumps({'id': job['id'], 'output': output, 'finished': time.time()}, ensure_ascii=False) + "\n")
+        state_file.flush()
+        self.stats['done'] += 1
+        self.stats['tokens_saved'] += tokens_saved
+        self.stats['prompt_tokens'] += prompt_tokens
+        if source == 'cache':
+            self.stats['cached'] += 1
+        elif source == 'near-duplicate':
+            self.stats['near_duplicates'] += 1
+        elif source == 'coalesced':
+            self.stats['coalesced'] += 1
+        finished = self.stats['done'] + self.stats['failed']
+        print(f"[{finished}/{total}] {job['id']} -> {output}{f' ({source})' if source else ''}"
+              f"{f' (prompt ~{prompt_tokens} tokens)' if prompt_tokens else ''}"
+              f"{f' (-{tokens_saved} tokens)' if tokens_saved else ''} "
+              f"| {self.throughput():.1f} CVs/min")
+
+    async def run(self, jobs: list):
+        os.makedirs(self.output_dir, exist_ok=True)
+        completed = load_completed(self.output_dir)
+        pending = [job for job in jobs if job['id'] not in completed]
+        self.stats['skipped'] = len(jobs) - len(pending)
+        if self.stats['skipped']:
+            print(f"Resuming: {self.stats['skipped']} job(s) already done, {len(pending)} remaining")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self.started = time.perf_counter()
+        # The profile is the same for every job: the render workers receive it once, at start-up
+        profile_fields = {
+            'user_data': self.profile['user_data'], 'template': self.profile['template'],
+            'section_names': self.profile['section_names'], 'section_order': self.profile['section_order'],
+        }
+        backend = self.profile.get('backend', 'docx')
+        with RenderService(self.workers, [self.profile['template']], backend, profile_fields) as renderer, \
+                open(self.state_path, 'a', encoding='utf-8') as state_file:
+            try:
+                await asyncio.gather(*(self._run_job(job, semaphore, renderer, state_file, len(pending))
+                                       for job in pending))
+            except asyncio.CancelledError:
+                # Ctrl-C: release the worker threads now instead of waiting for their requests to finish
+                self.cancel_token.cancel()
+                raise
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate tailored CVs for many job descriptions without the GUI.")
+    parser.add_argument('source', help="Folder of .txt/.md job descriptions, a .jsonl file, or '-' for JSONL on stdin")
+    parser.add_argument('-o', '--output-dir', default='batch_output', help="Where the .docx files are written")
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help="Maximum concurrent LLM requests")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Render processes (default: CPU count)")
+    parser.add_argument('--template', choices=list(TEMPLATES), help="Override the saved template")
+    parser.add_argument('--backend', choices=RENDER_BACKENDS,
+                        help="Document writer: python-docx ('docx') or the direct XML writer ('ooxml', faster)")
+    parser.add_argument('--model', help="Override the saved model name")
+    parser.add_argument('--exclude', default='', help="Comma-separated words the AI must not use")
+    parser.add_argument('--no-preprocess', action='store_true', help="Send job descriptions as-is (no boilerplate/duplicate removal)")
+    parser.add_argument('--token-budget', type=int, default=None, help="Truncate each cleaned job description to this many tokens")
+    parser.add_argument('--output-format', choices=['markdown', 'json'], default=None,
+                        help="Ask for markdown headings or a schema-validated JSON object (default: saved setting)")
+    parser.add_argument('--parallel-sections', action='store_true', help="One concurrent request per section group, merged afterwards")
+    parser.add_argument('--group-size', type=int, default=None, help="Sections per request with --parallel-sections (default: 1)")
+    parser.add_argument('--no-near-duplicates', action='store_true',
+                        help="Always call the AI, even for reposts of job descriptions analyzed before")
+    parser.add_argument('--similarity', type=float, default=None,
+                        help="Minimum similarity (0-1) for reusing a near-duplicate's result (default: 0.85)")
+    parser.add_argument('--hedge', action='store_true', help="Send a backup request to the other provider when a response is slow")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+
+    profile = load_profile()
+    if args.template:
+        profile['template'] = args.template
+    if args.backend:
+        profile['backend'] = args.backend
+    provider_settings = profile['provider_settings']
+    model = args.model or provider_settings.get('model') or 'gpt-4o'
+    if not profile['user_data'].get('name') or not provider_settings.get('api_key'):
+        print("The saved profile needs at least a name and an API key (set them once in the GUI).")
+        return 2
+
+    jobs = read_jobs(args.source)
+    if not jobs:
+        print("No job descriptions found.")
+        return 1
+
+    client = client_registry.get_client(profile['provider'], provider_settings['api_key'],
+                           provider_settings.get('http_referer'), provider_settings.get('x_title'))
+    excluded_terms = [t.strip() for t in args.exclude.split(',') if t.strip()]
+    policy = load_request_policy()
+    if args.hedge:
+        policy.hedge_enabled = True
+    fallback = client_registry.get_fallback(profile['provider'], profile['all_provider_settings']) if policy.hedge_enabled else None
+    preprocess_options = load_preprocess_options()
+    preprocess = preprocess_options['preprocess_job_desc'] and not args.no_preprocess
+    token_budget = args.token_budget if args.token_budget is not None else preprocess_options['job_desc_token_budget']
+    generation = load_generation_options()
+    runner = BatchRunner(profile, args.output_dir, client, model, excluded_terms, args.concurrency, args.workers,
+                         policy, fallback, preprocess, token_budget, args.output_format or generation['output_format'],
+                         args.parallel_sections or generation['parallel_sections'],
+                         args.group_size if args.group_size is not None else generation['section_group_size'],
+                         not args.no_near_duplicates,
+                         args.similarity if args.similarity is not None else load_similarity_threshold())
+
+    try:
+        asyncio.run(runner.run(jobs))
+    except KeyboardInterrupt:
+        print("\nInterrupted - finished CVs are recorded; run the same command again to resume.")
+        return 130
+    finally:
+        client_registry.close_all()
+        elapsed = time.perf_counter() - runner.started if runner.started else 0
+        stats = runner.stats
+        print(f"Done: {stats['done']} rendered ({stats['cached']} from cache, {stats['near_duplicates']} near-duplicates, "
+              f"{stats['coalesced']} coalesced with identical in-flight requests), "
+              f"{stats['failed']} failed, "
+              f"{stats['skipped']} skipped in {elapsed:.1f} s - {runner.throughput():.1f} CVs/min")
+        if stats['prompt_tokens']:
+            print(f"Prompts sent: ~{stats['prompt_tokens']} tokens")
+        if runner.preprocess:
+            print(f"Job description preprocessing saved ~{stats['tokens_saved']} prompt tokens")
+        limits = rate_limiter.stats()
+        if limits['queued'] or limits['rate_limited']:
+            print(f"Rate limits: {limits['queued']} request(s) queued for {limits['queued_seconds']:.1f} s in total, "
+                  f"{limits['rate_limited']} answered with 429")
+
+    return 1 if runner.stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# benchmarks/bench_backends.py
+# مقارنة محركي إنشاء ملف الوورد (python-docx والكاتب المباشر لـ XML) من حيث السرعة والذاكرة
+
+"""
+Renders the same CVs with the python-docx backend and the direct OOXML writer
+and reports throughput, per-CV latency and peak traced memory for each
+template and CV size. The first run of each backend is excluded (imports and
+the writer's one-off package skeleton).
+
+    python -m benchmarks.bench_backends
+    python -m benchmarks.bench_backends --runs 50 --experiences 4,40 --bullets 6
+"""
+
+import argparse
+import io
+import time
+import tracemalloc
+
+from cv_templates import RENDER_BACKENDS, get_cv_writer
+from benchmarks.bench_utils import (SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER, format_table, sample_user_data,
+                                    summarize)
+
+AI_DATA = {
+    'profile': "Engineer with a track record of shipping reliable services.",
+    'skills': [f"Skill {i}" for i in range(12)],
+    'interests': ["Open source", "Mentoring", "Cycling"],
+}
+
+
+def render(write_cv, user_data) -> int:
+    buffer = io.BytesIO()
+    write_cv(user_data, AI_DATA, buffer, SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER)
+    return len(buffer.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="python-docx vs direct OOXML rendering.")
+    parser.add_argument('--runs', type=int, default=30, help="Renders per backend, template and size")
+    parser.add_argument('--experiences', default="4,40", help="Experience counts (CV sizes) to render")
+    parser.add_argument('--bullets', type=int, default=5, help="Bullets per experience")
+    args = parser.parse_args()
+
+    rows = []
+    for template in ('modern', 'professional'):
+        for experiences in (int(v) for v in args.experiences.split(',')):
+            user_data = sample_user_data(experiences, args.bullets)
+            for backend in RENDER_BACKENDS:
+                write_cv = get_cv_writer(template, backend)
+                render(write_cv, user_data)  # warm-up
+
+                timings = []
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    size = render(write_cv, user_data)
+                    timings.append(time.perf_counter() - started)
+
+                tracemalloc.start()
+                render(write_cv, user_data)
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                stats = summarize(timings)
+                rows.append([template, experiences, backend, f"{stats['p50'] * 1e3:.1f}", f"{stats['p95'] * 1e3:.1f}",
+                             f"{1 / stats['mean']:.0f}", f"{peak / 1024:.0f}", f"{size / 1024:.1f}"])
+
+    print(format_table(['template', 'experiences', 'backend', 'p50 ms', 'p95 ms', 'CVs/s', 'peak KiB', 'docx KiB'],
+                       rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_doc_size.py
+# قياس حجم ملف الوورد الناتج (والملف document.xml داخله) وزمن إنشائه لكل قالب وطريقة إنشاء
+
+"""
+Renders a sample CV with every template and backend and reports the .docx size,
+the uncompressed size of word/document.xml and word/styles.xml, the number of
+runs carrying their own formatting (w:rPr), the median write time, the CPU time
+per CV over the whole batch of writes and, for the docx backend, the time
+python-docx takes to load the template's base package (paid on every render).
+
+    python -m benchmarks.bench_doc_size
+    python -m benchmarks.bench_doc_size --runs 100 --experiences 20
+"""
+
+import argparse
+import io
+import time
+import zipfile
+
+from docx import Document
+
+from cv_templates import RENDER_BACKENDS, TEMPLATES, get_cv_writer, get_template
+from fragment_cache import fragment_cache
+from benchmarks.bench_utils import SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER, format_table, sample_user_data, summarize
+
+AI_DATA = {
+    'profile': "Engineer with a track record of shipping reliable services.",
+    'skills': [f"Skill {i}" for i in range(12)],
+    'interests': ["Open source", "Mentoring", "Cycling"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Output size and write time per template and backend.")
+    parser.add_argument('--runs', type=int, default=50, help="Writes timed per template and backend")
+    parser.add_argument('--experiences', type=int, default=8)
+    parser.add_argument('--bullets', type=int, default=5)
+    args = parser.parse_args()
+
+    user_data = sample_user_data(args.experiences, args.bullets)
+    # Every write renders from scratch, as the first CV of a session does
+    fragment_cache.enabled = False
+    rows = []
+    for template in TEMPLATES:
+        for backend in RENDER_BACKENDS:
+            write_cv = get_cv_writer(template, backend)
+            timings = []
+            write_cv(user_data, AI_DATA, io.BytesIO(), SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER)
+            cpu_started = time.process_time()
+            for _ in range(args.runs):
+                buffer = io.BytesIO()
+                started = time.perf_counter()
+                write_cv(user_data, AI_DATA, buffer, SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER)
+                timings.append(time.perf_counter() - started)
+            cpu = (time.process_time() - cpu_started) / args.runs
+            with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as archive:
+                document = archive.read('word/document.xml')
+                styles = archive.read('word/styles.xml')
+            load = "-"
+            if backend == 'docx':
+                package = get_template(template).package
+                loads = []
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    Document(io.BytesIO(package))
+                    loads.append(time.perf_counter() - started)
+                load = f"{summarize(loads)['p50'] * 1e3:.2f}"
+            rows.append([template, backend, len(buffer.getvalue()), len(document), len(styles),
+                         document.count(b"<w:rPr>"), f"{summarize(timings)['p50'] * 1e3:.1f}", f"{cpu * 1e3:.2f}",
+                         load])
+    fragment_cache.enabled = True
+
+    print(format_table(['template', 'backend', 'docx bytes', 'document.xml', 'styles.xml', 'run rPr',
+                        'write p50 ms', 'cpu ms/CV', 'load p50 ms'], rows))
+
+
+if __name__ == "__main__":
+    main()
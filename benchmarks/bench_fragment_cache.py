@@ -0,0 +1,103 @@
+# benchmarks/bench_fragment_cache.py
+# قياس أثر ذاكرة أجزاء الأقسام على زمن إنشاء ملف الوورد في حالات الدفعات وإعادة الترتيب وإعادة توليد قسم واحد
+
+"""
+Renders CVs in memory with the section-fragment cache off and on, for three
+workloads: a batch (same profile, different AI sections per CV), reordering
+(same data, a new section order every time) and regenerating only the skills
+section. Reports the time to assemble the document body (what the cache
+saves), the full write time including packaging, and the cache hit rate.
+
+    python -m benchmarks.bench_fragment_cache
+    python -m benchmarks.bench_fragment_cache --runs 100 --experiences 20 --backend docx
+"""
+
+import argparse
+import io
+import random
+import time
+
+from cv_templates import RENDER_BACKENDS, TEMPLATES, get_cv_writer, get_template
+from fragment_cache import fragment_cache
+from benchmarks.bench_utils import SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER, format_table, sample_user_data, summarize
+
+
+def ai_data_for(index: int, skills_variant: int = None) -> dict:
+    skills_variant = index if skills_variant is None else skills_variant
+    return {
+        'profile': f"Engineer with a track record of shipping reliable services (variant {index}).",
+        'skills': [f"Skill {skills_variant}-{i}" for i in range(12)],
+        'interests': ["Open source", "Mentoring", "Cycling"],
+    }
+
+
+def workloads(runs: int):
+    """name -> list of (ai_data, section_order) to render in sequence."""
+    shuffled = []
+    rng = random.Random(7)
+    for _ in range(runs):
+        order = list(SAMPLE_SECTION_ORDER)
+        rng.shuffle(order)
+        shuffled.append((ai_data_for(0), order))
+    return {
+        'batch': [(ai_data_for(i), SAMPLE_SECTION_ORDER) for i in range(runs)],
+        'reorder': shuffled,
+        'regenerate skills': [(dict(ai_data_for(0), skills=ai_data_for(0, i)['skills']), SAMPLE_SECTION_ORDER)
+                              for i in range(runs)],
+    }
+
+
+def run(template: str, backend: str, user_data, jobs: list, cache: bool) -> tuple:
+    """(body p50, write p50, hit rate); each pass starts from an empty cache."""
+    compiled = get_template(template)
+    write_cv = get_cv_writer(template, backend)
+    fragment_cache.enabled = cache
+
+    fragment_cache.clear()
+    before = fragment_cache.stats()
+    body_timings = []
+    for ai_data, order in jobs:
+        started = time.perf_counter()
+        compiled.body_xml(user_data, ai_data, SAMPLE_SECTION_NAMES, order)
+        body_timings.append(time.perf_counter() - started)
+    after = fragment_cache.stats()
+    lookups = (after['hits'] - before['hits']) + (after['misses'] - before['misses'])
+    hit_rate = (after['hits'] - before['hits']) / lookups if lookups else 0.0
+
+    fragment_cache.clear()
+    write_timings = []
+    for ai_data, order in jobs:
+        started = time.perf_counter()
+        write_cv(user_data, ai_data, io.BytesIO(), SAMPLE_SECTION_NAMES, order)
+        write_timings.append(time.perf_counter() - started)
+    return summarize(body_timings)['p50'], summarize(write_timings)['p50'], hit_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Section-fragment cache on/off.")
+    parser.add_argument('--runs', type=int, default=60, help="CVs rendered per workload")
+    parser.add_argument('--experiences', type=int, default=8)
+    parser.add_argument('--bullets', type=int, default=5)
+    parser.add_argument('--backend', choices=RENDER_BACKENDS, default='ooxml')
+    args = parser.parse_args()
+
+    user_data = sample_user_data(args.experiences, args.bullets)
+    rows = []
+    for template in TEMPLATES:
+        write_cv = get_cv_writer(template, args.backend)
+        write_cv(user_data, ai_data_for(0), io.BytesIO(), SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER)  # warm-up
+        for name, jobs in workloads(args.runs).items():
+            body_off, write_off, _hit_rate = run(template, args.backend, user_data, jobs, cache=False)
+            body_on, write_on, hit_rate = run(template, args.backend, user_data, jobs, cache=True)
+            rows.append([template, name, f"{body_off * 1e6:.0f}", f"{body_on * 1e6:.0f}",
+                         f"{body_off / body_on:.1f}x", f"{write_off * 1e3:.1f}", f"{write_on * 1e3:.1f}",
+                         f"{hit_rate:.0%}"])
+    fragment_cache.enabled = True
+
+    print(f"backend: {args.backend}")
+    print(format_table(['template', 'workload', 'body off us', 'body on us', 'body speed-up', 'write off ms',
+                        'write on ms', 'hit rate'], rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_near_duplicates.py
+# قياس زمن البحث في فهرس الأوصاف شبه المكررة مع عشرات الآلاف من الأوصاف المفهرسة
+
+"""
+Fills a temporary NearDuplicateIndex with synthetic job descriptions and
+times lookups for reposts (a changed location / requisition line) and for
+unseen descriptions. The "lookup" column excludes signing the query, which
+is reported separately because it depends only on the query length.
+
+    python -m benchmarks.bench_near_duplicates
+    python -m benchmarks.bench_near_duplicates --sizes 1000,10000,50000 --queries 500
+"""
+
+import argparse
+import random
+import tempfile
+import time
+
+from near_duplicate_index import NearDuplicateIndex
+from benchmarks.bench_utils import format_table, summarize
+
+VOCABULARY = [
+    "python", "java", "sql", "cloud", "aws", "azure", "docker", "kubernetes", "api", "rest", "design", "build",
+    "maintain", "scalable", "services", "data", "pipelines", "teams", "agile", "testing", "automation", "linux",
+    "security", "customers", "product", "analytics", "reporting", "stakeholders", "mentor", "junior", "engineers",
+    "experience", "years", "degree", "computer", "science", "communication", "skills", "remote", "hybrid",
+    "marketing", "sales", "finance", "accounting", "nurse", "patient", "care", "logistics", "warehouse", "retail",
+]
+
+
+def make_job(rng: random.Random, words: int = 250) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate index lookup benchmark.")
+    parser.add_argument('--sizes', default="1000,10000,30000", help="Indexed job counts")
+    parser.add_argument('--queries', type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rows = []
+    for size in (int(v) for v in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as data_dir:
+            index = NearDuplicateIndex(data_dir, max_entries=size)
+            context = index.context_key({'profile': 'Profile Summary'}, [])
+            jobs = [make_job(rng) for _ in range(size)]
+            for i, job in enumerate(jobs):
+                index.add(job, context, f"key{i}")
+
+            for kind in ('repost', 'unseen'):
+                sign_times, lookup_times, hits = [], [], 0
+                for _ in range(args.queries):
+                    if kind == 'repost':
+                        query = rng.choice(jobs) + f"\nLocation: City {rng.randint(1, 99)} - Requisition #{rng.randint(1000, 9999)}"
+                    else:
+                        query = make_job(rng)
+                    started = time.perf_counter()
+                    signature = index.signature(query)
+                    signed = time.perf_counter()
+                    matches = index.find(query, context, signature=signature)
+                    finished = time.perf_counter()
+                    sign_times.append(signed - started)
+                    lookup_times.append(finished - signed)
+                    hits += bool(matches)
+                sign, lookup = summarize(sign_times), summarize(lookup_times)
+                rows.append([size, kind, f"{hits / args.queries:.0%}", f"{sign['p50'] * 1e3:.3f}",
+                             f"{lookup['p50'] * 1e3:.3f}", f"{lookup['p99'] * 1e3:.3f}"])
+
+    print(format_table(['indexed', 'query', 'matched', 'sign p50 ms', 'lookup p50 ms', 'lookup p99 ms'], rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_parser.py
+# قياس قابلية توسع parse_ai_response مع طول الاستجابة وعدد الأقسام
+
+"""
+Shows that parse_ai_response scales linearly with response length and does
+not depend on the number of sections per line, compared with the previous
+implementation (kept below as legacy_parse_ai_response), which tested every
+title on every line.
+
+    python -m benchmarks.bench_parser
+    python -m benchmarks.bench_parser --lines 2000,8000,32000 --sections 4,64,256
+"""
+
+import argparse
+import time
+
+from api_handler import parse_ai_response
+from benchmarks.bench_utils import format_table
+
+
+def legacy_parse_ai_response(response_text: str, section_names: dict) -> dict:
+    """The pre-rewrite parser: O(lines x sections) title scan and string += accumulation."""
+    data = {}
+    for key in section_names:
+        data[key] = "" if key == 'profile' else []
+    title_to_key_map = {f"### {name}".lower(): key for key, name in section_names.items()}
+    current_section_key = None
+    for line in response_text.splitlines():
+        line_stripped = line.strip()
+        if not line_stripped:
+            continue
+        line_lower = line_stripped.lower()
+        matched_title = next((title for title in title_to_key_map if line_lower.startswith(title)), None)
+        if matched_title:
+            current_section_key = title_to_key_map[matched_title]
+            continue
+        if current_section_key:
+            if current_section_key == 'profile':
+                if not line_stripped.startswith("###"):
+                    data[current_section_key] += line_stripped + " "
+            elif line_stripped.startswith("-") or line_stripped.startswith("*"):
+                data[current_section_key].append(line_stripped[1:].strip())
+    if 'profile' in data:
+        data['profile'] = data['profile'].strip()
+    return data
+
+
+def make_sections(count: int) -> dict:
+    # No title may be a prefix of another: the legacy parser would file "Section 10" under "Section 1"
+    names = {'profile': 'Profile Summary'}
+    for i in range(1, count):
+        names[f'custom_section_{i}'] = f'Custom Section {i} Items'
+    return names
+
+
+def make_response(section_names: dict, total_lines: int) -> str:
+    """A response of roughly total_lines lines spread evenly over all sections."""
+    per_section = max(1, total_lines // len(section_names) - 1)
+    blocks = []
+    for key, name in section_names.items():
+        if key == 'profile':
+            body = "\n".join(f"Profile sentence {i} describing relevant experience." for i in range(per_section))
+        else:
+            body = "\n".join(f"- {name} item {i}" for i in range(per_section))
+        blocks.append(f"### {name}\n{body}")
+    return "\n".join(blocks)
+
+
+def best_time(func, *args, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser scaling benchmark.")
+    parser.add_argument('--lines', default="1000,4000,16000,64000", help="Response sizes in lines")
+    parser.add_argument('--sections', default="4,32,128", help="Section counts")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for section_count in (int(v) for v in args.sections.split(',')):
+        section_names = make_sections(section_count)
+        for line_count in (int(v) for v in args.lines.split(',')):
+            text = make_response(section_names, line_count)
+            lines = text.count("\n") + 1
+            assert parse_ai_response(text, section_names) == legacy_parse_ai_response(text, section_names)
+            new = best_time(parse_ai_response, text, section_names, repeat=args.repeat)
+            old = best_time(legacy_parse_ai_response, text, section_names, repeat=args.repeat)
+            rows.append([section_count, lines, f"{new * 1000:.2f}", f"{new / lines * 1e6:.2f}",
+                         f"{old * 1000:.2f}", f"{old / lines * 1e6:.2f}", f"{old / new:.1f}x"])
+
+    print(format_table(['sections', 'lines', 'new ms', 'new us/line', 'legacy ms', 'legacy us/line', 'speedup'], rows))
+    print("\nLinear scaling shows as a flat 'new us/line' column across line and section counts.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# benchmarks/bench_pipeline.py
+# قياس أداء مسار إنشاء السيرة الذاتية كاملاً مقابل الخادم المحلي الوهمي
+
+"""
+End-to-end benchmark of the generation pipeline against the local mock server:
+prompt build -> LLM call -> parse_ai_output -> write_cv (in memory) -> save.
+
+Runs offline; no API key or network is needed. For every concurrency level it
+reports per-stage p50/p95/p99, end-to-end latency and throughput.
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --jobs 64 --concurrency 1,8,32 --latency 0.3 --token-rate 400
+    python -m benchmarks.bench_pipeline --stream --json results.json
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from api_handler import (analyze_job_description, analyze_sections_parallel, build_prompt, parse_ai_output,
+                         stream_job_description, DEFAULT_TEMPERATURE)
+from request_policy import RequestPolicy
+from benchmarks.bench_utils import (SAMPLE_JOB_DESCRIPTION, SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER, format_table,
+                                    ms, sample_user_data, summarize, timed)
+from benchmarks.mock_llm_server import MockLLMServer
+
+STAGES = ['prompt', 'llm', 'parse', 'render', 'save', 'total']
+
+
+def load_writer(template: str, backend: str = 'docx'):
+    from cv_templates import get_cv_writer
+    return get_cv_writer(template, backend)
+
+
+def run_job(index, client, args, write_cv, user_data, output_dir, policy):
+    """One pass through the pipeline; returns {stage: seconds}."""
+    timings = {}
+    job_desc = f"{SAMPLE_JOB_DESCRIPTION}\nRequisition #{index}"
+    started = time.perf_counter()
+
+    with timed(timings, 'prompt'):
+        build_prompt(job_desc, [], SAMPLE_SECTION_NAMES, args.output_format)
+
+    with timed(timings, 'llm'):
+        if args.parallel_sections:
+            raw, _data = analyze_sections_parallel(client, args.model, job_desc, [], SAMPLE_SECTION_NAMES,
+                                                   DEFAULT_TEMPERATURE, policy, output_format=args.output_format)
+        elif args.stream:
+            raw = "".join(stream_job_description(client, args.model, job_desc, [], SAMPLE_SECTION_NAMES,
+                                                 DEFAULT_TEMPERATURE, policy))
+        else:
+            raw = analyze_job_description(client, args.model, job_desc, [], SAMPLE_SECTION_NAMES,
+                                          DEFAULT_TEMPERATURE, policy, output_format=args.output_format)
+    if raw.startswith("Error"):
+        raise RuntimeError(raw)
+
+    with timed(timings, 'parse'):
+        ai_data = parse_ai_output(raw, SAMPLE_SECTION_NAMES)
+
+    buffer = io.BytesIO()
+    with timed(timings, 'render'):
+        write_cv(user_data, ai_data, buffer, SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER)
+
+    with timed(timings, 'save'):
+        with open(os.path.join(output_dir, f"cv_{index}.docx"), 'wb') as f:
+            f.write(buffer.getvalue())
+
+    timings['total'] = [time.perf_counter() - started]
+    return {stage: values[0] for stage, values in timings.items()}
+
+
+def run_level(concurrency, client, args, write_cv, user_data, policy):
+    samples = {stage: [] for stage in STAGES}
+    errors = 0
+    with tempfile.TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(run_job, i, client, args, write_cv, user_data, output_dir, policy)
+                       for i in range(args.jobs)]
+            for future in futures:
+                try:
+                    for stage, seconds in future.result().items():
+                        samples[stage].append(seconds)
+                except Exception as e:
+                    errors += 1
+                    print(f"  job failed: {e}")
+        wall = time.perf_counter() - started
+    completed = len(samples['total'])
+    return {
+        'concurrency': concurrency,
+        'jobs': args.jobs,
+        'errors': errors,
+        'wall_seconds': wall,
+        'cvs_per_minute': completed / wall * 60 if wall > 0 else 0.0,
+        'stages': {stage: summarize(values) for stage, values in samples.items()},
+    }
+
+
+def print_level(result):
+    print(f"\nconcurrency={result['concurrency']}  jobs={result['jobs']}  errors={result['errors']}  "
+          f"wall={result['wall_seconds']:.2f}s  throughput={result['cvs_per_minute']:.1f} CVs/min")
+    rows = []
+    for stage in STAGES:
+        s = result['stages'][stage]
+        rows.append([stage, ms(s['mean']), ms(s['p50']), ms(s['p95']), ms(s['p99']), ms(s['max'])])
+    print(format_table(['stage (ms)', 'mean', 'p50', 'p95', 'p99', 'max'], rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CV pipeline against a local mock LLM server.")
+    parser.add_argument('--jobs', type=int, default=32, help="Jobs per concurrency level")
+    parser.add_argument('--concurrency', default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument('--latency', type=float, default=0.2, help="Mock time to first token (s)")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Mock latency jitter (s)")
+    parser.add_argument('--token-rate', type=float, default=0.0, help="Mock tokens per second (0 = instant)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of mock requests failing with 503")
+    parser.add_argument('--template', choices=['modern', 'professional'], default='modern')
+    parser.add_argument('--backend', choices=['docx', 'ooxml'], default='docx', help="Document writer used for rendering")
+    parser.add_argument('--model', default='mock-model')
+    parser.add_argument('--stream', action='store_true', help="Use the streaming LLM path")
+    parser.add_argument('--output-format', choices=['markdown', 'json'], default='markdown',
+                        help="Response format requested on the non-streaming path")
+    parser.add_argument('--parallel-sections', action='store_true', help="One concurrent request per section")
+    parser.add_argument('--max-concurrency', type=int, default=16, help="In-flight requests allowed per provider")
+    parser.add_argument('--experiences', type=int, default=4, help="Experiences in the sample profile")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    parser.add_argument('--base-url', help="Use an already running server instead of starting one")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = MockLLMServer(latency=args.latency, token_rate=args.token_rate, jitter=args.jitter,
+                               error_rate=args.error_rate).start()
+        base_url = server.base_url
+
+    client = OpenAI(api_key="mock-key", base_url=base_url)
+    policy = RequestPolicy(backoff_base=0.05, max_concurrency=args.max_concurrency)
+    write_cv = load_writer(args.template, args.backend)
+    user_data = sample_user_data(experiences=args.experiences)
+    print(f"Mock server: {base_url}  template={args.template}  stream={args.stream}  format={args.output_format}  "
+          f"parallel_sections={args.parallel_sections}")
+
+    results = []
+    try:
+        # Warm-up pass so imports and connection setup are not measured
+        run_job(-1, client, args, write_cv, user_data, tempfile.gettempdir(), policy)
+        for level in (int(c) for c in args.concurrency.split(',') if c.strip()):
+            result = run_level(level, client, args, write_cv, user_data, policy)
+            print_level(result)
+            results.append(result)
+    finally:
+        client.close()
+        if server:
+            server.stop()
+        try:
+            os.remove(os.path.join(tempfile.gettempdir(), "cv_-1.docx"))
+        except OSError:
+            pass
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
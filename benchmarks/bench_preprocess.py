@@ -0,0 +1,89 @@
+# benchmarks/bench_preprocess.py
+# قياس ما يوفره تنظيف الوصف الوظيفي من رموز، مع التحقق من حذف الفقرات النمطية والإبقاء على محتوى الوظيفة
+
+"""
+Runs preprocess_job_description over typical job-posting layouts (marked
+headings, unmarked headings, benefits lists without bullets, a single long
+paragraph) and reports tokens before / after and the time taken. Every
+posting also checks which lines must be dropped (company blurb, benefits,
+EEO) and which must survive (role content), so a regression fails loudly.
+
+    python -m benchmarks.bench_preprocess
+    python -m benchmarks.bench_preprocess --runs 500 --budget 300
+"""
+
+import argparse
+import time
+
+from jd_preprocessor import preprocess_job_description
+from benchmarks.bench_utils import format_table, summarize
+
+ROLE = "Senior Backend Engineer"
+
+# name -> (posting, lines that must be dropped, lines that must be kept)
+POSTINGS = {
+    'marked headings': (
+        f"# {ROLE}\n## About Acme\nAcme builds payment software for small shops.\n"
+        "## Responsibilities\n- Design and run Python services\n- Mentor engineers\n"
+        "## Benefits\n- Health insurance\n- Unlimited PTO\n"
+        "## Equal Opportunity\nAcme is an equal opportunity employer.",
+        ["Acme builds payment software", "Health insurance", "Unlimited PTO", "equal opportunity employer"],
+        ["Design and run Python services", "Mentor engineers"],
+    ),
+    'unmarked benefits list': (
+        f"{ROLE}\nRequirements\nFive years of Python.\nStrong SQL skills.\n"
+        "Benefits\nHealth insurance\nUnlimited PTO\nRemote first\n"
+        "About the team\nWe own the payments platform.",
+        ["Health insurance", "Unlimited PTO", "Remote first"],
+        ["Five years of Python.", "Strong SQL skills.", "We own the payments platform."],
+    ),
+    'benefits before requirements': (
+        f"{ROLE}\nWhat we offer\nStock options\nLearning budget\n"
+        "Qualifications\nExperience with Kubernetes.\nClear written communication.",
+        ["Stock options", "Learning budget"],
+        ["Experience with Kubernetes.", "Clear written communication."],
+    ),
+    'single paragraph': (
+        " ".join(f"You will build service {i} in Python and review designs with the team." for i in range(80)),
+        [],
+        ["You will build service 0 in Python"],
+    ),
+}
+
+
+def check(name: str, text: str, dropped: list, kept: list):
+    for phrase in dropped:
+        assert phrase not in text, f"{name}: boilerplate kept: {phrase!r}"
+    for phrase in kept:
+        assert phrase in text, f"{name}: role content dropped: {phrase!r}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job description preprocessing savings and checks.")
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--budget', type=int, default=300, help="Token budget for the truncation row")
+    args = parser.parse_args()
+
+    rows = []
+    for name, (posting, dropped, kept) in POSTINGS.items():
+        result = preprocess_job_description(posting)
+        check(name, result.text, dropped, kept)
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            preprocess_job_description(posting)
+            timings.append(time.perf_counter() - started)
+        rows.append([name, result.original_tokens, result.tokens, f"{summarize(timings)['p50'] * 1e3:.3f}"])
+
+    # A single paragraph over the budget is cut inside the line, never to nothing
+    paragraph = POSTINGS['single paragraph'][0]
+    budgeted = preprocess_job_description(paragraph, args.budget)
+    assert budgeted.text and budgeted.tokens <= args.budget and budgeted.truncated, budgeted.report()
+    rows.append([f"single paragraph, budget {args.budget}", budgeted.original_tokens, budgeted.tokens, "-"])
+
+    print(format_table(['posting', 'tokens before', 'tokens after', 'p50 ms'], rows))
+    print("All checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/bench_preview.py
+# قياس زمن بناء المعاينة الحية (توليد الأجزاء وتحويلها إلى فقرات) عند تعديل حقل أو قسم أو ترتيب الأقسام
+
+"""
+Times build_preview (the part of a live-preview refresh that runs on the worker
+thread) for typical edits: typing in a header field, editing one experience,
+reordering sections and switching template. The Tk drawing on the main thread is
+not included; it redraws only the blocks from the first changed one onwards.
+
+It then runs the pane's refresh path headless through PreviewWorker: a change is
+requested at once, the result queue is polled every PreviewPane.POLL_MS and only
+the latest generation is accepted, as the pane does. Single edits and bursts of
+typing (one key every 40 ms) are timed from the change to the accepted result.
+
+    python -m benchmarks.bench_preview
+    python -m benchmarks.bench_preview --runs 200 --experiences 20
+"""
+
+import argparse
+import copy
+import queue
+import random
+import time
+
+from cv_preview import PreviewWorker, build_preview, parse_fragment
+from cv_templates import TEMPLATES
+from ui.preview_pane import PreviewPane
+from benchmarks.bench_utils import SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER, format_table, sample_user_data, summarize
+
+AI_DATA = {
+    'profile': "Engineer with a track record of shipping reliable services.",
+    'skills': [f"Skill {i}" for i in range(12)],
+    'interests': ["Open source", "Mentoring", "Cycling"],
+}
+
+
+def edits(user_data: dict, runs: int):
+    """name -> list of (user_data, section_order), one per refresh."""
+    rng = random.Random(3)
+    typing, experience, reorder = [], [], []
+    for i in range(runs):
+        typed = dict(user_data, name=user_data['name'][:1 + i % len(user_data['name'])])
+        typing.append((typed, SAMPLE_SECTION_ORDER))
+        edited = copy.deepcopy(user_data)
+        edited['experiences'][0]['details'][0] = f"Edited bullet {i}"
+        experience.append((edited, SAMPLE_SECTION_ORDER))
+        order = list(SAMPLE_SECTION_ORDER)
+        rng.shuffle(order)
+        reorder.append((user_data, order))
+    return {'type in header': typing, 'edit experience': experience, 'reorder sections': reorder}
+
+
+def time_refreshes(template: str, jobs: list) -> dict:
+    timings = []
+    for user_data, order in jobs:
+        started = time.perf_counter()
+        build_preview(template, user_data, AI_DATA, SAMPLE_SECTION_NAMES, order)
+        timings.append(time.perf_counter() - started)
+    return summarize(timings)
+
+
+def wait_for_result(worker: PreviewWorker, latest: int):
+    """The pane's _poll loop: drain the queue every POLL_MS until the latest generation arrives."""
+    while True:
+        result = None
+        try:
+            while True:
+                result = worker.results.get_nowait()
+        except queue.Empty:
+            pass
+        if result is not None and result[0] == latest:
+            if result[3] is not None:
+                raise result[3]
+            return result[1]
+        time.sleep(PreviewPane.POLL_MS / 1000)
+
+
+def time_round_trips(template: str, jobs: list, keys_per_burst: int = 1) -> dict:
+    """
+    Change -> accepted result through the worker. The first key of a burst is requested at once;
+    later keys restart the debounce, so the render requested DEBOUNCE_MS after the last key wins.
+    """
+    worker = PreviewWorker()
+    timings = []
+    try:
+        for start in range(0, len(jobs) - keys_per_burst + 1, keys_per_burst):
+            burst = jobs[start:start + keys_per_burst]
+            changed_at = time.perf_counter()
+            latest = worker.request(template, burst[0][0], AI_DATA, SAMPLE_SECTION_NAMES, burst[0][1])
+            if len(burst) > 1:
+                time.sleep(0.04 * (len(burst) - 1) + PreviewPane.DEBOUNCE_MS / 1000)
+                latest = worker.request(template, burst[-1][0], AI_DATA, SAMPLE_SECTION_NAMES, burst[-1][1])
+            document = wait_for_result(worker, latest)
+            assert document.template == template and document.blocks, "empty preview"
+            # Time the user waits after the last key of the burst
+            timings.append(time.perf_counter() - changed_at - 0.04 * (len(burst) - 1))
+    finally:
+        worker.close()
+    return summarize(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live preview build time per refresh.")
+    parser.add_argument('--runs', type=int, default=100, help="Refreshes per edit type")
+    parser.add_argument('--experiences', type=int, default=8)
+    parser.add_argument('--bullets', type=int, default=5)
+    args = parser.parse_args()
+
+    user_data = sample_user_data(args.experiences, args.bullets)
+    rows = []
+    for template in TEMPLATES:
+        started = time.perf_counter()
+        build_preview(template, user_data, AI_DATA, SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER)
+        rows.append([template, "first preview (compiles template)", f"{(time.perf_counter() - started) * 1e3:.1f}", "-"])
+        for name, jobs in edits(user_data, args.runs).items():
+            stats = time_refreshes(template, jobs)
+            rows.append([template, name, f"{stats['p50'] * 1e3:.2f}", f"{stats['p95'] * 1e3:.2f}"])
+    switch = [time_refreshes(template, [(user_data, SAMPLE_SECTION_ORDER)])['p50'] for template in TEMPLATES]
+    rows.append(["-", "switch template (warm)", f"{max(switch) * 1e3:.2f}", "-"])
+
+    for template in TEMPLATES:
+        jobs = edits(user_data, args.runs)['type in header']
+        for label, keys in (("worker round trip: one edit", 1), ("worker round trip: typing burst", 5)):
+            stats = time_round_trips(template, jobs, keys)
+            rows.append([template, label, f"{stats['p50'] * 1e3:.2f}", f"{stats['p95'] * 1e3:.2f}"])
+
+    print(format_table(['template', 'refresh', 'p50 ms', 'p95 ms'], rows))
+    print(f"parsed fragments: {parse_fragment.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
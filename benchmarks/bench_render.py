@@ -0,0 +1,77 @@
+# benchmarks/bench_render.py
+# قياس زمن إنشاء ملف الوورد مع زيادة عدد الخبرات والنقاط للتحقق من أن الزمن خطي
+
+"""
+Renders CVs of growing size with both templates (in memory) and reports the
+render time per paragraph, which stays flat when rendering is linear. The
+"rescan" column repeats the old pattern of reading doc.paragraphs[-1] after
+every bullet on a bare Document, for comparison.
+
+    python -m benchmarks.bench_render
+    python -m benchmarks.bench_render --experiences 5,20,80,320 --bullets 8 --repeat 3
+"""
+
+import argparse
+import io
+import time
+
+from docx import Document
+from docx.shared import Pt
+
+from benchmarks.bench_utils import SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER, format_table, sample_user_data
+
+AI_DATA = {
+    'profile': "Engineer with a track record of shipping reliable services.",
+    'skills': [f"Skill {i}" for i in range(12)],
+    'interests': ["Open source", "Mentoring", "Cycling"],
+}
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def render(write_cv, user_data):
+    write_cv(user_data, AI_DATA, io.BytesIO(), SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER)
+
+
+def rescan_pattern(paragraphs: int):
+    """The previous bullet loop: every append followed by a doc.paragraphs[-1] lookup."""
+    doc = Document()
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Bullet {i}", style='List Bullet')
+        doc.paragraphs[-1].paragraph_format.space_after = Pt(2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render time versus CV size.")
+    parser.add_argument('--experiences', default="5,20,80,320", help="Experience counts to render")
+    parser.add_argument('--bullets', type=int, default=6, help="Bullets per experience")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size (best is reported)")
+    args = parser.parse_args()
+
+    from cv_templates import get_cv_writer
+    write_modern = get_cv_writer('modern')
+    write_professional = get_cv_writer('professional')
+
+    rows = []
+    for experiences in (int(v) for v in args.experiences.split(',')):
+        user_data = sample_user_data(experiences, args.bullets)
+        paragraphs = experiences * (args.bullets + 2)
+        modern = best_of(args.repeat, lambda: render(write_modern, user_data))
+        professional = best_of(args.repeat, lambda: render(write_professional, user_data))
+        rescan = best_of(args.repeat, lambda: rescan_pattern(paragraphs))
+        rows.append([experiences, args.bullets, paragraphs, f"{modern * 1e3:.1f}", f"{professional * 1e3:.1f}",
+                     f"{modern / paragraphs * 1e6:.0f}", f"{rescan * 1e3:.1f}", f"{rescan / paragraphs * 1e6:.0f}"])
+
+    print(format_table(['experiences', 'bullets', 'paragraphs', 'modern ms', 'professional ms', 'modern us/para',
+                        'rescan ms', 'rescan us/para'], rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_render_pool.py
+# قياس توزيع إنشاء ملفات الوورد على عدة عمليات مقارنة بالإنشاء المتسلسل في نفس العملية
+
+"""
+Renders the same set of CVs (alternating templates) serially in this process
+and through RenderService with a growing number of worker processes, and
+reports wall time, throughput, speed-up over serial and the time until the
+first finished file arrives. Workers are warmed up before the clock starts.
+Speed-up is bounded by the number of cores (os.cpu_count() is printed).
+
+    python -m benchmarks.bench_render_pool
+    python -m benchmarks.bench_render_pool --jobs 200 --workers 1,2,4,8 --experiences 12 --backend ooxml
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from cv_templates import RENDER_BACKENDS, TEMPLATES, get_cv_writer
+from render_service import RenderService
+from benchmarks.bench_utils import SAMPLE_SECTION_NAMES, SAMPLE_SECTION_ORDER, format_table, sample_user_data
+
+AI_DATA = {
+    'profile': "Engineer with a track record of shipping reliable services.",
+    'skills': [f"Skill {i}" for i in range(12)],
+    'interests': ["Open source", "Mentoring", "Cycling"],
+}
+
+
+def make_jobs(count: int, experiences: int, output_dir: str) -> list:
+    user_data = sample_user_data(experiences, 5)
+    templates = list(TEMPLATES)
+    return [{'user_data': user_data, 'ai_data': AI_DATA, 'template': templates[i % len(templates)],
+             'section_names': SAMPLE_SECTION_NAMES, 'section_order': SAMPLE_SECTION_ORDER,
+             'output': os.path.join(output_dir, f"cv_{i}.docx")} for i in range(count)]
+
+
+def run_serial(jobs: list, backend: str) -> tuple:
+    for template in TEMPLATES:
+        get_cv_writer(template, backend)  # warm-up, as the workers do
+    started = time.perf_counter()
+    first = None
+    for job in jobs:
+        get_cv_writer(job['template'], backend)(job['user_data'], job['ai_data'], job['output'],
+                                                job['section_names'], job['section_order'])
+        first = first or time.perf_counter() - started
+    return time.perf_counter() - started, first, 0
+
+
+def run_pool(jobs: list, backend: str, workers: int) -> tuple:
+    with RenderService(workers, backend=backend).start(wait_ready=True) as service:
+        started = time.perf_counter()
+        first = None
+        failed = 0
+        for _job, _output, error in service.render_many(jobs):
+            first = first or time.perf_counter() - started
+            failed += error is not None
+        return time.perf_counter() - started, first, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process-pool rendering versus serial rendering.")
+    parser.add_argument('--jobs', type=int, default=96, help="CVs to render per run")
+    parser.add_argument('--workers', default="1,2,4", help="Worker counts to try")
+    parser.add_argument('--experiences', type=int, default=8, help="Experiences per CV")
+    parser.add_argument('--backend', choices=RENDER_BACKENDS, default='docx')
+    args = parser.parse_args()
+
+    print(f"CPU cores: {os.cpu_count()}  jobs: {args.jobs}  backend: {args.backend}")
+    rows = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        jobs = make_jobs(args.jobs, args.experiences, output_dir)
+        serial, first, _failed = run_serial(jobs, args.backend)
+        rows.append(["serial", f"{serial:.2f}", f"{len(jobs) / serial:.0f}", "1.00", f"{first * 1e3:.0f}", 0])
+        for workers in (int(v) for v in args.workers.split(',')):
+            wall, first, failed = run_pool(jobs, args.backend, workers)
+            rows.append([f"{workers} workers", f"{wall:.2f}", f"{len(jobs) / wall:.0f}", f"{serial / wall:.2f}",
+                         f"{first * 1e3:.0f}", failed])
+
+    print(format_table(['mode', 'wall s', 'CVs/s', 'speed-up', 'first ms', 'failed'], rows))
+
+
+if __name__ == "__main__":
+    main()
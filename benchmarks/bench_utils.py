@@ -0,0 +1,86 @@
+# benchmarks/bench_utils.py
+# أدوات مشتركة لسكربتات قياس الأداء
+
+import time
+from contextlib import contextmanager
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(samples) -> dict:
+    """p50/p95/p99/mean/max of a list of seconds."""
+    return {
+        'n': len(samples),
+        'mean': sum(samples) / len(samples) if samples else 0.0,
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': max(samples) if samples else 0.0,
+    }
+
+
+def format_table(headers, rows) -> str:
+    """Plain-text table with right-aligned columns."""
+    cells = [[str(h) for h in headers]] + [[str(c) for c in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in cells]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}"
+
+
+@contextmanager
+def timed(timings: dict, stage: str):
+    """Append the duration of the with-block to timings[stage]."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.setdefault(stage, []).append(time.perf_counter() - started)
+
+
+def sample_user_data(experiences: int = 4, bullets: int = 4) -> dict:
+    """Synthetic profile used by the benchmarks."""
+    return {
+        'name': 'Alex Morgan', 'title': 'Senior Software Engineer', 'email': 'alex@example.com',
+        'linkedin': 'linkedin.com/in/alexmorgan', 'phone': '+1 555 0100', 'location': 'Berlin, Germany',
+        'university': 'Technical University', 'degree': 'B.Sc. Computer Science',
+        'experiences': [
+            {
+                'position': f'Engineer {i + 1}', 'company': f'Company {i + 1}', 'location': 'Remote',
+                'duration': f'{2015 + i} - {2016 + i}',
+                'details': [f'Delivered project {i + 1}.{j + 1} improving throughput and reliability for key customers.'
+                            for j in range(bullets)],
+            }
+            for i in range(experiences)
+        ],
+        'certifications': [{'name': 'Cloud Practitioner', 'authority': 'AWS'},
+                           {'name': 'Scrum Master', 'authority': 'Scrum.org'}],
+        'languages': [{'name': 'English', 'proficiency': 'Native'}, {'name': 'German', 'proficiency': 'Advanced'}],
+    }
+
+
+SAMPLE_SECTION_NAMES = {'profile': 'Profile Summary', 'skills': 'Skills', 'interests': 'Interests'}
+SAMPLE_SECTION_ORDER = ['profile', 'experiences', 'skills', 'interests', 'education', 'certifications', 'languages']
+
+SAMPLE_JOB_DESCRIPTION = """Senior Backend Engineer
+
+We are looking for an experienced backend engineer to design, build and operate
+scalable services in Python. You will work with product managers and designers
+to deliver features end to end, own services in production and mentor others.
+
+Requirements:
+- 5+ years of Python experience
+- Experience with PostgreSQL, REST APIs and cloud infrastructure (AWS or GCP)
+- Familiarity with CI/CD, containers and observability tooling
+"""
@@ -0,0 +1,328 @@
+# benchmarks/mock_llm_server.py
+# خادم محلي يحاكي واجهة OpenAI لقياس الأداء بدون مفتاح API أو اتصال بالإنترنت
+
+"""
+OpenAI-compatible stand-in for /v1/chat/completions (plain and stream=True).
+
+The reply is built from the "###" headings found in the prompt's example
+format, so it always parses into the requested sections. Latency, token rate,
+jitter and error rate are configurable, and fixed replies can be loaded from a
+file instead. Optional request/token per-minute limits answer with 429 and
+OpenAI-style x-ratelimit-* headers once exceeded.
+
+    python -m benchmarks.mock_llm_server --port 8765 --latency 0.8 --token-rate 60
+
+From Python:
+
+    server = MockLLMServer(latency=0.2, token_rate=500).start()
+    client = OpenAI(api_key="mock", base_url=server.base_url)
+    ...
+    server.stop()
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PROFILE_TEXT = (
+    "Results-driven professional with hands-on experience delivering reliable software, "
+    "collaborating across teams and translating business requirements into measurable outcomes."
+)
+DEFAULT_LIST_ITEMS = [
+    "Python", "REST API design", "SQL and data modelling", "Cloud deployment (AWS)",
+    "Automated testing", "CI/CD pipelines", "Technical documentation", "Stakeholder communication",
+]
+
+
+def canned_response(prompt: str, items_per_section: int = 6) -> str:
+    """Build a markdown reply with one block per '### <name>' heading requested in the prompt."""
+    example = prompt.split("**Example Output Format:**", 1)[-1].split("**Job Description:**", 1)[0]
+    # (heading, first example line): list sections show "- Item A", the profile shows a sentence
+    headings = re.findall(r"^###\s+(.+?)\s*\n(.*)$", example, flags=re.MULTILINE)
+    if not headings:
+        headings = [("Profile Summary", ""), ("Skills", "- Item A")]
+    blocks = []
+    for index, (heading, first_line) in enumerate(headings):
+        if not first_line.lstrip().startswith("-"):
+            blocks.append(f"### {heading}\n{DEFAULT_PROFILE_TEXT}")
+        else:
+            items = [DEFAULT_LIST_ITEMS[(index + i) % len(DEFAULT_LIST_ITEMS)] for i in range(items_per_section)]
+            blocks.append(f"### {heading}\n" + "\n".join(f"- {item}" for item in items))
+    return "\n\n".join(blocks)
+
+
+def canned_json_response(schema: dict, items_per_section: int = 6) -> str:
+    """JSON reply matching a response_format schema (string properties get the profile text)."""
+    reply = {}
+    for index, (key, spec) in enumerate(schema.get('properties', {}).items()):
+        if spec.get('type') == 'string':
+            reply[key] = DEFAULT_PROFILE_TEXT
+        else:
+            reply[key] = [DEFAULT_LIST_ITEMS[(index + i) % len(DEFAULT_LIST_ITEMS)] for i in range(items_per_section)]
+    return json.dumps(reply)
+
+
+def split_tokens(text: str) -> list:
+    """Rough token split (words with their trailing whitespace), good enough to pace the stream."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+class MockLLMServer:
+    """
+    Threaded HTTP server answering chat completions after a configurable delay.
+    - latency: seconds before the first token (plus uniform jitter up to `jitter`).
+    - token_rate: generated tokens per second (0 = instant).
+    - error_rate: fraction of requests answered with HTTP 503 (exercises the retry policy).
+    - responses: optional list of fixed replies used round-robin instead of canned_response.
+    - structured_output: answer response_format=json_schema requests with JSON; when False they
+      are rejected with HTTP 400, like a provider without structured output support.
+    - stream_usage: end streams that ask for stream_options.include_usage with a usage chunk; when
+      False requests carrying stream_options are rejected with HTTP 400.
+    - rpm_limit / tpm_limit: requests and tokens per minute (0 = unlimited), refilled continuously;
+      rate_limit_burst is the number of seconds of budget that may be spent at once.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, token_rate: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, responses: list = None, structured_output: bool = True,
+                 rpm_limit: float = 0, tpm_limit: float = 0, rate_limit_burst: float = 60.0, stream_usage: bool = True):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.responses = responses or []
+        self.structured_output = structured_output
+        self.stream_usage = stream_usage
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.limits = {'requests': rpm_limit, 'tokens': tpm_limit}
+        self.burst = rate_limit_burst
+        self._budget = {kind: limit * rate_limit_burst / 60 for kind, limit in self.limits.items()}
+        self._budget_updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _admit(self, prompt_tokens: int):
+        """Charge one request against the rate limits; returns (allowed, headers)."""
+        with self._lock:
+            now = time.monotonic()
+            for kind, limit in self.limits.items():
+                if limit:
+                    capacity = limit * self.burst / 60
+                    self._budget[kind] = min(capacity, self._budget[kind] + (now - self._budget_updated) * limit / 60)
+            self._budget_updated = now
+            costs = {'requests': 1, 'tokens': prompt_tokens}
+            allowed = all(not limit or self._budget[kind] >= costs[kind] for kind, limit in self.limits.items())
+            if allowed:
+                for kind, limit in self.limits.items():
+                    if limit:
+                        self._budget[kind] -= costs[kind]
+            else:
+                self.rate_limited_count += 1
+            return allowed, self._limit_headers()
+
+    def _charge_tokens(self, tokens: int):
+        with self._lock:
+            if self.limits['tokens']:
+                self._budget['tokens'] -= tokens
+
+    def _limit_headers(self) -> dict:
+        headers = {}
+        for kind, limit in self.limits.items():
+            if limit:
+                missing = max(0.0, 1 - self._budget[kind]) if kind == 'requests' else max(0.0, -self._budget[kind])
+                headers[f"x-ratelimit-limit-{kind}"] = str(int(limit))
+                headers[f"x-ratelimit-remaining-{kind}"] = str(max(0, int(self._budget[kind])))
+                headers[f"x-ratelimit-reset-{kind}"] = f"{missing * 60 / limit:.3f}s"
+        return headers
+
+    def _next_reply(self, prompt: str, response_format: dict = None) -> str:
+        with self._lock:
+            self.request_count += 1
+            count = self.request_count
+        if self.responses:
+            return self.responses[(count - 1) % len(self.responses)]
+        if response_format and response_format.get('type') == 'json_schema':
+            return canned_json_response(response_format.get('json_schema', {}).get('schema', {}))
+        return canned_response(prompt)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output clean
+
+            def do_GET(self):
+                if self.path.rstrip('/').endswith('/models'):
+                    self._send_json(200, {"object": "list", "data": [{"id": "mock-model", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "invalid JSON"}})
+                    return
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                prompt = "\n".join(m.get('content') or '' for m in body.get('messages', []) if isinstance(m.get('content'), str))
+                self.extra_headers = {}
+                if any(server.limits.values()):
+                    allowed, self.extra_headers = server._admit(len(split_tokens(prompt)))
+                    if not allowed:
+                        retry_after = max((float(v[:-1]) for k, v in self.extra_headers.items() if k.startswith("x-ratelimit-reset")),
+                                          default=1.0)
+                        self.extra_headers["retry-after"] = f"{retry_after:.3f}"
+                        self._send_json(429, {"error": {"message": "Rate limit reached for requests", "type": "requests",
+                                                        "code": "rate_limit_exceeded"}})
+                        return
+
+                time.sleep(server.latency + random.uniform(0, server.jitter))
+                if server.error_rate and random.random() < server.error_rate:
+                    self._send_json(503, {"error": {"message": "mock overload", "type": "server_error"}})
+                    return
+
+                response_format = body.get('response_format')
+                if response_format and not server.structured_output:
+                    self._send_json(400, {"error": {"message": "response_format json_schema is not supported by this model",
+                                                    "type": "invalid_request_error", "param": "response_format"}})
+                    return
+
+                if body.get('stream_options') is not None and not server.stream_usage:
+                    self._send_json(400, {"error": {"message": "Unrecognized request argument supplied: stream_options",
+                                                    "type": "invalid_request_error", "param": "stream_options"}})
+                    return
+
+                reply = server._next_reply(prompt, response_format)
+                server._charge_tokens(len(split_tokens(reply)))
+                model = body.get('model', 'mock-model')
+                if body.get('stream'):
+                    usage = None
+                    if (body.get('stream_options') or {}).get('include_usage'):
+                        usage = {"prompt_tokens": len(split_tokens(prompt)), "completion_tokens": len(split_tokens(reply)),
+                                 "total_tokens": len(split_tokens(prompt)) + len(split_tokens(reply))}
+                    self._stream(reply, model, usage)
+                else:
+                    self._pace(len(split_tokens(reply)))
+                    self._send_json(200, {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": reply}}],
+                        "usage": {"prompt_tokens": len(split_tokens(prompt)), "completion_tokens": len(split_tokens(reply)),
+                                  "total_tokens": len(split_tokens(prompt)) + len(split_tokens(reply))},
+                    })
+
+            def _pace(self, tokens):
+                if server.token_rate > 0:
+                    time.sleep(tokens / server.token_rate)
+
+            def _stream(self, reply, model, usage=None):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Transfer-Encoding", "chunked")
+                self._send_extra_headers()
+                self.end_headers()
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                try:
+                    for token in split_tokens(reply):
+                        self._pace(1)
+                        self._write_event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                                           "created": int(time.time()),
+                                           "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]})
+                    self._write_event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                                       "created": int(time.time()),
+                                       "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                    if usage is not None:
+                        # stream_options.include_usage: a last chunk with no choices carries the usage
+                        self._write_event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                                           "created": int(time.time()), "choices": [], "usage": usage})
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self._write_chunk(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client closed the stream early
+
+            def _send_extra_headers(self):
+                for name, value in getattr(self, 'extra_headers', {}).items():
+                    self.send_header(name, value)
+
+            def _write_event(self, payload):
+                self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self._send_extra_headers()
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible mock server.")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency up to this many seconds")
+    parser.add_argument('--token-rate', type=float, default=80.0, help="Tokens per second (0 = instant)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--responses', help="JSON file with a list of fixed replies")
+    parser.add_argument('--rpm-limit', type=float, default=0, help="Requests per minute before answering 429 (0 = off)")
+    parser.add_argument('--tpm-limit', type=float, default=0, help="Tokens per minute before answering 429 (0 = off)")
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses, 'r', encoding='utf-8') as f:
+            responses = json.load(f)
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.token_rate, args.jitter, args.error_rate, responses,
+                           rpm_limit=args.rpm_limit, tpm_limit=args.tpm_limit)
+    print(f"Mock LLM server listening on {server.base_url} (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
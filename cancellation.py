@@ -0,0 +1,96 @@
+# cancellation.py
+# رمز إلغاء تعاوني يُمرَّر عبر مراحل التوليد لإيقاف الطلبات الجارية فوراً
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, List, Optional
+
+
+class GenerationCancelled(Exception):
+    """Raised inside a generation once its CancellationToken has been cancelled."""
+
+
+class CancellationToken:
+    """
+    Shared flag checked by the worker between steps, plus callbacks that abort blocking work
+    (closing an open stream, waking a waiting thread) the moment cancel() is called.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error while cancelling: {e}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback on cancel (immediately if already cancelled); returns a function that unregisters it."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise GenerationCancelled("Generation was cancelled")
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds; returns True early if cancelled."""
+        return self._event.wait(timeout)
+
+    def future(self) -> Future:
+        """A Future completed on cancel, to include in concurrent.futures.wait() calls."""
+        with self._lock:
+            if self._future is None:
+                self._future = Future()
+                if self._event.is_set():
+                    self._future.set_result(None)
+                else:
+                    self._callbacks.append(lambda: self._future.set_result(None))
+            return self._future
+
+
+def run_cancellable(fn: Callable[[], Any], token: Optional[CancellationToken]) -> Any:
+    """
+    Run a blocking call so that cancelling the token releases the caller immediately.
+    The call finishes on its own daemon thread and its late result is dropped; HTTP
+    requests inside it are aborted by the on_cancel callbacks that close their streams.
+    """
+    if token is None:
+        return fn()
+    token.raise_if_cancelled()
+    result = Future()
+
+    def target():
+        try:
+            result.set_result(fn())
+        except BaseException as e:
+            result.set_exception(e)
+
+    threading.Thread(target=target, daemon=True, name="ai-request").start()
+    wait([result, token.future()], return_when=FIRST_COMPLETED)
+    if not result.done():
+        raise GenerationCancelled("Generation was cancelled")
+    return result.result()
@@ -0,0 +1,114 @@
+# client_registry.py
+# سجل مشترك لعملاء OpenAI يحافظ على الاتصالات مفتوحة طوال عمر البرنامج
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from openai import OpenAI
+
+from api_handler import PROVIDER_BASE_URLS, build_client_headers, create_client
+from request_policy import alternate_provider
+
+
+class ClientRegistry:
+    """
+    Keeps one OpenAI client per (provider, base_url, api_key, default_headers).
+
+    Each client owns an HTTP connection pool, so handing out the same client
+    for repeated generations keeps keep-alive connections and TLS sessions
+    warm instead of paying a new handshake on every request. Clients stay
+    alive for the process lifetime unless their provider settings change.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple, OpenAI] = {}
+        self._usage: Dict[Tuple, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(provider: str, api_key: str, http_referer: Optional[str] = None, x_title: Optional[str] = None) -> Tuple:
+        base_url = PROVIDER_BASE_URLS.get(provider, PROVIDER_BASE_URLS['openai'])
+        headers = build_client_headers(provider, http_referer, x_title)
+        return provider, base_url, api_key, tuple(sorted(headers.items()))
+
+    def get_client(self, provider: str, api_key: str, http_referer: Optional[str] = None,
+                   x_title: Optional[str] = None) -> OpenAI:
+        """Return the warm client for these settings, creating it on first use."""
+        key = self.make_key(provider, api_key, http_referer, x_title)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = create_client(provider, api_key, http_referer, x_title)
+                self._clients[key] = client
+                self._usage[key] = 0
+                self.misses += 1
+            else:
+                self.hits += 1
+            self._usage[key] += 1
+            return client
+
+    def get_fallback(self, provider: str, provider_settings: dict) -> Optional[Tuple[OpenAI, str]]:
+        """
+        (client, model) of the alternate provider for hedged requests, or None when it is not configured.
+        - provider_settings: all providers' settings as saved in ai_provider_settings.json.
+        """
+        alternate = alternate_provider(provider)
+        settings = provider_settings.get(alternate) or {}
+        if not settings.get('api_key') or not settings.get('model'):
+            return None
+        client = self.get_client(alternate, settings['api_key'], settings.get('http_referer'), settings.get('x_title'))
+        return client, settings['model']
+
+    def invalidate(self, provider: Optional[str] = None):
+        """Close and forget the clients of one provider (or all of them when provider is None)."""
+        with self._lock:
+            keys = [key for key in self._clients if provider is None or key[0] == provider]
+            clients = [self._clients.pop(key) for key in keys]
+            for key in keys:
+                self._usage.pop(key, None)
+            self.invalidations += len(keys)
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                print(f"Error closing AI client: {e}")
+
+    def close_all(self):
+        """Release every pooled connection (called when the application exits)."""
+        self.invalidate(None)
+
+    def stats(self) -> dict:
+        """Registry counters plus per-client connection pool usage."""
+        with self._lock:
+            items = list(self._clients.items())
+            usage = dict(self._usage)
+        clients = []
+        for key, client in items:
+            provider, base_url = key[0], key[1]
+            entry = {'provider': provider, 'base_url': base_url, 'uses': usage.get(key, 0)}
+            entry.update(self._pool_stats(client))
+            clients.append(entry)
+        return {
+            'clients': len(items),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'pools': clients,
+        }
+
+    @staticmethod
+    def _pool_stats(client: OpenAI) -> dict:
+        """Open/idle connection counts read from the underlying HTTP transport, when available."""
+        try:
+            connections = list(client._client._transport._pool.connections)
+        except AttributeError:
+            return {}
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {'connections': len(connections), 'idle_connections': idle}
+
+
+# إنشاء مثيل مشترك لسجل العملاء
+client_registry = ClientRegistry()
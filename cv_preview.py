@@ -0,0 +1,241 @@
+# cv_preview.py
+# معاينة حية للسيرة الذاتية: نفس أجزاء XML التي يكتبها محرك القوالب تُحوَّل إلى قائمة فقرات بسيطة
+# (نصوص وخطوط ومحاذاة ومسافات) يرسمها جزء المعاينة في الواجهة، وتُبنى في خيط منفصل عن الواجهة
+
+import queue
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from lxml import etree
+
+from cv_templates import TEMPLATES, get_template
+
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_NS = {'w': _W}
+_TAG_P = f"{{{_W}}}p"
+_TAG_TBL = f"{{{_W}}}tbl"
+_TAG_T = f"{{{_W}}}t"
+_TAG_TAB = f"{{{_W}}}tab"
+_TAG_BR = f"{{{_W}}}br"
+_VAL = f"{{{_W}}}val"
+_BULLET_STYLE = "List Bullet"
+
+# --- Display list ---
+# runs:   (text, bold, italic, size in pt); a tab is its own run
+# tabs:   ((position in pt from the left margin, 'left' / 'center' / 'right'), ...)
+# border: None, 'top', 'bottom' or 'both' (a rule above and/or below the paragraph)
+# before / after: paragraph spacing in pt
+PreviewRun = namedtuple('PreviewRun', ['text', 'bold', 'italic', 'size'])
+PreviewParagraph = namedtuple('PreviewParagraph', ['runs', 'align', 'before', 'after', 'bullet', 'border', 'tabs'])
+# fragments: the body XML of each block (header, sections), blocks: the paragraphs parsed from each fragment
+PreviewDocument = namedtuple('PreviewDocument', ['template', 'font', 'font_size', 'margin', 'width',
+                                                 'fragments', 'blocks'])
+
+
+def _on(element) -> bool:
+    """w:b / w:i: present and not switched off with w:val="0"."""
+    return element is not None and element.get(_VAL) not in ("0", "false")
+
+
+class _Page:
+    """What parsing a template's fragments needs: default font size, text width and its named styles."""
+
+    def __init__(self, template: str):
+        compiled = get_template(template)
+        self.font_size = TEMPLATES[compiled.name]['page']['font_size']
+        self.width = compiled.block_width / 12700  # EMU -> pt
+        self.styles = compiled.style_formats()
+
+    def run_format(self, props: dict, base: tuple) -> tuple:
+        """(bold, italic, size) of character formatting props over a base format."""
+        bold, italic, size = base
+        return (bold if props.get('bold') is None else props['bold'],
+                italic if props.get('italic') is None else props['italic'],
+                props.get('size') or size)
+
+
+@lru_cache(maxsize=None)
+def _page(template: str) -> _Page:
+    return _Page(template)
+
+
+def _runs(paragraph, page: _Page, base: tuple) -> list:
+    runs = []
+    for run in paragraph.iterfind('w:r', _NS):
+        rpr = run.find('w:rPr', _NS)
+        bold, italic, size = base
+        if rpr is not None:
+            style = rpr.find('w:rStyle', _NS)
+            if style is not None:
+                bold, italic, size = page.run_format(page.styles.get(style.get(_VAL), {}), base)
+            if rpr.find('w:b', _NS) is not None:
+                bold = _on(rpr.find('w:b', _NS))
+            if rpr.find('w:i', _NS) is not None:
+                italic = _on(rpr.find('w:i', _NS))
+            sz = rpr.find('w:sz', _NS)
+            if sz is not None:
+                size = int(sz.get(_VAL)) / 2
+        for child in run:
+            if child.tag == _TAG_T:
+                text = child.text or ""
+            elif child.tag == _TAG_TAB:
+                text = "\t"
+            elif child.tag == _TAG_BR:
+                text = "\n"
+            else:
+                continue
+            if runs and text != "\t" and runs[-1].text != "\t" and runs[-1][1:] == (bold, italic, size):
+                runs[-1] = runs[-1]._replace(text=runs[-1].text + text)
+            else:
+                runs.append(PreviewRun(text, bold, italic, size))
+    return runs
+
+
+def _paragraph(paragraph, page: _Page) -> PreviewParagraph:
+    """A paragraph's format: its paragraph style (see CompiledTemplate.style_formats), then its own pPr."""
+    align, before, after, bullet, border, tabs = None, 0.0, 0.0, False, None, ()
+    base = (False, False, page.font_size)
+    ppr = paragraph.find('w:pPr', _NS)
+    if ppr is not None:
+        style = ppr.find('w:pStyle', _NS)
+        if style is not None:
+            props = page.styles.get(style.get(_VAL), {})
+            align = props.get('align')
+            before = props.get('before') or 0.0
+            after = props.get('after') or 0.0
+            bullet = props.get('based_on') == _BULLET_STYLE
+            border = props.get('border')
+            if props.get('right_tab') is not None:
+                tabs = ((props['right_tab'] * 72, "right"),)
+            base = page.run_format(props.get('run', {}), base)
+        bdr = ppr.find('w:pBdr', _NS)
+        if bdr is not None:
+            top, bottom = bdr.find('w:top', _NS) is not None, bdr.find('w:bottom', _NS) is not None
+            border = 'both' if top and bottom else 'top' if top else 'bottom' if bottom else None
+        own_tabs = tuple((int(tab.get(f"{{{_W}}}pos")) / 20, tab.get(_VAL))
+                         for tab in ppr.iterfind('w:tabs/w:tab', _NS))
+        tabs = own_tabs or tabs
+        spacing = ppr.find('w:spacing', _NS)
+        if spacing is not None:
+            before = int(spacing.get(f"{{{_W}}}before", before * 20)) / 20
+            after = int(spacing.get(f"{{{_W}}}after", after * 20)) / 20
+        jc = ppr.find('w:jc', _NS)
+        if jc is not None:
+            align = jc.get(_VAL)
+    return PreviewParagraph(tuple(_runs(paragraph, page, base)), align, before, after, bullet, border, tabs)
+
+
+def _table_rows(table, page: _Page) -> list:
+    """
+    One preview paragraph per table row: each cell's text sits on a tab stop inside its grid
+    column (left edge, centre or right edge, following the cell paragraph's alignment).
+    """
+    grid = [int(col.get(f"{{{_W}}}w")) / 20 for col in table.iterfind('w:tblGrid/w:gridCol', _NS)]
+    jc = table.find('w:tblPr/w:jc', _NS)
+    offset = max(0.0, (page.width - sum(grid)) / 2) if jc is not None and jc.get(_VAL) == "center" else 0.0
+    rows = []
+    for row in table.iterfind('w:tr', _NS):
+        runs, tabs, before, after = [], [], 0.0, 0.0
+        left = offset
+        for index, cell in enumerate(row.iterfind('w:tc', _NS)):
+            right = left + (grid[index] if index < len(grid) else 0)
+            paragraphs = [_paragraph(p, page) for p in cell.iterfind('w:p', _NS)]
+            cell_runs = [run for p in paragraphs for run in p.runs]
+            if cell_runs:
+                align = paragraphs[0].align
+                if align == "right":
+                    stop = (right, "right")
+                elif align == "center":
+                    stop = ((left + right) / 2, "center")
+                else:
+                    stop = (left, "left") if left > 0 else None
+                if stop is not None:
+                    tabs.append(stop)
+                    runs.append(PreviewRun("\t", False, False, cell_runs[0].size))
+                runs.extend(cell_runs)
+            for p in paragraphs:
+                before, after = max(before, p.before), max(after, p.after)
+            left = right
+        rows.append(PreviewParagraph(tuple(runs), None, before, after, False, None, tuple(tabs)))
+    return rows
+
+
+@lru_cache(maxsize=512)
+def parse_fragment(xml: str, template: str) -> tuple:
+    """
+    The preview paragraphs of one body fragment. Fragments are the blocks the fragment cache
+    keeps, so an edit re-parses only the block it changed; the others are hits here.
+    """
+    page = _page(template)
+    body = etree.fromstring(f'<w:body xmlns:w="{_W}">{xml}</w:body>')
+    paragraphs = []
+    for element in body:
+        if element.tag == _TAG_P:
+            paragraphs.append(_paragraph(element, page))
+        elif element.tag == _TAG_TBL:
+            paragraphs.extend(_table_rows(element, page))
+    return tuple(paragraphs)
+
+
+def build_preview(template: str, user_data: dict, ai_data: dict, section_names: dict,
+                  section_order: list) -> PreviewDocument:
+    """Renders the body with the template engine (same fragments as the .docx) and parses it for display."""
+    compiled = get_template(template)
+    page = TEMPLATES[compiled.name]['page']
+    fragments = tuple(compiled.body_fragments(user_data, ai_data, section_names, section_order))
+    blocks = tuple(parse_fragment(xml, compiled.name) for xml in fragments)
+    return PreviewDocument(compiled.name, page['font'], page['font_size'], page['margin'] * 72,
+                           _page(compiled.name).width, fragments, blocks)
+
+
+class PreviewWorker:
+    """
+    Builds previews on a background thread. Only the latest request matters: requests that arrive
+    while a preview is being built replace each other, and every result carries the generation
+    number of its request so the UI can drop stale ones. Results are put on `results` as
+    (generation, PreviewDocument or None, seconds, error) for the UI to poll.
+    """
+
+    def __init__(self):
+        self.results = queue.Queue()
+        self._condition = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._closed = False
+        self._thread = None
+
+    def request(self, template: str, user_data: dict, ai_data: dict, section_names: dict,
+                section_order: list) -> int:
+        """Queues a preview of this snapshot (the caller must not mutate it afterwards); returns its generation."""
+        with self._condition:
+            self._generation += 1
+            self._pending = (self._generation, (template, user_data, ai_data, section_names, section_order))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cv-preview", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return self._generation
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                generation, args = self._pending
+                self._pending = None
+            started = time.perf_counter()
+            try:
+                document = build_preview(*args)
+                self.results.put((generation, document, time.perf_counter() - started, None))
+            except Exception as e:
+                print(f"Error building CV preview: {e}")
+                self.results.put((generation, None, time.perf_counter() - started, e))
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
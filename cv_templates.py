@@ -0,0 +1,506 @@
+# cv_templates.py
+# محرك القوالب: كل قالب وصف تعريفي (الهوامش، الخطوط، نمط عناوين الأقسام، تخطيط كل قسم)
+# يُترجم مرة واحدة إلى أجزاء XML جاهزة تُستخدم في كل مرة يُنشأ فيها ملف الوورد
+
+import io
+import string
+from functools import lru_cache
+
+from base_document import base_package
+from fragment_cache import fragment_cache
+from ooxml_writer import (OoxmlDocument, cell_xml, paragraph_border, paragraph_properties, paragraph_xml,
+                          run_properties, run_xml, split_package, table_xml, write_package)
+from settings_manager import settings_manager
+
+RENDER_BACKENDS = ('docx', 'ooxml')
+DEFAULT_TEMPLATE = 'modern'
+
+# عناوين الأقسام عندما لا يوجد اسم مخصص لها في section_names
+DEFAULT_SECTION_TITLES = {
+    'profile': 'Professional Summary',
+    'experiences': 'Experience',
+    'education': 'Education',
+    'certifications': 'Certifications',
+    'languages': 'Languages',
+}
+
+# --- Template specs ---
+# page:          margins (inches) and the Normal style's font
+# runs:          character styles (size in pt, bold, italic, color), registered once in the package and
+#                referenced by name from the runs that use them
+# paragraphs:    paragraph styles: 'run' (character formatting of the whole paragraph), 'based_on' (a
+#                built-in style such as 'List Bullet'), 'align', 'before' / 'after' (pt), 'right_tab'
+#                (inches), 'border' ('top', 'bottom' or 'both')
+# header:        paragraphs above the sections. A line is {'text': ..., 'run': style} or
+#                {'runs': [(text, style), ...]}, or {'join': [fields], 'separator': ...} for the contact line;
+#                '{field}' is filled from the data, 'if' skips the line when the field is empty.
+#                Paragraph format: 'style' (a paragraph style above or a built-in one), plus any of the
+#                paragraph style keys for this line only.
+# section_title: the heading paragraph's 'style' and the blank paragraph before it ('gap_before', skipped
+#                at the top of the page)
+# sections:      built-in sections: data 'source' ('user' or 'ai'), the field that must be non-empty ('when',
+#                the section key by default), 'each' to repeat the lines per item and 'bullets' under each item
+# lists:         layout of the AI list sections (skills, interests, ...), by key, with a 'default'
+
+TEMPLATES = {
+    'modern': {
+        'page': {'margin': 0.7, 'font': 'Calibri', 'font_size': 10.5},
+        'runs': {
+            'job_title': {'bold': True},
+            'date': {'italic': True},
+            'label': {'bold': True},
+        },
+        'paragraphs': {
+            'name': {'run': {'size': 26, 'bold': True}, 'align': 'center', 'after': 4},
+            'headline': {'run': {'size': 14}, 'align': 'center', 'after': 6},
+            'contact': {'align': 'center', 'after': 16, 'border': 'bottom'},
+            'section_title': {'run': {'size': 12, 'bold': True}, 'align': 'center', 'border': 'both', 'after': 8},
+            'job_title': {'right_tab': 6.5, 'after': 0},
+            'company': {'run': {'italic': True}, 'after': 4},
+            'item_title': {'run': {'bold': True}, 'after': 0},
+            'bullet': {'based_on': 'List Bullet', 'after': 2},
+        },
+        'header': [
+            {'text': "{name}", 'style': 'name'},
+            {'text': "{title}", 'style': 'headline', 'if': 'title'},
+            {'join': ['location', 'phone', 'email', 'linkedin'], 'separator': "  ♦  ", 'style': 'contact'},
+        ],
+        'section_title': {'style': 'section_title', 'gap_before': {}},
+        'sections': {
+            'profile': {'source': 'ai', 'lines': [{'text': "{profile}", 'after': 4}]},
+            'experiences': {'each': True, 'lines': [
+                {'runs': [("{position}", 'job_title'), ("\t", None), ("{duration}", 'date')], 'style': 'job_title'},
+                {'text': "{company}", 'style': 'company'},
+            ], 'bullets': {'field': 'details', 'style': 'bullet', 'last_after': 12}},
+            'education': {'when': 'degree', 'lines': [
+                {'text': "{degree}", 'style': 'item_title'},
+                {'text': "{university}", 'after': 8},
+            ]},
+            'certifications': {'each': True, 'lines': [
+                {'runs': [("{name}", 'label'), (" - {authority}", None)], 'after': 4},
+            ]},
+            'languages': {'each': True, 'lines': [
+                {'runs': [("{name}: ", 'label'), ("{proficiency}", None)], 'after': 2},
+            ]},
+        },
+        'lists': {
+            'skills': {'layout': 'columns', 'columns': 2, 'column_width': 3.75, 'prefix': "•  ", 'after': 2},
+            'default': {'layout': 'bullets', 'style': 'bullet'},
+        },
+    },
+    'professional': {
+        'page': {'margin': 0.75, 'font': 'Calibri', 'font_size': 11},
+        'runs': {
+            'job_title': {'bold': True},
+            'date': {'italic': True},
+            'label': {'bold': True},
+        },
+        'paragraphs': {
+            'name': {'run': {'size': 22, 'bold': True}, 'align': 'center', 'after': 2},
+            'contact': {'align': 'center', 'after': 12},
+            'section_title': {'run': {'size': 12, 'bold': True}, 'border': 'bottom', 'after': 8},
+            'job_title': {'after': 0},
+            'job_details': {'right_tab': 6.5, 'after': 4},
+            'item_title': {'run': {'bold': True}, 'after': 0},
+            'bullet': {'based_on': 'List Bullet', 'after': 2},
+        },
+        'header': [
+            {'text': "{name}", 'style': 'name'},
+            {'join': ['linkedin', 'email', 'location', 'phone'], 'separator': " | ", 'style': 'contact'},
+        ],
+        'section_title': {'style': 'section_title', 'gap_before': {'before': 12}},
+        'sections': {
+            'profile': {'source': 'ai', 'lines': [{'text': "{profile}", 'after': 4}]},
+            'experiences': {'each': True, 'lines': [
+                {'runs': [("{position}", 'job_title'), (" | {company}", None)], 'style': 'job_title'},
+                {'runs': [("{location}", None), ("\t", None), ("{duration}", 'date')], 'style': 'job_details'},
+            ], 'bullets': {'field': 'details', 'style': 'bullet', 'last_after': 10}},
+            'education': {'when': 'degree', 'lines': [
+                {'text': "{university}", 'style': 'item_title'},
+                {'text': "{degree}", 'after': 8},
+            ]},
+            'certifications': {'each': True, 'lines': [
+                {'text': "{name}", 'style': 'item_title'},
+                {'text': "{authority}", 'after': 6},
+            ]},
+            'languages': {'each': True, 'lines': [
+                {'runs': [("{name}: ", 'label'), ("{proficiency}", None)], 'after': 2},
+            ]},
+        },
+        'lists': {
+            'default': {'layout': 'bullets', 'style': 'bullet'},
+        },
+    },
+}
+
+
+# --- Compiled templates ---
+
+_FORMATTER = string.Formatter()
+
+
+class _Fields:
+    """Mapping for str.format_map over user/AI data: missing and None values read as ''."""
+    __slots__ = ('data',)
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def __getitem__(self, key):
+        value = self.data.get(key)
+        return "" if value is None else value
+
+
+class _Body:
+    """Receives the body fragments of one render and counts its top-level paragraphs."""
+    __slots__ = ('write', 'paragraphs')
+
+    def __init__(self, write):
+        self.write = write
+        self.paragraphs = 0
+
+    def paragraph(self, xml: str):
+        self.paragraphs += 1
+        self.write(xml)
+
+    def splice(self, xml: str, paragraphs: int):
+        """Appends a block rendered earlier (see _Body.capture)."""
+        self.paragraphs += paragraphs
+        if xml:
+            self.write(xml)
+
+    @staticmethod
+    def capture(render) -> tuple:
+        """(xml, paragraphs) written by render(body) into a fresh body."""
+        parts = []
+        body = _Body(parts.append)
+        render(body)
+        return "".join(parts), body.paragraphs
+
+
+class _Line:
+    """One paragraph of a layout: compiled pPr and (text, compiled rPr) runs."""
+    __slots__ = ('ppr', 'runs', 'when', 'join', 'separator', 'plain', 'fields')
+
+    def __init__(self, spec: dict, template: 'CompiledTemplate'):
+        self.ppr = template.paragraph_format(spec)
+        runs = spec.get('runs') or [(spec.get('text', ''), spec.get('run'))]
+        self.runs = tuple((text, template.run_format(style)) for text, style in runs)
+        self.when = spec.get('if')
+        self.join = tuple(spec.get('join', ()))
+        self.separator = spec.get('separator', '')
+        # A single unstyled run behaves like add_paragraph(text): no run at all when the text is empty
+        self.plain = len(self.runs) == 1 and not self.runs[0][1]
+        # Data fields the line reads (part of its sections' fragment cache key)
+        names = {name for text, _rpr in self.runs for _literal, name, _format, _conversion in _FORMATTER.parse(text)
+                 if name}
+        self.fields = frozenset(names | set(self.join) | ({self.when} if self.when else set()))
+
+    def render(self, fields: _Fields) -> str:
+        if self.join:
+            texts = (self.separator.join(fields[key] for key in self.join if fields[key]),)
+        else:
+            texts = tuple(text.format_map(fields) for text, _rpr in self.runs)
+        if self.plain:
+            return paragraph_xml(self.ppr, run_xml(texts[0]) if texts[0] else "")
+        return paragraph_xml(self.ppr, "".join(run_xml(text, rpr) for text, (_text, rpr) in zip(texts, self.runs)))
+
+
+class _ListLayout:
+    """Bullets (one paragraph per item, the last one may get more space) or a table of N columns."""
+    __slots__ = ('layout', 'field', 'ppr', 'last_ppr', 'columns', 'column_width', 'grid', 'prefix')
+
+    def __init__(self, spec: dict, template: 'CompiledTemplate'):
+        self.layout = spec.get('layout', 'bullets')
+        self.field = spec.get('field')
+        self.prefix = spec.get('prefix', '')
+        if self.layout == 'columns':
+            self.ppr = template.paragraph_format(spec)
+            self.last_ppr = None
+            self.columns = spec['columns']
+            self.column_width = template.cell_width(self.columns)
+            self.grid = (int(spec['column_width'] * 1440),) * self.columns
+        else:
+            self.ppr = template.paragraph_format(dict(spec, style=spec.get('style', 'List Bullet')))
+            self.last_ppr = (template.paragraph_format(dict(spec, style=spec.get('style', 'List Bullet'),
+                                                            after=spec['last_after']))
+                             if 'last_after' in spec else None)
+
+    def render(self, body: _Body, items: list):
+        if self.layout == 'columns':
+            empty = cell_xml(self.column_width, paragraph_xml(self.ppr))
+            rows = []
+            for start in range(0, len(items), self.columns):
+                chunk = items[start:start + self.columns]
+                rows.append([cell_xml(self.column_width, paragraph_xml(self.ppr, run_xml(f"{self.prefix}{item}")))
+                             for item in chunk] + [empty] * (self.columns - len(chunk)))
+            body.write(table_xml(rows, self.grid, fixed=True))
+            return
+        last = len(items) - 1
+        for index, item in enumerate(items):
+            ppr = self.last_ppr if self.last_ppr and index == last else self.ppr
+            text = f"{self.prefix}{item}"
+            body.paragraph(paragraph_xml(ppr, run_xml(text) if text else ""))
+
+
+class _Section:
+    __slots__ = ('title', 'source', 'when', 'each', 'lines', 'bullets', 'fields')
+
+    def __init__(self, key: str, spec: dict, template: 'CompiledTemplate'):
+        self.title = spec.get('title', DEFAULT_SECTION_TITLES.get(key, key))
+        self.source = spec.get('source', 'user')
+        self.when = spec.get('when', key)
+        self.each = key if spec.get('each') else None
+        self.lines = tuple(_Line(line, template) for line in spec.get('lines', ()))
+        self.bullets = _ListLayout(spec['bullets'], template) if spec.get('bullets') else None
+        if self.each:
+            self.fields = (self.each,)
+        else:
+            self.fields = tuple(sorted(set().union({self.when}, *(line.fields for line in self.lines))))
+
+
+def _builtin_styles(spec: dict) -> tuple:
+    """Word's built-in styles a template needs from the base document: List Bullet and what its styles are based on."""
+    based_on = {props['based_on'] for props in spec.get('paragraphs', {}).values() if props.get('based_on')}
+    return tuple(sorted(based_on | {'List Bullet'}))
+
+
+def _style_name(key: str) -> str:
+    """Display name of a template style in Word's style list: 'job_title' -> 'CV Job Title'."""
+    return "CV " + key.replace('_', ' ').title()
+
+
+class CompiledTemplate:
+    """
+    A template spec compiled once: the styled empty package (the minimal base document with page
+    setup, Normal font and the template's named styles applied with python-docx) and the pPr/rPr XML of every line, which
+    mostly just reference those styles, so a render only fills in the text.
+    """
+
+    def __init__(self, name: str, spec: dict):
+        from docx import Document
+        from docx.shared import Inches, Pt
+
+        self.name = name
+        page = spec['page']
+        doc = Document(io.BytesIO(base_package(_builtin_styles(spec))))
+        for section in doc.sections:
+            section.top_margin = section.bottom_margin = Inches(page['margin'])
+            section.left_margin = section.right_margin = Inches(page['margin'])
+        normal = doc.styles['Normal']
+        normal.font.name = page['font']
+        normal.font.size = Pt(page['font_size'])
+        self._builtin_styles = {}
+        self._add_styles(doc.styles, spec)
+        section = doc.sections[-1]
+        self.block_width = section.page_width - section.left_margin - section.right_margin
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        self.package = buffer.getvalue()
+        self.skeleton = split_package(self.package)
+
+        self._styles = doc.styles
+        self.header = tuple(_Line(line, self) for line in spec['header'])
+        self.header_fields = tuple(sorted(set().union(*(line.fields for line in self.header))))
+        self._compile_section_title(spec['section_title'])
+        self.sections = {key: _Section(key, section_spec, self) for key, section_spec in spec['sections'].items()}
+        lists = spec.get('lists', {})
+        self.default_list = _ListLayout(lists.get('default', {}), self)
+        self.lists = {key: _ListLayout(layout, self) for key, layout in lists.items() if key != 'default'}
+        del self._styles
+
+    def _add_styles(self, styles, spec: dict):
+        """
+        Registers the template's character and paragraph styles in the package, so runs and paragraphs
+        reference a style id instead of repeating font, size and spacing on every element.
+        """
+        from docx.enum.style import WD_STYLE_TYPE
+        from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_TAB_ALIGNMENT
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import nsdecls
+        from docx.shared import Inches, Pt, RGBColor
+
+        def apply_font(font, props: dict):
+            if props.get('font'):
+                font.name = props['font']
+            if props.get('size') is not None:
+                font.size = Pt(props['size'])
+            if props.get('bold') is not None:
+                font.bold = props['bold']
+            if props.get('italic') is not None:
+                font.italic = props['italic']
+            if props.get('color'):
+                font.color.rgb = RGBColor.from_string(props['color'].upper())
+
+        alignments = {'left': WD_ALIGN_PARAGRAPH.LEFT, 'center': WD_ALIGN_PARAGRAPH.CENTER,
+                      'right': WD_ALIGN_PARAGRAPH.RIGHT, 'both': WD_ALIGN_PARAGRAPH.JUSTIFY}
+        self.run_styles = {}
+        for key, props in spec.get('runs', {}).items():
+            style = styles.add_style(f"{_style_name(key)} Char", WD_STYLE_TYPE.CHARACTER)
+            apply_font(style.font, props)
+            self.run_styles[key] = (style.style_id, dict(props))
+
+        self.paragraph_styles = {}
+        for key, props in spec.get('paragraphs', {}).items():
+            style = styles.add_style(_style_name(key), WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = styles[props.get('based_on', 'Normal')]
+            if props.get('border'):
+                # pBdr first: the setters below insert their elements after it, in schema order
+                style.element.get_or_add_pPr().append(parse_xml(paragraph_border(props['border'], nsdecls('w'))))
+            paragraph_format = style.paragraph_format
+            if props.get('align'):
+                paragraph_format.alignment = alignments[props['align']]
+            if props.get('before') is not None:
+                paragraph_format.space_before = Pt(props['before'])
+            if props.get('after') is not None:
+                paragraph_format.space_after = Pt(props['after'])
+            if props.get('right_tab') is not None:
+                paragraph_format.tab_stops.add_tab_stop(Inches(props['right_tab']), WD_TAB_ALIGNMENT.RIGHT)
+            apply_font(style.font, props.get('run', {}))
+            self.paragraph_styles[key] = (style.style_id, dict(props))
+
+    def style_formats(self) -> dict:
+        """style id -> the spec properties behind it, for consumers that resolve styles themselves (the preview)."""
+        formats = {style_id: dict(props, type='character') for style_id, props in self.run_styles.values()}
+        formats.update({style_id: dict(props, type='paragraph') for style_id, props in self.paragraph_styles.values()})
+        formats.update({style_id: {'type': 'paragraph', 'based_on': name} for name, style_id in self._builtin_styles.items()})
+        return formats
+
+    def run_format(self, style: str) -> str:
+        return run_properties(style=self.run_styles[style][0]) if style else ""
+
+    def paragraph_style_id(self, style: str) -> str:
+        """Id of a template paragraph style, or of a built-in Word style by name (e.g. 'List Bullet')."""
+        if style in self.paragraph_styles:
+            return self.paragraph_styles[style][0]
+        style_id = self._styles[style].style_id
+        self._builtin_styles[style] = style_id
+        return style_id
+
+    def paragraph_format(self, spec: dict) -> str:
+        style = spec.get('style')
+        return paragraph_properties(
+            style=self.paragraph_style_id(style) if style else None,
+            border=spec.get('border'),
+            right_tab=int(spec['right_tab'] * 1440) if spec.get('right_tab') is not None else None,
+            before=spec.get('before'), after=spec.get('after'), align=spec.get('align'))
+
+    def cell_width(self, columns: int) -> int:
+        """tcW python-docx gives each cell of a new table: text width split evenly, in twips."""
+        return int(round((self.block_width // columns) / 635))
+
+    def _compile_section_title(self, spec: dict):
+        self._gap_before = paragraph_xml(self.paragraph_format(spec.get('gap_before', {})))
+        self._title_ppr = self.paragraph_format(spec)
+
+    def _section_title(self, body: _Body, title: str, gap: bool):
+        if gap:
+            body.paragraph(self._gap_before)
+        body.paragraph(paragraph_xml(self._title_ppr, run_xml(title.upper())))
+
+    def _render_header(self, body: _Body, user_data: dict):
+        user_fields = _Fields(user_data)
+        for line in self.header:
+            if not line.when or user_fields[line.when]:
+                body.paragraph(line.render(user_fields))
+
+    def _render_section(self, body: _Body, section: _Section, source: dict, title: str, gap: bool):
+        self._section_title(body, title, gap)
+        for item in (source[section.each] if section.each else (source,)):
+            fields = _Fields(item)
+            for line in section.lines:
+                if not line.when or fields[line.when]:
+                    body.paragraph(line.render(fields))
+            if section.bullets is not None:
+                section.bullets.render(body, item.get(section.bullets.field, []))
+
+    def _render_list(self, body: _Body, section_key: str, title: str, items: list, gap: bool):
+        self._section_title(body, title, gap)
+        self.lists.get(section_key, self.default_list).render(body, items)
+
+    def render(self, body: _Body, user_data: dict, ai_data: dict, section_names: dict, section_order: list):
+        """
+        Writes the document body in the user's section order. The header and every section are
+        rendered as separate blocks and taken from the fragment cache when their inputs are unchanged.
+        """
+        header_data = {field: user_data.get(field) for field in self.header_fields}
+        body.splice(*fragment_cache.get_or_render(
+            lambda: _Body.capture(lambda part: self._render_header(part, user_data)),
+            self.name, 'header', header_data))
+
+        for section_key in section_order:
+            # A section title gets a blank paragraph before it unless it is at the top of the page
+            gap = body.paragraphs > 1
+            section = self.sections.get(section_key)
+            if section is not None:
+                source = ai_data if section.source == 'ai' else user_data
+                if source.get(section.when):
+                    title = section_names.get(section_key, section.title)
+                    section_data = {field: source.get(field) for field in section.fields}
+                    body.splice(*fragment_cache.get_or_render(
+                        lambda: _Body.capture(lambda part: self._render_section(part, section, source, title, gap)),
+                        self.name, section_key, title, gap, section_data))
+                    continue
+
+            # الأقسام الديناميكية الأخرى (مثل المهارات والاهتمامات)
+            if section_key in ai_data and section_key in section_names and ai_data[section_key]:
+                title = section_names[section_key]
+                items = list(ai_data[section_key])
+                body.splice(*fragment_cache.get_or_render(
+                    lambda: _Body.capture(lambda part: self._render_list(part, section_key, title, items, gap)),
+                    self.name, 'list', section_key, title, gap, items))
+
+    def body_fragments(self, user_data: dict, ai_data: dict, section_names: dict, section_order: list) -> list:
+        """The document body as one XML fragment per block (header, then each non-empty section in order)."""
+        parts = []
+        self.render(_Body(parts.append), user_data, ai_data, section_names, section_order)
+        return parts
+
+    def body_xml(self, user_data: dict, ai_data: dict, section_names: dict, section_order: list) -> str:
+        """The document body (w:p / w:tbl blocks, without the final w:sectPr) as one XML string."""
+        return "".join(self.body_fragments(user_data, ai_data, section_names, section_order))
+
+    def write_docx(self, user_data: dict, ai_data: dict, file_path, section_names: dict, section_order: list):
+        """Builds the document with python-docx (compiled fragments parsed into the styled package) and saves it."""
+        from docx import Document
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import nsdecls
+
+        doc = Document(io.BytesIO(self.package))
+        xml = self.body_xml(user_data, ai_data, section_names, section_order)
+        body = parse_xml(f'<w:body {nsdecls("w")}>{xml}</w:body>')
+        # New blocks go right before the final w:sectPr, as doc.add_paragraph would put them
+        sect_pr = doc.element.body.sectPr
+        for element in list(body):
+            sect_pr.addprevious(element)
+        # Only the main document part changed: serialize it and copy the other parts precompressed
+        write_package(file_path, self.skeleton, doc.part.blob)
+
+    def write_ooxml(self, user_data: dict, ai_data: dict, file_path, section_names: dict, section_order: list):
+        """Streams the document straight into the .docx zip, without a python-docx tree."""
+        with OoxmlDocument(file_path, self.skeleton) as doc:
+            self.render(_Body(doc.write), user_data, ai_data, section_names, section_order)
+
+
+@lru_cache(maxsize=None)
+def _compile(name: str) -> CompiledTemplate:
+    return CompiledTemplate(name, TEMPLATES[name])
+
+
+def get_template(name: str) -> CompiledTemplate:
+    """The compiled template (built on first use, then cached); unknown names fall back to the default template."""
+    return _compile(name if name in TEMPLATES else DEFAULT_TEMPLATE)
+
+
+# --- Backend selection ---
+
+def get_cv_writer(template: str, backend: str = 'docx'):
+    """write_cv(user_data, ai_data, file_path, section_names, section_order) of the template for the backend."""
+    compiled = get_template(template)
+    return compiled.write_ooxml if backend == 'ooxml' else compiled.write_docx
+
+
+def load_render_backend() -> str:
+    """'docx' (python-docx) or 'ooxml' (direct XML writer), from the app preferences."""
+    backend = settings_manager.load_settings('app_preferences', {}).get('render_backend', 'docx')
+    return backend if backend in RENDER_BACKENDS else 'docx'
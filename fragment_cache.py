@@ -0,0 +1,71 @@
+# fragment_cache.py
+# ذاكرة مؤقتة (في الذاكرة) لأجزاء XML المرسومة لكل قسم من السيرة الذاتية، مفهرسة ببصمة مدخلاته،
+# حتى يُجمَّع المستند من الأجزاء المحفوظة ولا يُعاد رسم إلا القسم الذي تغيّر
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class FragmentCache:
+    """
+    In-memory LRU cache of rendered document blocks (header, sections), keyed by a hash of
+    everything the block's XML depends on: template, section key and title, and the data the
+    section reads. Reordering sections or regenerating one of them re-renders only what changed,
+    and in batch mode the profile sections shared by every CV are rendered once per process.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*inputs) -> str:
+        encoded = json.dumps(inputs, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, render: Callable[[], Any], *inputs) -> Any:
+        """The cached value for these inputs, or render() stored under them; render() alone when disabled."""
+        if not self.enabled or self.max_entries <= 0:
+            return render()
+        key = self.make_key(*inputs)
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Single instance for the process (each render worker has its own)
+fragment_cache = FragmentCache()
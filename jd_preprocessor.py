@@ -0,0 +1,206 @@
+# jd_preprocessor.py
+# تنظيف الوصف الوظيفي قبل إرساله إلى الذكاء الاصطناعي لتقليل عدد الرموز (tokens)
+
+import re
+from typing import Optional
+
+from settings_manager import settings_manager
+from token_counter import estimate_tokens
+
+# Headings that open a block with nothing useful for tailoring a CV (the whole block is dropped)
+_BOILERPLATE_HEADINGS = re.compile(
+    # "About <company>" only: "About the team / the role / you" headings hold role content
+    r"^(about (us|the company|(?!(the|this|you|your|our)\b)[a-z0-9&.\- ]{1,40})|who we are|our (story|mission|values|culture)|"
+    r"benefits( and perks| & perks)?|perks( and benefits| & benefits)?|what we offer|why (join us|work (here|with us))|"
+    r"compensation( and benefits| & benefits)?|equal (employment )?opportunity.*|eeo( statement)?|diversity.*|"
+    r"عن الشركة|من نحن|المزايا|ما نقدمه)$",
+    re.IGNORECASE,
+)
+# Section names of the role itself; an unmarked short line matching one ends a boilerplate block
+_ROLE_HEADINGS = re.compile(
+    r"^((key |main |core )?(requirements|responsibilities|qualifications|duties)|"
+    r"(minimum|basic|preferred|required) (qualifications|skills|experience)|"
+    r"about (the|this) (role|position|job|opportunity|team)|about you|the role|your role|role (overview|summary)|"
+    r"job (description|summary|overview)|what you('ll| will) do|what you('ll| will) bring|what we('re| are) looking for|"
+    r"who you are|(skills|experience)( and (skills|experience|qualifications))?|nice to have|bonus points|"
+    r"(tech|technology) stack|tools|المتطلبات|المسؤوليات|المؤهلات|المهام|الوصف الوظيفي)$",
+    re.IGNORECASE,
+)
+# Sentences that are boilerplate wherever they appear (EEO / accommodation / recruiter notices)
+_BOILERPLATE_SENTENCES = re.compile(
+    r"equal (employment )?opportunity|without regard to (race|age|sex|gender)|affirmative action|"
+    r"reasonable accommodations?|e-verify|protected veteran|recruitment agencies|unsolicited (resumes|applications)",
+    re.IGNORECASE,
+)
+_HEADING_MARKUP = re.compile(r"^(#+\s*|\*\*)|(\*\*|:)$")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?؟])\s+")
+_WHITESPACE = re.compile(r"[ \t ]+")
+_NON_WORD = re.compile(r"[^\w]+")
+
+DEFAULT_OPTIONS = {
+    'preprocess_job_desc': True,
+    'job_desc_token_budget': 0,  # 0 = no truncation
+}
+
+
+class PreprocessResult:
+    """The cleaned job description together with its token counts before and after."""
+
+    def __init__(self, text: str, original_tokens: int, tokens: int, truncated: bool = False):
+        self.text = text
+        self.original_tokens = original_tokens
+        self.tokens = tokens
+        self.truncated = truncated
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+    def report(self) -> str:
+        percent = self.tokens_saved / self.original_tokens * 100 if self.original_tokens else 0.0
+        return (f"Job description: {self.original_tokens} -> {self.tokens} tokens "
+                f"({self.tokens_saved} saved, {percent:.0f}%){' [truncated]' if self.truncated else ''}")
+
+
+def _heading_text(line: str) -> Optional[str]:
+    """Return the bare heading text if the line looks like a heading, else None."""
+    stripped = _HEADING_MARKUP.sub("", line).strip()
+    if not stripped or len(stripped) > 60:
+        return None
+    if line.startswith("#") or line.endswith(":") or (line.startswith("**") and line.endswith("**")) or \
+            (stripped.isupper() and len(stripped.split()) <= 6):
+        return stripped
+    return None
+
+
+def _is_bullet(line: str) -> bool:
+    return line[:1] in "-*•" or bool(re.match(r"^\d+[.)]\s", line))
+
+
+def normalize_whitespace(text: str) -> list:
+    """Split into non-empty lines with collapsed inner whitespace."""
+    lines = []
+    for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = _WHITESPACE.sub(" ", line).strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def remove_boilerplate(lines: list) -> list:
+    """Drop company blurbs, benefits and EEO blocks (by heading) and boilerplate sentences anywhere."""
+    kept = []
+    skipping = False
+    for line in lines:
+        heading = _heading_text(line)
+        if heading is None and not _is_bullet(line) and len(line.split()) <= 5 and line[-1:] not in ".!?؟,;" and \
+                (_BOILERPLATE_HEADINGS.match(line) or (skipping and _ROLE_HEADINGS.match(line))):
+            # Unmarked short lines act as headings only when they name a known section: "Benefits" opens
+            # a boilerplate block, "Requirements" ends it; other short lines ("Unlimited PTO") are its items
+            heading = line
+        if heading is not None:
+            skipping = bool(_BOILERPLATE_HEADINGS.match(heading))
+            if not skipping:
+                kept.append(line)
+            continue
+        if skipping:
+            continue
+        sentences = [s for s in _SENTENCE_SPLIT.split(line) if not _BOILERPLATE_SENTENCES.search(s)]
+        if sentences:
+            kept.append(" ".join(sentences))
+    return kept
+
+
+def deduplicate(lines: list) -> list:
+    """Remove repeated lines/sentences (case, punctuation and bullet markers ignored)."""
+    seen = set()
+    kept = []
+    for line in lines:
+        if _is_bullet(line) or _heading_text(line) is not None:
+            units = [line]
+        else:
+            units = _SENTENCE_SPLIT.split(line)
+        unique = []
+        for unit in units:
+            fingerprint = _NON_WORD.sub(" ", unit.lower()).strip()
+            if not fingerprint or fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            unique.append(unit)
+        if unique:
+            kept.append(" ".join(unique))
+    return kept
+
+
+def _fit(units: list, separator: str, token_budget: int) -> list:
+    """The leading units (sentences or words) that fit in the token budget (counted unit by unit)."""
+    kept = []
+    used = 0
+    for unit in units:
+        used += estimate_tokens(separator + unit if kept else unit)
+        if used > token_budget:
+            break
+        kept.append(unit)
+    return kept
+
+
+def _cut_line(line: str, token_budget: int) -> str:
+    """The start of a line that is over the budget: whole sentences first, then whole words."""
+    sentences = _fit(_SENTENCE_SPLIT.split(line), " ", token_budget)
+    if sentences:
+        return " ".join(sentences)
+    return " ".join(_fit(line.split(" "), " ", token_budget))
+
+
+def truncate_to_budget(lines: list, token_budget: int):
+    """
+    Keep lines from the top until the token budget is reached; the line that does not fit is cut
+    by sentences, then by words. Returns (lines, truncated); never empty when lines is not.
+    """
+    kept = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1  # + newline
+        if used + cost > token_budget:
+            cut = _cut_line(line, token_budget - used - 1)
+            if cut:
+                kept.append(cut)
+            elif not kept:
+                # Not even one word fits: a single-paragraph description still sends its first word
+                kept.append(line.split(" ")[0])
+            return kept, True
+        kept.append(line)
+        used += cost
+    return kept, False
+
+
+def preprocess_job_description(text: str, token_budget: int = 0, strip_boilerplate: bool = True) -> PreprocessResult:
+    """
+    تنظيف الوصف الوظيفي: توحيد المسافات، حذف الفقرات النمطية (مزايا، نبذة عن الشركة، تكافؤ الفرص)،
+    حذف الجمل المكررة، ثم الاقتطاع إلى حد أقصى من الرموز إن طُلب ذلك.
+    """
+    original_tokens = estimate_tokens(text)
+    lines = normalize_whitespace(text)
+    if strip_boilerplate:
+        cleaned = remove_boilerplate(lines)
+        # Never strip everything: a description made only of "boilerplate" is still the job description
+        if cleaned:
+            lines = cleaned
+    lines = deduplicate(lines)
+    truncated = False
+    if token_budget and token_budget > 0:
+        lines, truncated = truncate_to_budget(lines, token_budget)
+    cleaned_text = "\n".join(lines)
+    return PreprocessResult(cleaned_text, original_tokens, estimate_tokens(cleaned_text), truncated)
+
+
+def load_preprocess_options() -> dict:
+    """Preprocessing switches stored with the app preferences."""
+    preferences = settings_manager.load_settings('app_preferences', {})
+    return {key: preferences.get(key, default) for key, default in DEFAULT_OPTIONS.items()}
+
+
+def save_preprocess_options(**options) -> bool:
+    preferences = settings_manager.load_settings('app_preferences', {})
+    preferences.update({k: v for k, v in options.items() if k in DEFAULT_OPTIONS})
+    return settings_manager.save_settings('app_preferences', preferences)
@@ -61,6 +61,10 @@ class LanguageManager:
                 "website_referer": "رابط موقعك (Referer):",
                 "website_title": "اسم موقعك (Title):",
                 "excluded_words": "كلمات مستبعدة (بفاصلة):",
+                "hedge_requests": "إرسال طلب احتياطي إلى المزود الآخر عند تأخر الاستجابة",
+                "preprocess_job_desc": "تنظيف الوصف الوظيفي قبل الإرسال (حذف النصوص النمطية والتكرار)",
+                "structured_output": "طلب استجابة بصيغة JSON منظمة (أسرع تحليلاً، بدون عرض الأقسام أثناء الوصول)",
+                "parallel_sections": "توليد الأقسام بطلبات متوازية (طلب لكل قسم)",
                 "save": "حفظ",
                 "cancel": "إلغاء",
 
@@ -98,6 +102,11 @@ class LanguageManager:
                 "template_professional_name": "التصميم الاحترافي",
                 "template_professional_desc": "تصميم كلاسيكي وواضح، مناسب للتقديمات الرسمية والشركات الكبرى.",
                 "template_preview": "معاينة القالب",
+                "live_preview_frame": "معاينة حية للسيرة الذاتية",
+                "preview_updated": "تم التحديث خلال {ms} مللي ثانية (البناء: {build_ms} مللي ثانية)",
+                "preview_error": "تعذر إنشاء المعاينة: {error}",
+                "preview_sample_profile": "سيظهر هنا الملخص المهني الذي يكتبه الذكاء الاصطناعي بعد إنشاء السيرة الذاتية.",
+                "preview_sample_item": "عنصر نموذجي {number}",
                 
                 # Dialogs
                 "add_certification": "إضافة شهادة",
@@ -140,13 +149,20 @@ class LanguageManager:
                 "position_company_required": "المسمى الوظيفي واسم الشركة حقول إلزامية.",
                 "select_item_to_delete": "يرجى تحديد عنصر لحذفه.",
                 "analyzing_job_description": "جاري تحليل الوصف الوظيفي... قد يستغرق الأمر بعض الوقت.",
+                "sections_received": "الأقسام المستلمة: {sections}",
                 "api_error": "خطأ من الـ API",
                 "api_client_error": "حدث خطأ عند تهيئة العميل: {error}",
                 "write_error": "خطأ في الكتابة",
                 "save_failed": "فشل حفظ الملف: {error}",
                 "cv_created_successfully": "تم إنشاء السيرة الذاتية في:\n{path}",
+                "saving_cv": "جاري إنشاء ملف الوورد وحفظه...",
+                "will_save_to": "سيتم الحفظ في: {path}",
                 "sections_order_saved": "تم حفظ ترتيب الأقسام بنجاح.",
                 "completed_successfully": "اكتمل بنجاح",
+                "loaded_from_cache": "تم استخدام نتيجة محفوظة مسبقاً لنفس الوصف الوظيفي دون استدعاء الذكاء الاصطناعي.",
+                "reused_near_duplicate": "تم استخدام نتيجة وصف وظيفي مشابه تقريباً دون استدعاء الذكاء الاصطناعي.",
+                "near_duplicate_title": "وصف وظيفي مشابه",
+                "near_duplicate_prompt": "هذا الوصف الوظيفي مطابق بنسبة {similarity} تقريباً لوصف تم تحليله سابقاً.\nهل تريد استخدام النتيجة السابقة بدلاً من استدعاء الذكاء الاصطناعي؟",
                 
                 # About Window
                 "about_window_title": "حول",
@@ -200,6 +216,10 @@ class LanguageManager:
                 "website_referer": "Website Referer:",
                 "website_title": "Website Title:",
                 "excluded_words": "Excluded Words (comma-separated):",
+                "hedge_requests": "Send a backup request to the other provider when a response is slow",
+                "preprocess_job_desc": "Clean up the job description before sending (remove boilerplate and duplicates)",
+                "structured_output": "Request structured JSON output (faster parsing, no live section progress)",
+                "parallel_sections": "Generate sections in parallel (one request per section)",
                 "save": "Save",
                 "cancel": "Cancel",
 
@@ -237,6 +257,11 @@ class LanguageManager:
                 "template_professional_name": "Professional Design",
                 "template_professional_desc": "A classic and clear design, suitable for formal applications and large corporations.",
                 "template_preview": "Template Preview",
+                "live_preview_frame": "Live CV Preview",
+                "preview_updated": "Updated in {ms} ms (build: {build_ms} ms)",
+                "preview_error": "Could not build the preview: {error}",
+                "preview_sample_profile": "The professional summary written by the AI will appear here once the CV is generated.",
+                "preview_sample_item": "Sample item {number}",
                 
                 # Dialogs
                 "add_certification": "Add Certification",
@@ -279,13 +304,20 @@ class LanguageManager:
                 "position_company_required": "Job position and company name are required fields.",
                 "select_item_to_delete": "Please select an item to delete.",
                 "analyzing_job_description": "Analyzing job description... This may take some time.",
+                "sections_received": "Sections received: {sections}",
                 "api_error": "API Error",
                 "api_client_error": "Error initializing client: {error}",
                 "write_error": "Write Error",
                 "save_failed": "Failed to save file: {error}",
                 "cv_created_successfully": "CV created successfully at:\n{path}",
+                "saving_cv": "Creating and saving the Word file...",
+                "will_save_to": "Will be saved to: {path}",
                 "sections_order_saved": "Section order saved successfully.",
                 "completed_successfully": "Completed Successfully",
+                "loaded_from_cache": "A saved result for the same job description was reused without calling the AI.",
+                "reused_near_duplicate": "The result of an almost identical job description was reused without calling the AI.",
+                "near_duplicate_title": "Similar job description",
+                "near_duplicate_prompt": "This job description is about {similarity} similar to one analyzed before.\nReuse the previous result instead of calling the AI?",
                 
                 # About Window
                 "about_window_title": "About",
@@ -0,0 +1,231 @@
+# near_duplicate_index.py
+# فهرس MinHash للعثور على أوصاف وظيفية شبه مكررة (إعادة نشر، تعديلات طفيفة) وإعادة استخدام نتائجها
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from settings_manager import settings_manager
+from response_cache import response_cache
+
+_WORD = re.compile(r"[^\W_]+")
+_MASK_64 = (1 << 64) - 1
+
+
+class NearDuplicateMatch:
+    """A previously analyzed job description similar to the query."""
+
+    def __init__(self, cache_key: str, similarity: float, job_id: str = ""):
+        self.cache_key = cache_key
+        self.similarity = similarity
+        self.job_id = job_id
+
+
+class NearDuplicateIndex:
+    """
+    MinHash / LSH index over previously analyzed job descriptions.
+
+    - Text is reduced to word shingles (numbers dropped, so requisition IDs and dates do not
+      count); every shingle is hashed once and the signature is built with one-permutation
+      hashing (num_perm bins, minimum per bin), which keeps signing linear in the text length.
+    - Signatures are split into bands; a lookup only compares entries sharing at least one band
+      bucket, so its cost does not grow with the number of indexed jobs.
+    - Entries point at response_cache keys and are scoped by a context key (section names and
+      excluded words), since a result is only reusable for the same section configuration.
+    - The index is an append-only JSONL file in the app data folder, loaded on first use.
+    """
+
+    def __init__(self, data_dir: str, num_perm: int = 64, bands: int = 16, shingle_size: int = 3,
+                 max_entries: int = 50000):
+        self.path = os.path.join(data_dir, "index.jsonl")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self._entries: List[Tuple[str, str, str, tuple]] = []  # (context, cache_key, job_id, signature)
+        self._known_keys = set()
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # --- Signatures ---
+
+    def shingles(self, text: str) -> set:
+        words = [w for w in _WORD.findall((text or "").lower()) if not w.isdigit()]
+        size = self.shingle_size
+        if len(words) < size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+    def signature(self, text: str) -> Optional[tuple]:
+        """One-permutation MinHash signature, or None for text without words."""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        num_perm = self.num_perm
+        bins = [_MASK_64] * num_perm
+        for shingle in shingles:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+            b = h % num_perm
+            if h < bins[b]:
+                bins[b] = h
+        # Densify empty bins from the next non-empty one (rotation) so short texts still compare
+        if _MASK_64 in bins:
+            filled = [i for i, v in enumerate(bins) if v != _MASK_64]
+            for i in range(num_perm):
+                if bins[i] == _MASK_64:
+                    j = next((k for k in filled if k > i), filled[0])
+                    bins[i] = bins[j] ^ (((j - i) % num_perm) * 0x9E3779B97F4A7C15 & _MASK_64)
+        return tuple(bins)
+
+    @staticmethod
+    def similarity(sig_a: tuple, sig_b: tuple) -> float:
+        """Estimated Jaccard similarity: the share of equal signature bins."""
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+    @staticmethod
+    def context_key(section_names: dict, excluded_terms: list) -> str:
+        payload = json.dumps([[k, v] for k, v in (section_names or {}).items()] +
+                             sorted(t.strip().lower() for t in excluded_terms or [] if t.strip()), ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def _band_keys(self, signature: tuple):
+        rows = self.rows
+        return [(band, signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    # --- Storage ---
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        if len(record['s']) == self.num_perm:
+                            records.append(record)
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue  # a partially written last line
+        except (IOError, OSError) as e:
+            print(f"Error loading near-duplicate index: {e}")
+            return
+        for record in records[-self.max_entries:]:
+            self._insert(record['c'], record['k'], record.get('id', ''), tuple(record['s']))
+        if len(records) > self.max_entries:
+            self._rewrite()
+
+    def _insert(self, context: str, cache_key: str, job_id: str, signature: tuple):
+        index = len(self._entries)
+        self._entries.append((context, cache_key, job_id, signature))
+        self._known_keys.add(cache_key)
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(index)
+
+    def _rewrite(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for context, cache_key, job_id, signature in self._entries:
+                    f.write(json.dumps({'c': context, 'k': cache_key, 'id': job_id, 's': list(signature)}) + "\n")
+            os.replace(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            print(f"Error compacting near-duplicate index: {e}")
+
+    # --- Public API ---
+
+    def add(self, job_desc: str, context: str, cache_key: str, job_id: str = "") -> bool:
+        """Index an analyzed job description (once per cache key)."""
+        signature = self.signature(job_desc)
+        if signature is None:
+            return False
+        with self._lock:
+            self._load()
+            if cache_key in self._known_keys:
+                return False
+            self._insert(context, cache_key, job_id, signature)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'c': context, 'k': cache_key, 'id': job_id, 's': list(signature)}) + "\n")
+            except (IOError, OSError) as e:
+                print(f"Error writing near-duplicate index: {e}")
+                return False
+        return True
+
+    def find(self, job_desc: str, context: str, threshold: float = 0.85, exclude_key: str = None,
+             signature: tuple = None) -> List[NearDuplicateMatch]:
+        """
+        يُرجع الأوصاف السابقة المشابهة بدرجة threshold أو أكثر (الأكثر تشابهاً أولاً).
+        - signature: توقيع محسوب مسبقاً للوصف (اختياري).
+        """
+        signature = signature or self.signature(job_desc)
+        if signature is None:
+            return []
+        with self._lock:
+            self._load()
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            matches = []
+            for index in candidates:
+                entry_context, cache_key, job_id, entry_signature = self._entries[index]
+                if entry_context != context or cache_key == exclude_key:
+                    continue
+                score = self.similarity(signature, entry_signature)
+                if score >= threshold:
+                    matches.append(NearDuplicateMatch(cache_key, score, job_id))
+        matches.sort(key=lambda m: m.similarity, reverse=True)
+        return matches
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._known_keys = set()
+            self._buckets = {}
+            self._loaded = True
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def load_similarity_threshold() -> float:
+    """Minimum estimated Jaccard similarity for reusing a prior result (app preferences)."""
+    return float(settings_manager.load_settings('app_preferences', {}).get('near_duplicate_threshold', 0.85))
+
+
+# فهرس مشترك داخل مجلد بيانات التطبيق بجوار الذاكرة المؤقتة للاستجابات
+near_duplicate_index = NearDuplicateIndex(settings_manager.get_data_dir('near_duplicates'))
+
+
+def find_reusable_result(job_desc: str, section_names: dict, excluded_terms: list, threshold: float = None):
+    """
+    يبحث عن نتيجة سابقة لوصف شبه مطابق ما زالت موجودة في الذاكرة المؤقتة.
+    يُرجع (NearDuplicateMatch, ai_data) أو (None, None).
+    """
+    threshold = load_similarity_threshold() if threshold is None else threshold
+    context = NearDuplicateIndex.context_key(section_names, excluded_terms)
+    for match in near_duplicate_index.find(job_desc, context, threshold):
+        cached = response_cache.get(match.cache_key)
+        if cached is not None:
+            return match, cached['data']
+    return None, None
+
+
+def remember_result(job_desc: str, section_names: dict, excluded_terms: list, cache_key: str, job_id: str = "") -> bool:
+    """Index a freshly generated result so later near-duplicates can reuse it."""
+    return near_duplicate_index.add(job_desc, NearDuplicateIndex.context_key(section_names, excluded_terms), cache_key, job_id)
@@ -0,0 +1,299 @@
+# ooxml_writer.py
+# كتابة ملف الوورد مباشرة من أجزاء XML جاهزة دون بناء شجرة python-docx (أسرع وأقل استهلاكاً للذاكرة)
+
+import io
+import os
+import re
+import struct
+import time
+import zipfile
+import zlib
+from collections import namedtuple
+
+_DOCUMENT_PART = 'word/document.xml'
+_FLUSH_SIZE = 64 * 1024
+_RUN_SPLIT = re.compile(r"([\t\r\n])")
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+# --- Precompiled XML fragments ---
+
+def _escape(text: str) -> str:
+    return _INVALID_XML_CHARS.sub("", text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _run_content(text: str) -> str:
+    """Same content python-docx writes for run text: <w:t> pieces, <w:tab/> for tabs, <w:br/> for line breaks."""
+    parts = []
+    for piece in _RUN_SPLIT.split(text):
+        if piece == "\t":
+            parts.append("<w:tab/>")
+        elif piece in ("\r", "\n"):
+            parts.append("<w:br/>")
+        elif piece:
+            preserve = ' xml:space="preserve"' if len(piece.strip()) < len(piece) else ""
+            parts.append(f"<w:t{preserve}>{_escape(piece)}</w:t>")
+    return "".join(parts)
+
+
+def run_properties(style: str = None, font: str = None, size: float = None, bold: bool = None, italic: bool = None,
+                   color: str = None) -> str:
+    """Run properties, children in schema order (rStyle, rFonts, b, i, color, sz)."""
+    children = []
+    if style:
+        children.append(f'<w:rStyle w:val="{style}"/>')
+    if font:
+        children.append(f'<w:rFonts w:ascii="{font}" w:hAnsi="{font}"/>')
+    if bold is not None:
+        children.append("<w:b/>" if bold else '<w:b w:val="0"/>')
+    if italic is not None:
+        children.append("<w:i/>" if italic else '<w:i w:val="0"/>')
+    if color:
+        children.append(f'<w:color w:val="{color.upper()}"/>')
+    if size is not None:
+        children.append(f'<w:sz w:val="{int(size * 2)}"/>')
+    return f"<w:rPr>{''.join(children)}</w:rPr>" if children else ""
+
+
+def paragraph_border(border: str, namespaces: str = "") -> str:
+    """Single rule above ('top'), below ('bottom') or around ('both') the paragraph, as a w:pBdr element."""
+    sides = ('top', 'bottom') if border == 'both' else (border,)
+    rules = "".join(f'<w:{side} w:val="single" w:sz="6" w:space="1" w:color="auto"/>' for side in sides)
+    return f"<w:pBdr{' ' + namespaces if namespaces else ''}>{rules}</w:pBdr>"
+
+
+def paragraph_properties(style: str = None, border: str = None, right_tab: int = None,
+                         before: float = None, after: float = None, align: str = None) -> str:
+    """Paragraph properties, children in schema order (pStyle, pBdr, tabs, spacing, jc); sizes in pt."""
+    children = []
+    if style:
+        children.append(f'<w:pStyle w:val="{style}"/>')
+    if border:
+        children.append(paragraph_border(border))
+    if right_tab is not None:
+        children.append(f'<w:tabs><w:tab w:pos="{right_tab}" w:val="right"/></w:tabs>')
+    spacing = ""
+    if before is not None:
+        spacing += f' w:before="{int(before * 20)}"'
+    if after is not None:
+        spacing += f' w:after="{int(after * 20)}"'
+    if spacing:
+        children.append(f"<w:spacing{spacing}/>")
+    if align:
+        children.append(f'<w:jc w:val="{align}"/>')
+    return f"<w:pPr>{''.join(children)}</w:pPr>" if children else ""
+
+
+def run_xml(text: str, rpr: str = "") -> str:
+    content = _run_content(text)
+    return f"<w:r>{rpr}{content}</w:r>" if rpr or content else "<w:r/>"
+
+
+def paragraph_xml(ppr: str = "", runs: str = "") -> str:
+    return f"<w:p>{ppr}{runs}</w:p>" if ppr or runs else "<w:p/>"
+
+
+# --- Tables ---
+
+_TBL_LOOK = ('<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" '
+             'w:noVBand="1" w:val="04A0"/>')
+
+
+def cell_xml(width: int, content: str, valign: str = None) -> str:
+    """Table cell of the given width (twips); content is the cell's paragraph XML."""
+    valign = f'<w:vAlign w:val="{valign}"/>' if valign else ""
+    return f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/>{valign}</w:tcPr>{content}</w:tc>'
+
+
+def table_xml(rows: list, grid: tuple, align: str = None, fixed: bool = False) -> str:
+    """Table as python-docx creates it (auto width, default look); rows are lists of cell_xml, grid in twips."""
+    properties = '<w:tblW w:type="auto" w:w="0"/>'
+    if align:
+        properties += f'<w:jc w:val="{align}"/>'
+    if fixed:
+        properties += '<w:tblLayout w:type="fixed"/>'
+    columns = "".join(f'<w:gridCol w:w="{width}"/>' for width in grid)
+    body = "".join(f"<w:tr>{''.join(cells)}</w:tr>" for cells in rows)
+    return f"<w:tbl><w:tblPr>{properties}{_TBL_LOOK}</w:tblPr><w:tblGrid>{columns}</w:tblGrid>{body}</w:tbl>"
+
+
+# --- Zip package ---
+
+# A part deflated once (raw deflate data, CRC-32 and sizes) that can be copied into any number of archives
+CompressedPart = namedtuple('CompressedPart', ['name', 'crc', 'size', 'data', 'date_time'])
+
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_END_RECORD = struct.Struct('<IHHHHIIH')
+
+
+def _deflater():
+    return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+
+
+def compress_part(name: str, data: bytes, date_time: tuple = None) -> CompressedPart:
+    """Deflates a part once, the same way zipfile's ZIP_DEFLATED does."""
+    deflater = _deflater()
+    return CompressedPart(name, zlib.crc32(data), len(data), deflater.compress(data) + deflater.flush(),
+                          date_time or time.localtime()[:6])
+
+
+class PackageWriter:
+    """
+    Minimal zip writer for .docx packages: every entry arrives already deflated (CompressedPart) and
+    is copied into the archive as it is, so parts shared by every CV are never compressed again.
+    """
+
+    def __init__(self, file_path):
+        self._owns_file = isinstance(file_path, (str, os.PathLike))
+        self._file = open(file_path, 'wb') if self._owns_file else file_path
+        self._offset = 0
+        self._central = []
+
+    def add(self, part: CompressedPart):
+        name = part.name.encode('utf-8')
+        flags = 0 if name.isascii() else 0x800  # bit 11: UTF-8 file name
+        year, month, day, hour, minute, second = part.date_time
+        dos_time = (hour << 11) | (minute << 5) | (second // 2)
+        dos_date = ((year - 1980) << 9) | (month << 5) | day
+        header = _LOCAL_HEADER.pack(0x04034B50, 20, flags, zipfile.ZIP_DEFLATED, dos_time, dos_date, part.crc,
+                                    len(part.data), part.size, len(name), 0)
+        self._central.append(_CENTRAL_HEADER.pack(0x02014B50, 20, 20, flags, zipfile.ZIP_DEFLATED, dos_time,
+                                                  dos_date, part.crc, len(part.data), part.size, len(name), 0, 0,
+                                                  0, 0, 0o600 << 16, self._offset) + name)
+        self._file.write(header + name)
+        self._file.write(part.data)
+        self._offset += len(header) + len(name) + len(part.data)
+
+    def close(self):
+        """Writes the central directory and end record (and closes the file if it was opened here)."""
+        central = b"".join(self._central)
+        self._file.write(central)
+        self._file.write(_END_RECORD.pack(0x06054B50, 0, 0, len(self._central), len(self._central), len(central),
+                                          self._offset, 0))
+        if self._owns_file:
+            self._file.close()
+
+    def abort(self):
+        if self._owns_file:
+            self._file.close()
+
+
+# --- Package skeleton ---
+
+# Static parts of a package, deflated once ([CompressedPart]), the document properties parts ([(name, xml)],
+# written per save), document.xml up to <w:body>, and from the final <w:sectPr>
+PackageSkeleton = namedtuple('PackageSkeleton', ['parts', 'properties', 'prefix', 'suffix'])
+
+# Core/extended properties describe each saved document (created/modified time), so they are never reused
+_PROPERTIES_PREFIX = 'docProps/'
+_CORE_DATES = re.compile(r"(<dcterms:(created|modified)\b[^>]*>)[^<]*(</dcterms:\2>)")
+
+
+def split_package(package: bytes) -> PackageSkeleton:
+    """Splits a saved .docx (e.g. an empty, styled python-docx document) into the pieces OoxmlDocument streams around."""
+    with zipfile.ZipFile(io.BytesIO(package)) as archive:
+        parts = [(info, archive.read(info)) for info in archive.infolist()]
+    document_xml = next(data for info, data in parts if info.filename == _DOCUMENT_PART).decode('utf-8')
+    body_start = document_xml.index("<w:body>") + len("<w:body>")
+    return PackageSkeleton([compress_part(info.filename, data, info.date_time) for info, data in parts
+                            if info.filename != _DOCUMENT_PART and not info.filename.startswith(_PROPERTIES_PREFIX)],
+                           [(info.filename, data) for info, data in parts if info.filename.startswith(_PROPERTIES_PREFIX)],
+                           document_xml[:body_start], document_xml[document_xml.rindex("<w:sectPr"):])
+
+
+def property_parts(skeleton: PackageSkeleton) -> list:
+    """The skeleton's docProps parts for a new document: core.xml created/modified set to now (UTC), deflated."""
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    parts = []
+    for name, data in skeleton.properties:
+        if name == 'docProps/core.xml':
+            data = _CORE_DATES.sub(lambda match: f"{match.group(1)}{now}{match.group(3)}", data.decode('utf-8'))
+            data = data.encode('utf-8')
+        parts.append(compress_part(name, data))
+    return parts
+
+
+def _remove_partial(file_path):
+    if isinstance(file_path, (str, os.PathLike)):
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+
+def write_package(file_path, skeleton: PackageSkeleton, document_xml: bytes):
+    """
+    Saves a package around a new document.xml: the skeleton's static parts are copied precompressed,
+    the document properties and document.xml are deflated for this file.
+    """
+    writer = PackageWriter(file_path)
+    try:
+        for part in skeleton.parts + property_parts(skeleton):
+            writer.add(part)
+        writer.add(compress_part(_DOCUMENT_PART, document_xml))
+        writer.close()
+    except BaseException:
+        writer.abort()
+        _remove_partial(file_path)
+        raise
+
+
+class OoxmlDocument:
+    """
+    Streams a .docx: the static parts of the skeleton are copied precompressed, the document properties
+    are written for this file and the body of word/document.xml is deflated chunk by chunk as fragments arrive.
+    """
+
+    def __init__(self, file_path, skeleton: PackageSkeleton):
+        self.file_path = file_path
+        self._suffix = skeleton.suffix
+        self._writer = PackageWriter(file_path)
+        for part in skeleton.parts + property_parts(skeleton):
+            self._writer.add(part)
+        self._deflater = _deflater()
+        self._compressed = []
+        self._crc = 0
+        self._size = 0
+        self._buffer = [skeleton.prefix]
+        self._buffered = 0
+
+    def write(self, fragment: str):
+        self._buffer.append(fragment)
+        self._buffered += len(fragment)
+        if self._buffered >= _FLUSH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        data = "".join(self._buffer).encode('utf-8')
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        self._compressed.append(self._deflater.compress(data))
+        self._buffer = []
+        self._buffered = 0
+
+    def close(self):
+        self._buffer.append(self._suffix)
+        self._flush()
+        self._compressed.append(self._deflater.flush())
+        self._writer.add(CompressedPart(_DOCUMENT_PART, self._crc, self._size, b"".join(self._compressed),
+                                        time.localtime()[:6]))
+        self._writer.close()
+
+    def abort(self):
+        """Close after a failure and remove the partial file."""
+        try:
+            self._writer.abort()
+        except Exception:
+            pass
+        _remove_partial(self.file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
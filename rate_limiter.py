@@ -0,0 +1,247 @@
+# rate_limiter.py
+# محدد معدل لكل مزود/نموذج (طلبات ورموز في الدقيقة) يضع الطلبات في طابور بدلاً من الفشل بخطأ 429
+
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from cancellation import CancellationToken, GenerationCancelled
+
+# Completion size assumed for a model until real usage has been observed
+DEFAULT_COMPLETION_TOKENS = 800
+# Pause applied after a 429 that carries no Retry-After / reset header
+DEFAULT_RATE_LIMIT_PAUSE = 2.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket holding up to per_minute units (refill: per_minute / 60 per second).
+    Reservations may take the level below zero: each caller gets the delay after which its
+    units are covered, so concurrent callers are served in arrival order instead of racing.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = float(per_minute)
+        self.level = self.per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take amount units; returns the seconds to wait before they are actually available."""
+        self._refill(now)
+        # A single request larger than the whole bucket would otherwise wait forever
+        self.level -= min(amount, self.per_minute)
+        return 0.0 if self.level >= 0 else -self.level * 60.0 / self.per_minute
+
+    def refund(self, amount: float, now: float):
+        self._refill(now)
+        self.level = min(self.per_minute, self.level + amount)
+
+    def set_limit(self, per_minute: float, now: float):
+        self._refill(now)
+        self.per_minute = float(per_minute)
+        self.level = min(self.level, self.per_minute)
+
+    def sync(self, remaining: float, now: float):
+        """The server's count is authoritative when it is lower than ours (other clients share the key)."""
+        self._refill(now)
+        if remaining < self.level:
+            self.level = remaining
+
+
+class RateReservation:
+    """Units taken for one request; settle() corrects the token estimate once usage is known."""
+
+    def __init__(self, key: str, tokens: int):
+        self.key = key
+        self.tokens = tokens
+
+
+class _RateState:
+    def __init__(self):
+        self.configured = {'requests': 0, 'tokens': 0}
+        self.reported = {'requests': 0, 'tokens': 0}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.paused_until = 0.0
+        self.completion_tokens = float(DEFAULT_COMPLETION_TOKENS)
+
+    def limit(self, kind: str) -> float:
+        """Effective per-minute limit: the lower of the configured cap and the provider's header (0 = none)."""
+        known = [v for v in (self.configured[kind], self.reported[kind]) if v > 0]
+        return min(known) if known else 0
+
+    def apply_limit(self, kind: str, now: float):
+        limit = self.limit(kind)
+        bucket = self.buckets.get(kind)
+        if not limit:
+            self.buckets.pop(kind, None)
+        elif bucket is None:
+            self.buckets[kind] = TokenBucket(limit)
+        elif bucket.per_minute != limit:
+            bucket.set_limit(limit, now)
+
+
+def parse_reset_seconds(value) -> Optional[float]:
+    """
+    Seconds until a rate limit resets, from "6m0s" / "1.5s" / "20ms" durations (OpenAI),
+    epoch timestamps in seconds or milliseconds (OpenRouter) or plain seconds.
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        parts = _DURATION_PART.findall(text)
+        if not parts:
+            return None
+        return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+    if number > 1e11:
+        return max(0.0, number / 1000.0 - time.time())
+    if number > 1e9:
+        return max(0.0, number - time.time())
+    return max(0.0, number)
+
+
+def _header_number(headers, name: str) -> Optional[float]:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderRateLimiter:
+    """
+    Request and token budgets per provider/model key ("base_url|model"), shared by every
+    caller in the process.
+
+    - acquire() reserves one request plus the estimated tokens (prompt + expected completion)
+      and sleeps until both budgets cover them, so bursts queue instead of hitting 429.
+    - Limits come from the configured caps and/or the x-ratelimit-* response headers; the
+      remaining counts in those headers pull the local budget down to the provider's view.
+    - A 429 pauses the key until the provider's reset time before queued requests go out.
+    """
+
+    def __init__(self):
+        self._states: Dict[str, _RateState] = {}
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.queued_seconds = 0.0
+        self.rate_limited = 0
+
+    def _state(self, key: str) -> _RateState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _RateState()
+        return state
+
+    def acquire(self, key: str, prompt_tokens: int, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                cancel_token: Optional[CancellationToken] = None) -> RateReservation:
+        """Block until the key's budgets allow one more request of about prompt_tokens input tokens."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(key)
+            for kind, limit in (('requests', requests_per_minute), ('tokens', tokens_per_minute)):
+                if state.configured[kind] != limit:
+                    state.configured[kind] = limit
+                    state.apply_limit(kind, now)
+            tokens = int(prompt_tokens + state.completion_tokens)
+            delay = state.paused_until - now
+            if 'requests' in state.buckets:
+                delay = max(delay, state.buckets['requests'].reserve(1, now))
+            if 'tokens' in state.buckets:
+                delay = max(delay, state.buckets['tokens'].reserve(tokens, now))
+            if delay > 0:
+                self.queued += 1
+                self.queued_seconds += delay
+        reservation = RateReservation(key, tokens)
+        if delay > 0:
+            if cancel_token:
+                if cancel_token.wait(delay):
+                    self.cancel(reservation)
+                    raise GenerationCancelled("Generation was cancelled")
+            else:
+                time.sleep(delay)
+        return reservation
+
+    def cancel(self, reservation: RateReservation):
+        """Give back a reservation whose request was never sent."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(reservation.key)
+            if 'requests' in state.buckets:
+                state.buckets['requests'].refund(1, now)
+            if 'tokens' in state.buckets:
+                state.buckets['tokens'].refund(reservation.tokens, now)
+
+    def settle(self, reservation: RateReservation, total_tokens: int, completion_tokens: Optional[int] = None):
+        """
+        Replace the token estimate with the usage the provider reported. A request that was sent but
+        failed (429, error) is settled with total_tokens=0 and no completion_tokens: its token estimate
+        is given back, the request itself still counts.
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(reservation.key)
+            if 'tokens' in state.buckets:
+                state.buckets['tokens'].refund(reservation.tokens - total_tokens, now)
+            if completion_tokens is not None:
+                # Moving average of the completion size, used for the next estimates
+                state.completion_tokens += 0.2 * (completion_tokens - state.completion_tokens)
+
+    def observe(self, key: str, headers):
+        """Learn limits and remaining budget from x-ratelimit-* response headers."""
+        if headers is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(key)
+            for kind, suffixes in (('requests', ('-requests', '')), ('tokens', ('-tokens',))):
+                for suffix in suffixes:
+                    limit = _header_number(headers, f'x-ratelimit-limit{suffix}')
+                    if limit is None:
+                        continue
+                    if limit > 0 and state.reported[kind] != limit:
+                        state.reported[kind] = limit
+                        state.apply_limit(kind, now)
+                    remaining = _header_number(headers, f'x-ratelimit-remaining{suffix}')
+                    bucket = state.buckets.get(kind)
+                    if remaining is not None and bucket is not None:
+                        bucket.sync(remaining, now)
+                    if remaining is not None and remaining <= 0:
+                        reset = parse_reset_seconds(headers.get(f'x-ratelimit-reset{suffix}'))
+                        if reset:
+                            state.paused_until = max(state.paused_until, now + reset)
+                    break
+
+    def on_rate_limited(self, key: str, headers=None, retry_after: Optional[float] = None):
+        """A 429 arrived: stop sending on this key until the provider's reset time."""
+        self.observe(key, headers)
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(key)
+            self.rate_limited += 1
+            for bucket in state.buckets.values():
+                bucket.sync(0, now)
+            pause = retry_after if retry_after is not None else DEFAULT_RATE_LIMIT_PAUSE
+            state.paused_until = max(state.paused_until, now + pause)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {'queued': self.queued, 'queued_seconds': self.queued_seconds, 'rate_limited': self.rate_limited}
+
+
+def is_quota_exhausted(error: Exception) -> bool:
+    """429 caused by an exhausted balance/quota: waiting does not help."""
+    return getattr(error, 'code', None) == 'insufficient_quota' or 'insufficient_quota' in str(error)
+
+
+# مثيل مشترك لكل الطلبات في العملية (الواجهة، الوضع الدفعي، الأقسام المتوازية)
+rate_limiter = ProviderRateLimiter()
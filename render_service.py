@@ -0,0 +1,90 @@
+# render_service.py
+# خدمة إنشاء ملفات الوورد في مجموعة عمليات منفصلة، كل عملية تُهيأ مرة واحدة، لاستغلال كل أنوية المعالج
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed, wait
+from typing import Iterable, Iterator, Optional, Tuple
+
+from cv_templates import DEFAULT_TEMPLATE, TEMPLATES, get_cv_writer
+
+# Fields every job has in common (e.g. the profile), sent to each worker once by the initializer
+_job_defaults = {}
+
+
+def _warm_up(templates: tuple, backend: str, defaults: dict):
+    """Worker initializer: imports python-docx and compiles the templates before the first job arrives."""
+    global _job_defaults
+    _job_defaults = defaults
+    for template in templates:
+        get_cv_writer(template, backend)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def render_job(job: dict) -> str:
+    """
+    Renders one job inside a worker process and returns its output path. A job holds user_data,
+    ai_data, template, section_names, section_order, output and optionally backend; fields missing
+    from the job are taken from the service's defaults.
+    """
+    if _job_defaults:
+        job = {**_job_defaults, **job}
+    write_cv = get_cv_writer(job.get('template', DEFAULT_TEMPLATE), job.get('backend', 'docx'))
+    write_cv(job['user_data'], job['ai_data'], job['output'], job['section_names'], job['section_order'])
+    return job['output']
+
+
+class RenderService:
+    """
+    Renders CVs in a pool of worker processes. Rendering is CPU-bound and holds the GIL, so threads
+    would render one document at a time; separate processes render one per core. Each worker imports
+    python-docx and compiles the templates once when it starts, and results are reported as each file
+    completes rather than in submission order.
+    """
+
+    def __init__(self, workers: Optional[int] = None, templates: Optional[Iterable[str]] = None,
+                 backend: str = 'docx', defaults: Optional[dict] = None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.backend = backend
+        self.templates = tuple(templates or TEMPLATES)
+        self.defaults = dict(defaults or {})
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self, wait_ready: bool = False) -> 'RenderService':
+        """Starts the workers (their warm-up overlaps whatever the caller does next); idempotent."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up,
+                                             initargs=(self.templates, self.backend, self.defaults))
+            # One no-op per worker makes the pool spawn all of them now instead of on the first jobs
+            pings = [self._pool.submit(_ready) for _ in range(self.workers)]
+            if wait_ready:
+                wait(pings)
+        return self
+
+    def submit(self, job: dict) -> Future:
+        """Queues one job; the future resolves to the output path (or raises the render error)."""
+        if 'backend' not in job and 'backend' not in self.defaults:
+            job = dict(job, backend=self.backend)
+        return self.start()._pool.submit(render_job, job)
+
+    def render_many(self, jobs: Iterable[dict]) -> Iterator[Tuple[dict, Optional[str], Optional[BaseException]]]:
+        """Yields (job, output path, None) or (job, None, error) for every job, as each file completes."""
+        futures = {self.submit(job): job for job in jobs}
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], (None if error else future.result()), error
+
+    def close(self, cancel_pending: bool = False):
+        """Waits for running renders; with cancel_pending, jobs that have not started are dropped."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=cancel_pending)
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(cancel_pending=exc_type is not None)
+        return False
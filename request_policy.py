@@ -0,0 +1,289 @@
+# request_policy.py
+# سياسة المهلات وإعادة المحاولة والطلبات الاحتياطية (hedging) لاستدعاءات الذكاء الاصطناعي
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+import openai
+
+from cancellation import CancellationToken, GenerationCancelled
+from rate_limiter import is_quota_exhausted
+from settings_manager import settings_manager
+
+# Thread pool shared by hedged calls; the slower request is left to finish in the background
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-hedge")
+
+
+class RequestPolicy:
+    """
+    Per-attempt timeout, retry and hedging settings for one LLM call.
+
+    - attempt_timeout: seconds allowed for a single attempt (for streams: between chunks).
+    - max_attempts: attempts per provider, retrying only 429, 5xx, timeouts and connection errors.
+    - backoff_base / backoff_max: exponential backoff bounds in seconds, with full jitter.
+    - hedge_enabled: fire the same request at the alternate provider when the primary is slow.
+    - hedge_percentile: latency percentile of recent calls after which the hedge fires.
+    - hedge_min_delay / hedge_default_delay: lower bound of the hedge delay, and the delay used
+      until hedge_min_samples latencies have been observed.
+    - max_concurrency: requests allowed in flight at once to one provider (see provider_limiter).
+    - rate_limit: queue requests per provider/model so they stay within its request and token
+      budgets (see rate_limiter); requests_per_minute / tokens_per_minute cap them further
+      (0 = use the limits the provider reports in its response headers).
+    - rate_limit_requeues: times a request answered with 429 is queued again before failing.
+    """
+
+    DEFAULTS = {
+        'attempt_timeout': 90.0,
+        'max_attempts': 3,
+        'backoff_base': 1.0,
+        'backoff_max': 20.0,
+        'hedge_enabled': False,
+        'hedge_percentile': 95.0,
+        'hedge_min_delay': 2.0,
+        'hedge_default_delay': 20.0,
+        'hedge_min_samples': 10,
+        'max_concurrency': 4,
+        'rate_limit': True,
+        'requests_per_minute': 0,
+        'tokens_per_minute': 0,
+        'rate_limit_requeues': 5,
+    }
+
+    def __init__(self, **options):
+        values = dict(self.DEFAULTS)
+        values.update({k: v for k, v in options.items() if k in self.DEFAULTS})
+        self.attempt_timeout = float(values['attempt_timeout'])
+        self.max_attempts = max(1, int(values['max_attempts']))
+        self.backoff_base = float(values['backoff_base'])
+        self.backoff_max = float(values['backoff_max'])
+        self.hedge_enabled = bool(values['hedge_enabled'])
+        self.hedge_percentile = float(values['hedge_percentile'])
+        self.hedge_min_delay = float(values['hedge_min_delay'])
+        self.hedge_default_delay = float(values['hedge_default_delay'])
+        self.hedge_min_samples = int(values['hedge_min_samples'])
+        self.max_concurrency = max(1, int(values['max_concurrency']))
+        self.rate_limit = bool(values['rate_limit'])
+        self.requests_per_minute = max(0.0, float(values['requests_per_minute']))
+        self.tokens_per_minute = max(0.0, float(values['tokens_per_minute']))
+        self.rate_limit_requeues = max(0, int(values['rate_limit_requeues']))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.DEFAULTS}
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff; a server-provided Retry-After wins when it is longer."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+
+def load_request_policy() -> RequestPolicy:
+    """Read the policy from request_policy.json (missing keys fall back to the defaults)."""
+    return RequestPolicy(**settings_manager.load_settings('request_policy', {}))
+
+
+def save_request_policy(policy: RequestPolicy) -> bool:
+    return settings_manager.save_settings('request_policy', policy.to_dict())
+
+
+def alternate_provider(provider: str) -> str:
+    """The provider used for hedged requests (openai <-> openrouter)."""
+    return 'openrouter' if provider == 'openai' else 'openai'
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per key, used to place the hedge threshold."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(pct / 100 * (len(samples) - 1)))))
+        return samples[index]
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+
+latency_tracker = LatencyTracker()
+
+
+class ProviderLimiter:
+    """
+    Caps the number of requests in flight per provider (keyed by base URL), shared by every
+    caller in the process: fan-out section requests, batch jobs and the GUI.
+    """
+
+    def __init__(self):
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._limits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, key: str, limit: int) -> threading.BoundedSemaphore:
+        with self._lock:
+            if self._limits.get(key) != limit:
+                # A changed limit applies to new requests; those in flight release the old semaphore
+                self._semaphores[key] = threading.BoundedSemaphore(limit)
+                self._limits[key] = limit
+            return self._semaphores[key]
+
+    @contextmanager
+    def slot(self, key: str, limit: int, cancel_token: Optional[CancellationToken] = None):
+        semaphore = self._semaphore(key, max(1, limit))
+        if cancel_token is None:
+            semaphore.acquire()
+        else:
+            while not semaphore.acquire(timeout=0.1):
+                cancel_token.raise_if_cancelled()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+provider_limiter = ProviderLimiter()
+
+
+def is_retryable(error: Exception) -> bool:
+    """429, 5xx, timeouts and dropped connections are worth retrying; other errors (and an exhausted quota) are not."""
+    if is_quota_exhausted(error):
+        return False
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError,
+                          openai.InternalServerError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds requested by the server's Retry-After header, if present."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retries(call: Callable[[float], Any], policy: RequestPolicy, latency_key: Optional[str] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> Any:
+    """
+    Run call(timeout) until it succeeds, retrying retryable errors with jittered backoff.
+    The last error is re-raised when every attempt fails; a cancelled token stops the
+    retries (and the backoff sleep) with GenerationCancelled.
+    """
+    for attempt in range(policy.max_attempts):
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        started = time.perf_counter()
+        try:
+            result = call(policy.attempt_timeout)
+        except Exception as e:
+            if cancel_token and cancel_token.cancelled:
+                raise GenerationCancelled("Generation was cancelled") from e
+            if attempt + 1 >= policy.max_attempts or not is_retryable(e):
+                raise
+            delay = policy.backoff_delay(attempt, retry_after_seconds(e))
+            print(f"AI request failed ({type(e).__name__}), retrying in {delay:.1f} s "
+                  f"[attempt {attempt + 2}/{policy.max_attempts}]")
+            if cancel_token:
+                cancel_token.wait(delay)
+            else:
+                time.sleep(delay)
+            continue
+        if latency_key:
+            latency_tracker.record(latency_key, time.perf_counter() - started)
+        return result
+
+
+def hedge_delay(policy: RequestPolicy, latency_key: Optional[str]) -> float:
+    """Seconds to wait for the primary before firing the hedged request."""
+    if not latency_key or latency_tracker.count(latency_key) < policy.hedge_min_samples:
+        return policy.hedge_default_delay
+    return max(policy.hedge_min_delay, latency_tracker.percentile(latency_key, policy.hedge_percentile))
+
+
+def run_with_policy(call: Callable[[float], Any], policy: Optional[RequestPolicy] = None,
+                    fallback_call: Optional[Callable[[float], Any]] = None, latency_key: Optional[str] = None,
+                    discard: Optional[Callable[[Any], None]] = None,
+                    cancel_token: Optional[CancellationToken] = None) -> Any:
+    """
+    Run call(timeout) under the policy and return its result.
+
+    With hedging enabled and a fallback_call available, the fallback is started once the
+    primary has been running longer than the hedge delay, and whichever succeeds first
+    wins. discard(result) is applied to the losing result (e.g. to close an open stream).
+    cancel_token stops retries and releases the caller while a hedged pair is pending.
+    """
+    policy = policy or RequestPolicy()
+    if not (policy.hedge_enabled and fallback_call):
+        return call_with_retries(call, policy, latency_key, cancel_token)
+
+    cancelled = {cancel_token.future()} if cancel_token else set()
+    started = Future()
+
+    def run_primary():
+        started.set_result(None)
+        return call_with_retries(call, policy, latency_key, cancel_token)
+
+    primary = _hedge_executor.submit(run_primary)
+    # The hedge delay counts from when the primary starts running, not from its wait for a free worker
+    wait({started} | cancelled, return_when=FIRST_COMPLETED)
+    if cancel_token:
+        cancel_token.raise_if_cancelled()
+    wait({primary} | cancelled, timeout=hedge_delay(policy, latency_key), return_when=FIRST_COMPLETED)
+    if primary.done():
+        return primary.result()
+    if cancel_token:
+        cancel_token.raise_if_cancelled()
+
+    print("AI request is slower than usual, sending a hedged request to the alternate provider")
+    hedged = _hedge_executor.submit(call_with_retries, fallback_call, policy, None, cancel_token)
+    pending = {primary, hedged}
+    first_error = None
+    while pending:
+        done, _ = wait(pending | cancelled, return_when=FIRST_COMPLETED)
+        if cancel_token and cancel_token.cancelled:
+            for future in (primary, hedged):
+                future.add_done_callback(lambda f: _discard_result(f, discard))
+            raise GenerationCancelled("Generation was cancelled")
+        pending -= done
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                first_error = first_error or error
+                continue
+            # Clean up the losing request, now or whenever it finishes
+            for other in (primary, hedged):
+                if other is not future:
+                    other.add_done_callback(lambda f: _discard_result(f, discard))
+            return future.result()
+    raise first_error
+
+
+def _discard_result(future, discard):
+    if discard is None or future.cancelled() or future.exception() is not None:
+        return
+    try:
+        discard(future.result())
+    except Exception as e:
+        print(f"Error discarding hedged result: {e}")
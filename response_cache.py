@@ -0,0 +1,190 @@
+# response_cache.py
+# ذاكرة تخزين مؤقت دائمة لنتائج تحليل الوصف الوظيفي
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from settings_manager import settings_manager
+
+
+class ResponseCache:
+    """
+    On-disk, content-addressed cache for analyze_job_description results.
+
+    Every entry is a small JSON file named after the SHA-256 of the request
+    inputs and holds both the raw model response and the parsed sections.
+    The file modification time doubles as the "last used" timestamp, so
+    eviction is a plain least-recently-used sweep bounded by entry count,
+    total size on disk and entry age.
+    """
+
+    # 2: the key also covers the response mode (output format, parallel sections)
+    FORMAT_VERSION = 2
+
+    def __init__(self, cache_dir: str, max_entries: int = 500, max_bytes: int = 50 * 1024 * 1024,
+                 max_age_days: float = 30):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Counters are updated from several worker threads; kept apart from the (slow) eviction lock
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def normalize_job_desc(job_desc: str) -> str:
+        """Collapse whitespace so cosmetic edits to the pasted text still hit the cache."""
+        return re.sub(r'\s+', ' ', job_desc or '').strip()
+
+    def make_key(self, provider: str, model: str, job_desc: str, excluded_terms: list,
+                 section_names: dict, temperature: float, **extra) -> str:
+        """
+        Build the cache key from everything that influences the model output.
+        - extra: any additional request options (kept sorted so the key is stable).
+        """
+        payload = {
+            'v': self.FORMAT_VERSION,
+            'provider': provider or '',
+            'model': (model or '').strip(),
+            'job_desc': self.normalize_job_desc(job_desc),
+            'excluded_terms': sorted(t.strip().lower() for t in excluded_terms or [] if t.strip()),
+            # Section order changes the prompt, so keep it as an ordered list of pairs
+            'section_names': [[key, name] for key, name in (section_names or {}).items()],
+            'temperature': round(float(temperature), 3),
+            'extra': {k: extra[k] for k in sorted(extra)},
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def is_cacheable(parsed_data: dict) -> bool:
+        """
+        False when every parsed section is empty (a refusal or a reply without the expected headings):
+        caching it would hand the same empty CV back on every later request.
+        """
+        return any(parsed_data.values()) if parsed_data else False
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return {'raw': str, 'data': dict} for a fresh entry, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                self._remove(path)
+                self._count(False)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Touch the file so the LRU sweep sees it as recently used
+            os.utime(path, None)
+        except FileNotFoundError:
+            self._count(False)
+            return None
+        except (IOError, OSError, json.JSONDecodeError) as e:
+            print(f"Error reading response cache entry {key[:12]}: {e}")
+            self._remove(path)
+            self._count(False)
+            return None
+
+        self._count(True)
+        return {'raw': entry.get('raw', ''), 'data': entry.get('data', {})}
+
+    def put(self, key: str, raw_response: str, parsed_data: dict) -> bool:
+        """Store a response atomically, then enforce the size/age limits."""
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        entry = {'v': self.FORMAT_VERSION, 'created': time.time(), 'raw': raw_response, 'data': parsed_data}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (IOError, OSError, TypeError) as e:
+            print(f"Error writing response cache entry {key[:12]}: {e}")
+            self._remove(tmp_path)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """Drop expired entries, then least-recently-used ones until within limits."""
+        with self._lock:
+            entries = []
+            try:
+                with os.scandir(self.cache_dir) as it:
+                    for item in it:
+                        if item.is_file() and item.name.endswith('.json'):
+                            st = item.stat()
+                            entries.append((st.st_mtime, st.st_size, item.path))
+            except OSError as e:
+                print(f"Error scanning response cache: {e}")
+                return
+
+            now = time.time()
+            fresh = []
+            for mtime, size, path in entries:
+                if now - mtime > self.max_age_seconds:
+                    self._remove(path)
+                else:
+                    fresh.append((mtime, size, path))
+
+            fresh.sort()  # oldest first
+            total_bytes = sum(size for _, size, _ in fresh)
+            while fresh and (len(fresh) > self.max_entries or total_bytes > self.max_bytes):
+                _, size, path = fresh.pop(0)
+                self._remove(path)
+                total_bytes -= size
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            try:
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith('.json') or name.endswith('.tmp'):
+                        self._remove(os.path.join(self.cache_dir, name))
+            except OSError as e:
+                print(f"Error clearing response cache: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters plus the current number of entries and bytes on disk."""
+        entries = 0
+        total_bytes = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for item in it:
+                    if item.is_file() and item.name.endswith('.json'):
+                        entries += 1
+                        total_bytes += item.stat().st_size
+        except OSError:
+            pass
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        return {'hits': hits, 'misses': misses, 'entries': entries, 'bytes': total_bytes}
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# إنشاء مثيل مشترك للذاكرة المؤقتة داخل مجلد بيانات التطبيق
+response_cache = ResponseCache(settings_manager.get_data_dir('response_cache'))
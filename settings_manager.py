@@ -24,7 +24,8 @@ class SettingsManager:
             'user_experiences': 'user_experiences.json',
             'user_certifications': 'user_certifications.json',
             'user_languages': 'user_languages.json',
-            'app_preferences': 'app_preferences.json'
+            'app_preferences': 'app_preferences.json',
+            'request_policy': 'request_policy.json'
         }
         
         self._create_settings_directory()
@@ -57,6 +58,15 @@ class SettingsManager:
         except OSError as e:
             print(f"Could not create settings directory due to an OS error: {e}")
     
+    def get_data_dir(self, name: str) -> str:
+        """الحصول على مسار مجلد فرعي داخل مجلد الإعدادات (مثل مجلد الذاكرة المؤقتة) وإنشاؤه عند الحاجة"""
+        path = os.path.join(self.settings_dir, name)
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            print(f"Could not create data directory '{name}': {e}")
+        return path
+
     def _get_file_path(self, file_key: str) -> str:
         """الحصول على المسار الكامل لملف الإعدادات"""
         if file_key not in self.files:
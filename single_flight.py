@@ -0,0 +1,80 @@
+# single_flight.py
+# دمج الطلبات المتطابقة المتزامنة في طلب واحد (single-flight) حتى لا يُدفع ثمن نفس الاستدعاء مرتين
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from cancellation import CancellationToken, GenerationCancelled
+
+
+class SingleFlight:
+    """
+    Runs fn once per key among concurrent callers: the first caller (the leader) executes it,
+    callers arriving while it is in flight wait for and share its result or exception.
+    Nothing is remembered once the call finishes; repeated requests are the response cache's job.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any], cancel_token: Optional[CancellationToken] = None) -> Tuple[Any, bool]:
+        """
+        Return (result, shared); shared is True when the result came from another caller's call.
+        A waiting caller whose cancel_token is cancelled stops waiting (the leader's call goes on).
+        """
+        with self._lock:
+            self.calls += 1
+        while True:
+            with self._lock:
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._in_flight[key] = future
+                    self.executed += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+
+            if cancel_token:
+                wait([future, cancel_token.future()], return_when=FIRST_COMPLETED)
+                if not future.done():
+                    cancel_token.raise_if_cancelled()
+            if isinstance(future.exception(), GenerationCancelled):
+                # The leader was cancelled, not this caller: run the call ourselves
+                with self._lock:
+                    self.coalesced -= 1
+                continue
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            # Unregister before waking the followers: one that retries after a cancelled leader
+            # must find the key free (or a new leader), not this failed future again
+            self._finish(key, future)
+            future.set_exception(e)
+            raise
+        self._finish(key, future)
+        future.set_result(result)
+        return result, False
+
+    def _finish(self, key: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'calls': self.calls, 'executed': self.executed, 'coalesced': self.coalesced,
+                    'in_flight': len(self._in_flight)}
+
+
+# مثيل مشترك لطلبات توليد محتوى السيرة الذاتية (المفتاح: مفتاح الذاكرة المؤقتة للطلب)
+request_coalescer = SingleFlight()
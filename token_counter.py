@@ -0,0 +1,42 @@
+# token_counter.py
+# تقدير عدد الرموز (tokens) في النص محلياً بدون استدعاء أي خدمة
+
+import re
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; fall back to a heuristic estimate
+    tiktoken = None
+
+_encoding = None
+# Stored after a failed load so the (possibly network) fetch is not retried on every call
+_UNAVAILABLE = object()
+# Words (any script), numbers in groups of three and single punctuation marks
+_TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\d{1,3}|[^\w\s]|_")
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(f"Could not load tiktoken encoding, using estimate instead: {e}")
+            _encoding = _UNAVAILABLE
+    return None if _encoding is _UNAVAILABLE else _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Number of tokens in text: exact with tiktoken installed, otherwise an estimate.
+    The estimate counts words/punctuation and long words as several tokens (about 4 characters each).
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    count = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        count += 1 + (len(piece) - 1) // 6 if len(piece) > 6 else 1
+    return count
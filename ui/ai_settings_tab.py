@@ -4,6 +4,9 @@ import tkinter as tk
 from tkinter import ttk
 from language import language_manager, _
 from settings_manager import settings_manager
+from client_registry import client_registry
+from request_policy import load_request_policy, save_request_policy
+from api_handler import load_generation_options, save_generation_option, save_output_format
 
 class AISettingsTab:
     def __init__(self, parent_tab, controller):
@@ -95,6 +98,25 @@ class AISettingsTab:
         self.x_title_label.grid(row=4, column=0, padx=(0, 10), pady=8, sticky="w")
         self.x_title_entry.grid(row=4, column=1, columnspan=2, padx=(0, 0), pady=8, sticky="ew")
 
+        # Hedged requests: ask the other provider too when a response is unusually slow
+        self.hedge_var = tk.BooleanVar(value=load_request_policy().hedge_enabled)
+        self.hedge_check = ttk.Checkbutton(self.ai_frame, text=_("hedge_requests"), variable=self.hedge_var,
+                                           command=self._on_hedge_toggle)
+        self.hedge_check.grid(row=5, column=0, columnspan=3, pady=(8, 0), sticky="w")
+
+        # Structured output: ask for a JSON object matching the sections instead of markdown headings
+        generation_options = load_generation_options()
+        self.json_output_var = tk.BooleanVar(value=generation_options['output_format'] == 'json')
+        self.json_output_check = ttk.Checkbutton(self.ai_frame, text=_("structured_output"), variable=self.json_output_var,
+                                                 command=lambda: save_output_format('json' if self.json_output_var.get() else 'markdown'))
+        self.json_output_check.grid(row=6, column=0, columnspan=3, pady=(4, 0), sticky="w")
+
+        # Parallel sections: one request per section, sent concurrently and merged
+        self.parallel_var = tk.BooleanVar(value=generation_options['parallel_sections'])
+        self.parallel_check = ttk.Checkbutton(self.ai_frame, text=_("parallel_sections"), variable=self.parallel_var,
+                                              command=lambda: save_generation_option('parallel_sections', self.parallel_var.get()))
+        self.parallel_check.grid(row=7, column=0, columnspan=3, pady=(4, 0), sticky="w")
+
         # Initialize OpenRouter fields visibility (without saving)
         self.toggle_openrouter_fields(False)
 
@@ -110,6 +132,12 @@ class AISettingsTab:
             # Also save to file immediately for real-time persistence
             self.save_settings_to_file()
         
+    def _on_hedge_toggle(self):
+        """حفظ إعداد الطلبات الاحتياطية"""
+        policy = load_request_policy()
+        policy.hedge_enabled = self.hedge_var.get()
+        save_request_policy(policy)
+
     def toggle_openrouter_fields(self, save_preference=True):
         """Show/hide OpenRouter specific fields based on provider selection and save/load data."""
         # Get the new provider
@@ -148,11 +176,17 @@ class AISettingsTab:
     def save_provider_data(self, provider):
         """Save current form data to the specified provider's storage."""
         if provider in self.provider_settings:
+            previous = dict(self.provider_settings[provider])
             self.provider_settings[provider]['api_key'] = self.api_key_entry.get()
             self.provider_settings[provider]['model'] = self.model_entry.get()
             self.provider_settings[provider]['http_referer'] = self.http_referer_entry.get()
             self.provider_settings[provider]['x_title'] = self.x_title_entry.get()
 
+            # Drop pooled clients built from the old connection settings
+            connection_fields = ('api_key', 'http_referer', 'x_title')
+            if any(previous.get(f) != self.provider_settings[provider][f] for f in connection_fields):
+                client_registry.invalidate(provider)
+
             # Save to file after updating data
             self.save_settings_to_file()
 
@@ -223,6 +257,9 @@ class AISettingsTab:
         self.model_label.config(text=_("model_name"))
         self.http_referer_label.config(text=_("website_referer"))
         self.x_title_label.config(text=_("website_title"))
+        self.hedge_check.config(text=_("hedge_requests"))
+        self.json_output_check.config(text=_("structured_output"))
+        self.parallel_check.config(text=_("parallel_sections"))
 
     def save_settings_to_file(self):
         """Save provider settings using settings manager."""
@@ -0,0 +1,251 @@
+# ui/preview_pane.py
+# جزء المعاينة الحية في تبويب القوالب: يرسم السيرة الذاتية بالقالب المختار في عنصر نص،
+# ويُحدَّث بعد كل تعديل دون إعادة رسم الأقسام التي لم تتغير
+
+import copy
+import queue
+import time
+import tkinter as tk
+from tkinter import ttk
+from language import language_manager, _
+from cv_preview import PreviewParagraph, PreviewWorker
+
+class PreviewPane:
+    # The first change renders at once; changes that follow within this window (typing produces a
+    # change per key) are coalesced into one render when it ends
+    DEBOUNCE_MS = 25
+    # Result polling interval, only while a preview is being built
+    POLL_MS = 4
+    # Preview size relative to the printed page
+    SCALE = 0.75
+    SAMPLE_ITEMS = 4
+
+    def __init__(self, parent, controller, get_template):
+        """
+        - parent: The frame where the preview is placed.
+        - controller: The application controller (user data, section order, last AI result).
+        - get_template: Returns the key of the selected template.
+        """
+        self.controller = controller
+        self.get_template = get_template
+        self.worker = PreviewWorker()
+
+        self._latest = 0
+        self._refresh_job = None
+        self._polling = False
+        self._changed_at = None
+        self._last_refresh = 0.0
+        # What the text widget shows: the template and the XML fragment of each block
+        self._template = None
+        self._fragments = ()
+        self._tags = {}
+        self._scale = 1.0
+        self._font_family = None
+
+        language_manager.add_observer(self.update_language)
+        self.create_widgets(parent)
+        # First preview once the main window (and its tabs' data) is built
+        self._refresh_job = self.text.after_idle(self.refresh)
+
+    def create_widgets(self, parent):
+        self.frame = ttk.LabelFrame(parent, text=_("live_preview_frame"), padding=10)
+        self.frame.pack(fill="both", expand=True)
+
+        self.status_label = ttk.Label(self.frame, text="", foreground="gray")
+        self.status_label.pack(anchor="w", pady=(0, 5))
+
+        # The page: a white sheet of the template's page width, the text area inset by its margins
+        page_container = ttk.Frame(self.frame)
+        page_container.pack(fill="both", expand=True)
+        self.page = tk.Frame(page_container, bg="white", relief="solid", borderwidth=1)
+        self.page.pack(side="left", fill="y")
+        self.page.pack_propagate(False)
+        self.text = tk.Text(self.page, wrap="word", bg="white", relief="flat", borderwidth=0,
+                            highlightthickness=0, cursor="arrow", state="disabled", width=1, height=1)
+        self.text.pack(fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(page_container, orient="vertical", command=self.text.yview)
+        scrollbar.pack(side="left", fill="y")
+        self.text.config(yscrollcommand=scrollbar.set)
+
+        self._scale = self.SCALE * self.text.winfo_fpixels("1p")
+
+    # --- Refresh scheduling (main thread) ---
+
+    def schedule_refresh(self):
+        """
+        Requests a preview update. A change after a quiet period is rendered immediately; bursts of
+        changes (e.g. typing) are coalesced into one render DEBOUNCE_MS after the latest of them.
+        """
+        now = time.perf_counter()
+        if self._changed_at is None:
+            self._changed_at = now
+        if self._refresh_job is not None:
+            self.text.after_cancel(self._refresh_job)
+        elif now - self._last_refresh >= self.DEBOUNCE_MS / 1000:
+            self.refresh()
+            return
+        self._refresh_job = self.text.after(self.DEBOUNCE_MS, self.refresh)
+
+    def refresh(self):
+        """Takes a snapshot of the current data and hands it to the preview worker."""
+        self._refresh_job = None
+        self._last_refresh = time.perf_counter()
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return
+        self._latest = self.worker.request(*snapshot)
+        if not self._polling:
+            self._polling = True
+            self.text.after(self.POLL_MS, self._poll)
+
+    def _snapshot(self):
+        main_view = getattr(self.controller, 'main_view', None)
+        if main_view is None:
+            return None  # Still building the main window
+        user_data = copy.deepcopy(self.controller.user_data)
+        user_data.update(main_view.user_info_tab.get_data())
+        section_names = dict(main_view.settings_tab.saved_section_names)
+        ai_data = self.controller.last_ai_data
+        ai_data = copy.deepcopy(ai_data) if ai_data else self._sample_ai_data(section_names)
+        return self.get_template(), user_data, ai_data, section_names, list(self.controller.section_order)
+
+    def _sample_ai_data(self, section_names):
+        """Placeholder text for the AI sections until a CV has been generated."""
+        sample = {'profile': _("preview_sample_profile")}
+        for key in section_names:
+            if key != 'profile':
+                sample[key] = [_("preview_sample_item", number=i + 1) for i in range(self.SAMPLE_ITEMS)]
+        return sample
+
+    def _poll(self):
+        result = None
+        try:
+            while True:
+                result = self.worker.results.get_nowait()
+        except queue.Empty:
+            pass
+        if result is None or result[0] != self._latest:
+            # Nothing yet, or only previews of data that has changed since: keep waiting for the latest
+            self.text.after(self.POLL_MS, self._poll)
+            return
+        self._polling = False
+        _generation, document, build_seconds, error = result
+        changed_at, self._changed_at = self._changed_at, None
+        if error is not None:
+            self.status_label.config(text=_("preview_error", error=error))
+            return
+        self._show(document)
+        # Time from the (first) change to the preview on screen
+        elapsed = time.perf_counter() - (changed_at or self._last_refresh)
+        self.status_label.config(text=_("preview_updated", ms=f"{elapsed * 1000:.0f}",
+                                        build_ms=f"{build_seconds * 1000:.1f}"))
+
+    # --- Drawing ---
+
+    def _show(self, document):
+        """
+        Updates the text widget to the new preview. Blocks are compared by their XML fragment:
+        everything before the first changed block stays on screen, the rest is replaced.
+        """
+        if document.template != self._template:
+            self._set_page(document)
+        old, new = self._fragments, document.fragments
+        common = 0
+        while common < min(len(old), len(new)) and old[common] == new[common]:
+            common += 1
+        if common == len(old) == len(new):
+            return
+
+        text = self.text
+        text.config(state="normal")
+        text.delete(f"block{common}" if common < len(old) else "end-1c", "end")
+        for index in range(len(new), len(old)):
+            text.mark_unset(f"block{index}")
+        for index in range(common, len(new)):
+            text.mark_set(f"block{index}", "end-1c")
+            text.mark_gravity(f"block{index}", "left")
+            for paragraph in document.blocks[index]:
+                self._insert_paragraph(paragraph, document)
+        text.config(state="disabled")
+        self._fragments = new
+
+    def _set_page(self, document):
+        """Page width and margins of a (new) template; everything is redrawn."""
+        margin = int(document.margin * self._scale)
+        self.page.config(width=int((document.width + 2 * document.margin) * self._scale))
+        self.text.config(padx=margin, pady=margin)
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.config(state="disabled")
+        for index in range(len(self._fragments)):
+            self.text.mark_unset(f"block{index}")
+        self._template = document.template
+        self._fragments = ()
+        self._font_family = document.font
+
+    def _insert_paragraph(self, paragraph, document):
+        text = self.text
+        # A paragraph border is a rule line of its own: spacing before a top rule goes above it,
+        # spacing after a bottom rule goes below it
+        if paragraph.border in ("top", "both"):
+            self._insert_rule(document, paragraph.before, 1)
+            paragraph = paragraph._replace(before=1)
+        after = paragraph.after
+        bottom = paragraph.border in ("bottom", "both")
+        tag = self._paragraph_tag(paragraph._replace(after=1) if bottom else paragraph)
+        first_size = paragraph.runs[0].size if paragraph.runs else document.font_size
+        if paragraph.bullet:
+            text.insert("end-1c", "•\t", (tag, self._font_tag(first_size, False, False)))
+        for run in paragraph.runs:
+            text.insert("end-1c", run.text, (tag, self._font_tag(run.size, run.bold, run.italic)))
+        text.insert("end-1c", "\n", (tag, self._font_tag(first_size, False, False)))
+        if bottom:
+            self._insert_rule(document, 0, after)
+
+    def _insert_rule(self, document, before, after):
+        rule = tk.Frame(self.text, height=1, width=int(document.width * self._scale), bg="black")
+        tag = self._paragraph_tag(PreviewParagraph((), None, before, after, False, None, ()))
+        self.text.window_create("end-1c", window=rule)
+        self.text.insert("end-1c", "\n", (tag, self._font_tag(1, False, False)))
+
+    def _font_tag(self, size, bold, italic):
+        key = ('font', self._font_family, size, bold, italic)
+        tag = self._tags.get(key)
+        if tag is None:
+            tag = f"font{len(self._tags)}"
+            style = " ".join(name for name, on in (("bold", bold), ("italic", italic)) if on) or "normal"
+            self.text.tag_configure(tag, font=(self._font_family, -max(1, round(size * self._scale)), style))
+            self._tags[key] = tag
+        return tag
+
+    def _paragraph_tag(self, paragraph):
+        key = ('paragraph', paragraph.align, paragraph.before, paragraph.after, paragraph.bullet, paragraph.tabs)
+        tag = self._tags.get(key)
+        if tag is None:
+            tag = f"paragraph{len(self._tags)}"
+            scale = self._scale
+            options = {
+                'justify': {'center': "center", 'right': "right"}.get(paragraph.align, "left"),
+                'spacing1': round(paragraph.before * scale),
+                'spacing3': round(paragraph.after * scale),
+            }
+            tabs = [(position, kind) for position, kind in paragraph.tabs]
+            if paragraph.bullet:
+                # List Bullet: the bullet on the margin, the text (and wrapped lines) a quarter inch in
+                indent = round(18 * scale)
+                options.update(lmargin1=0, lmargin2=indent)
+                tabs.insert(0, (18, "left"))
+            if tabs:
+                options['tabs'] = tuple(value for position, kind in tabs for value in (round(position * scale), kind))
+            self.text.tag_configure(tag, **options)
+            self._tags[key] = tag
+        return tag
+
+    def close(self):
+        self.worker.close()
+
+    def update_language(self):
+        """Update all UI text when language changes."""
+        self.frame.config(text=_("live_preview_frame"))
+        # The sample AI text is translated
+        self.schedule_refresh()
@@ -5,6 +5,8 @@ from tkinter import ttk
 import re
 from language import language_manager, _
 from settings_manager import settings_manager
+from api_handler import invalidate_prompt_templates
+from jd_preprocessor import load_preprocess_options, save_preprocess_options
 
 
 class SettingsTab:
@@ -100,6 +102,12 @@ class SettingsTab:
         self.excluded_entry = ttk.Entry(self.ai_frame, width=50)
         self.excluded_entry.grid(row=0, column=1, columnspan=2, padx=5, sticky="ew")
 
+        # Clean up the job description (boilerplate, duplicates, whitespace) before it is sent
+        self.preprocess_var = tk.BooleanVar(value=load_preprocess_options()['preprocess_job_desc'])
+        self.preprocess_check = ttk.Checkbutton(self.ai_frame, text=_("preprocess_job_desc"), variable=self.preprocess_var,
+                                                command=lambda: save_preprocess_options(preprocess_job_desc=self.preprocess_var.get()))
+        self.preprocess_check.grid(row=1, column=0, columnspan=3, padx=5, pady=(8, 0), sticky="w")
+
         # --- Section Name Customization ---
         self.customization_frame = ttk.LabelFrame(self.scrollable_frame, text=_("section_customization"), padding=15)
         self.customization_frame.pack(padx=10, pady=10, fill="x")
@@ -179,6 +187,7 @@ class SettingsTab:
     def _on_section_change(self, event):
         """حفظ أسماء الأقسام عند تغيير أي حقل"""
         self.save_section_names()
+        self.controller.refresh_preview()
 
     def _add_list_section_row(self, default_text=""):
         row_frame = ttk.Frame(self.sections_container)
@@ -212,6 +221,7 @@ class SettingsTab:
         row_frame.destroy()
         # Save section names after deletion
         self.save_section_names()
+        self.controller.refresh_preview()
 
     def save_section_names(self):
         """Save section names to settings."""
@@ -226,6 +236,11 @@ class SettingsTab:
                 key = re.sub(r'[^a-z0-9_]', '', key)
                 sections[key] = value
 
+        # Recompile prompt templates only when the section configuration actually changed
+        if sections != self.saved_section_names:
+            invalidate_prompt_templates()
+            self.saved_section_names = sections
+
         settings_manager.save_settings('section_names', sections)
 
 
@@ -253,6 +268,7 @@ class SettingsTab:
             'api_key': ai_data.get('api_key', ''),
             'model': ai_data.get('model', 'gpt-4o'),
             'excluded_terms': [t.strip() for t in self.excluded_entry.get().split(',') if t.strip()],
+            'preprocess': self.preprocess_var.get(),
             'provider': ai_data.get('provider', 'openai'),
             'http_referer': ai_data.get('http_referer') if ai_data.get('provider') == "openrouter" else None,
             'x_title': ai_data.get('x_title') if ai_data.get('provider') == "openrouter" else None,
@@ -268,6 +284,7 @@ class SettingsTab:
 
         # Update AI settings labels
         self.excluded_label.config(text=_("excluded_words"))
+        self.preprocess_check.config(text=_("preprocess_job_desc"))
 
         # Update customization labels
         self.profile_label.config(text=_("profile_section_title"))
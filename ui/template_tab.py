@@ -7,6 +7,7 @@ import os
 from language import language_manager, _
 from settings_manager import settings_manager
 from path_utils import resource_path
+from .preview_pane import PreviewPane
 
 class TemplateTab:
     def __init__(self, parent_tab, controller):
@@ -34,7 +35,7 @@ class TemplateTab:
         container.pack(fill="both", expand=True)
 
         self.template_frame = ttk.LabelFrame(container, text=_("template_selection_frame"), padding=15)
-        self.template_frame.pack(fill="both", expand=True, pady=(0, 20))
+        self.template_frame.pack(fill="x", pady=(0, 20))
         
         # Configure the grid columns to have equal weight, allowing them to expand
         self.template_frame.grid_columnconfigure(0, weight=1)
@@ -62,6 +63,9 @@ class TemplateTab:
             col=1
         )
 
+        # --- Live preview of the user's CV with the selected template ---
+        self.preview = PreviewPane(container, self.controller, self.get_selected_template)
+
     def _create_template_widget(self, parent, title_key, desc_key, image_paths, photo_list, value, col):
         """
         Helper function to create a single template selection widget.
@@ -76,7 +80,7 @@ class TemplateTab:
             option_frame,
             variable=self.selected_template,
             value=value,
-            command=self.save_template_preference
+            command=self._on_template_selected
         )
         radio_button.pack(side="left", padx=(0, 15), anchor="n")
 
@@ -184,6 +188,10 @@ class TemplateTab:
         except Exception as e:
             print(f"Could not open enlarged image '{image_path}': {e}")
 
+    def _on_template_selected(self):
+        self.save_template_preference()
+        self.preview.schedule_refresh()
+
     def get_selected_template(self):
         """Returns the key of the selected template."""
         return self.selected_template.get()
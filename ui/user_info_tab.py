@@ -151,6 +151,7 @@ class UserInfoTab:
                     proficiency_display = item['proficiency']
                 display_text = f"{item['name']} ({proficiency_display})"
             listbox.insert(tk.END, display_text)
+        self.controller.refresh_preview()
 
     def add_item(self, key, button_widget):
         if key == "experiences": dialogs.experience_dialog(self.parent, self.controller, button_widget=button_widget)
@@ -226,6 +227,7 @@ class UserInfoTab:
     def _on_personal_field_change(self, event):
         """حفظ البيانات الشخصية عند تغيير أي حقل"""
         self.save_personal_info()
+        self.controller.refresh_preview()
 
     def load_saved_data(self):
         """Load saved personal information data."""